@@ -2,20 +2,33 @@
 FastAPI Backend for Food Recognition and Nutrition Web Application
 Main entry point for the API server
 """
+from contextlib import asynccontextmanager
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import HTMLResponse
 import uvicorn
 
-from app.routes import predict, nutrition, aboutus
+from app.routes import predict, nutrition, meals, aboutus, embed, admin
+from app.services.nutrition_service import get_nutrition_service
+from app.utils.http_cache import HTTPCacheMiddleware, APP_VERSION
+from app.utils.json_codec import FastJSONResponse
+from app.utils.precompressed import precompressed, render_precompressed
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Constant pages are rendered and compressed once, before the first request
+    await render_precompressed()
+    yield
 
 # Create FastAPI instance
 app = FastAPI(
     title="Food Recognition & Nutrition API",
     description="API for food recognition using AI and nutrition information retrieval",
-    version="1.0.0",
+    version=APP_VERSION,
     docs_url="/docs",
-    redoc_url="/redoc"
+    redoc_url="/redoc",
+    lifespan=lifespan,
+    default_response_class=FastJSONResponse
 )
 
 # Environment configuration for free deployment
@@ -27,6 +40,16 @@ ALLOWED_ORIGINS = [
     "*" 
 ]
 
+# Read-only GETs are revalidated with ETags: nutrition data changes with the dataset version, the about pages only
+# with a deploy. Added before CORS so 304 responses get CORS headers too
+app.add_middleware(
+    HTTPCacheMiddleware,
+    rules=[
+        ("/api/nutrition", lambda: get_nutrition_service().etag),
+        ("/api/aboutus", lambda: "")
+    ]
+)
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=ALLOWED_ORIGINS,
@@ -36,10 +59,14 @@ app.add_middleware(
 )
 
 app.include_router(predict.router, prefix="/api", tags=["Prediction"])
+app.include_router(embed.router, prefix="/api", tags=["Embedding"])
 app.include_router(nutrition.router, prefix="/api", tags=["Nutrition"])
+app.include_router(meals.router, prefix="/api", tags=["Meals"])
 app.include_router(aboutus.router, prefix="/api", tags=["About"])
+app.include_router(admin.router, prefix="/api", tags=["Admin"])
 
 @app.get("/", response_class=HTMLResponse)
+@precompressed
 async def root():
     """Root endpoint with API information"""
     return """
@@ -64,7 +91,9 @@ async def root():
                 
                 <h2>Available Endpoints:</h2>
                 <div class="endpoint">POST /api/predict - Upload image for food recognition</div>
+                <div class="endpoint">POST /api/embed - Image embedding and visually similar meals</div>
                 <div class="endpoint">GET /api/nutrition/{dish_name} - Get nutrition information</div>
+                <div class="endpoint">POST /api/meals/aggregate - Meal totals from portions or grams</div>
                 <div class="endpoint">GET /api/aboutus - Get project information</div>
 
                 <h2>API Documentation:</h2>
@@ -105,7 +134,7 @@ async def health_check():
     return {
         "status": "healthy",
         "message": "Food Recognition API is running",
-        "version": "1.0.0"
+        "version": APP_VERSION
     }
 
 if __name__ == "__main__":
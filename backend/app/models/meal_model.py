@@ -0,0 +1,36 @@
+"""
+Pydantic models for meal aggregation requests
+"""
+from pydantic import BaseModel, Field, model_validator
+from typing import List, Optional
+
+class MealItem(BaseModel):
+    """One dish of a meal, eaten in servings or grams"""
+    dish_name: str = Field(..., min_length=1, description="Dish name, in any spelling or alias")
+    portions: Optional[float] = Field(None, gt=0, le=100, description="Number of servings (default 1)")
+    grams: Optional[float] = Field(None, gt=0, le=10000, description="Amount eaten in grams, scaled by the serving weight")
+    
+    @model_validator(mode="after")
+    def check_amount(self):
+        if self.portions is not None and self.grams is not None:
+            raise ValueError("Give either portions or grams, not both")
+        return self
+
+class MealAggregateRequest(BaseModel):
+    """Request model for meal aggregation"""
+    items: List[MealItem] = Field(..., min_length=1, max_length=500, description="Dishes in the meal")
+
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "items": [
+                    {"dish_name": "pho_bo", "portions": 1.5},
+                    {"dish_name": "banh_mi", "grams": 120}
+                ]
+            }
+        }
+
+class MealBatchRequest(BaseModel):
+    """Request model for aggregating many meals at once (e.g. a day of logged meals for a cohort)"""
+    meals: List[MealAggregateRequest] = Field(..., min_length=1, max_length=10000, description="Meals to aggregate")
+    detail: bool = Field(True, description="Include per-dish contributions for every meal")
@@ -1,24 +1,59 @@
 """
 Pydantic models for nutrition requests and responses
 """
-from pydantic import BaseModel, Field, validator
-from typing import Dict, Any, Optional
+from pydantic import BaseModel, Field, field_validator
+from typing import Annotated, Dict, Any, List, Optional
 from enum import Enum
+
+class NutritionFacts(BaseModel):
+    """Nutrients per serving"""
+    calories: float = Field(..., description="Energy (kcal)")
+    protein: float = Field(..., description="Protein (g)")
+    fat: float = Field(..., description="Fat (g)")
+    carbs: float = Field(..., description="Carbohydrates (g)")
+    fiber: float = Field(..., description="Fiber (g)")
+
+class HealthSuggestion(BaseModel):
+    """Model for health suggestions based on nutrition; the rule table may add further outputs"""
+    health_level: Optional[str] = Field(None, description="Overall health level (low/moderate/high)")
+    recommendations: List[str] = Field(default=[], description="Health recommendations")
+    dietary_notes: str = Field(default="", description="Dietary compatibility notes")
+    calorie_category: Optional[str] = Field(None, description="Calorie category (low/moderate/high)")
+    protein_level: Optional[str] = Field(None, description="Protein content level")
+
+    class Config:
+        extra = "allow"
+        json_schema_extra = {
+            "example": {
+                "health_level": "moderate",
+                "recommendations": [
+                    "Good source of protein",
+                    "Moderate caloric content",
+                    "Consider adding vegetables"
+                ],
+                "dietary_notes": "Suitable for most diets, contains gluten",
+                "calorie_category": "moderate",
+                "protein_level": "good"
+            }
+        }
+
 class NutritionResponse(BaseModel):
     """Response model for nutrition information"""
     success: bool = Field(..., description="Whether request was successful")
     dish_name: str = Field(..., description="Name of the dish")
-    nutrition: Dict[str, Any] = Field(..., description="Nutritional information")
+    nutrition: NutritionFacts = Field(..., description="Nutritional information")
     serving_info: Optional[str] = Field(None, description="Serving size information")
     dataset_source: Optional[str] = Field(None, description="Source of nutrition data")
-    suggestions: Optional[Dict[str, Any]] = Field(None, description="Health suggestions based on nutrition")
+    suggestions: Optional[HealthSuggestion] = Field(None, description="Health suggestions based on nutrition")
+    match_info: Optional[str] = Field(None, description="Set when the name was matched to the closest dish")
     
-    @validator('dish_name')
+    @field_validator('dish_name')
+    @classmethod
     def dish_name_must_not_be_empty(cls, v):
         if not v or not v.strip():
             raise ValueError('Dish name cannot be empty')
         return v.strip()
-    
+
     class Config:
         json_schema_extra = {
             "example": {
@@ -52,7 +87,7 @@ class NutritionErrorResponse(BaseModel):
     dish_name: str = Field(..., description="Requested dish name")
     available_dishes: Optional[list] = Field(None, description="List of available dishes")
     suggestions: Optional[list] = Field(None, description="Similar dish suggestions")
-    
+
     class Config:
         json_schema_extra = {
             "example": {
@@ -64,25 +99,18 @@ class NutritionErrorResponse(BaseModel):
             }
         }
 
-class HealthSuggestion(BaseModel):
-    """Model for health suggestions based on nutrition"""
-    health_level: str = Field(..., description="Overall health level (low/moderate/high)")
-    recommendations: list = Field(default=[], description="Health recommendations")
-    dietary_notes: str = Field(default="", description="Dietary compatibility notes")
-    calorie_category: str = Field(..., description="Calorie category (low/moderate/high)")
-    protein_level: str = Field(..., description="Protein content level")
-    
+class NutritionBatchRequest(BaseModel):
+    """Request model for batch nutrition lookup"""
+    dishes: List[str] = Field(..., min_length=1, max_length=5000, description="Dish names, in any spelling")
+    fuzzy: bool = Field(True, description="Fall back to the closest dish name when there is no exact or alias match")
+
     class Config:
         json_schema_extra = {
             "example": {
-                "health_level": "moderate",
-                "recommendations": [
-                    "Good source of protein",
-                    "Moderate caloric content",
-                    "Consider adding vegetables"
-                ],
-                "dietary_notes": "Suitable for most diets, contains gluten",
-                "calorie_category": "moderate",
-                "protein_level": "good"
+                "dishes": ["pho_bo", "Bánh Mì", "beef pho", "piza"],
+                "fuzzy": True
             }
-        }
\ No newline at end of file
+        }
+
+# POST /nutrition/batch also takes the names as a bare JSON list (fuzzy matching on)
+BatchDishNames = Annotated[List[str], Field(min_length=1, max_length=5000)]
@@ -2,21 +2,65 @@
 Pydantic models for prediction requests and responses
 """
 from pydantic import BaseModel, Field, validator
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Union
 from PIL import Image
 
+from app.models.nutrition_model import NutritionFacts
+
+class BoundingBox(BaseModel):
+    """Box in original image pixels"""
+    x: int
+    y: int
+    width: int
+    height: int
+
+class ClassPrediction(BaseModel):
+    """One predicted class with its confidence"""
+    class_id: int = Field(..., description="Model class index")
+    class_name: str = Field(..., description="Internal class name")
+    name: str = Field(..., description="Display name")
+    confidence: float = Field(..., ge=0.0, le=1.0, description="Class probability (0-1)")
+    nutrition: Optional[NutritionFacts] = Field(None, description="Nutrition of the class")
+
+class Detection(ClassPrediction):
+    """One dish found by multi-dish prediction"""
+    bounding_box: BoundingBox = Field(..., description="Where the dish is in the image")
+    expected_nutrition: Optional[NutritionFacts] = Field(None, description="Nutrition weighted by the region's class probabilities (if requested)")
+
+class Explanation(BaseModel):
+    """Grad-CAM heatmap of one class"""
+    method: str = Field(..., description="Explanation method (grad-cam)")
+    class_id: int
+    class_name: str
+    format: str = Field(..., description="png (base64 string) or array (rows of values in 0-1)")
+    cached: bool = Field(..., description="Served from the explanation cache")
+    height: int
+    width: int
+    heatmap: Union[str, List[List[float]]]
+
+class SimilarDish(BaseModel):
+    """Dish with a close macro profile"""
+    dish_name: str
+    distance: float = Field(..., description="Distance between standardized macro profiles")
+    nutrition: Optional[Dict[str, float]] = Field(None, description="Macro values on the requested basis")
+
 class PredictionResponse(BaseModel):
     """Response model for food prediction"""
     success: bool = Field(..., description="Whether prediction was successful")
     food_name: str = Field(..., description="Predicted food name")
     class_name: str = Field(..., description="Internal class name")
     confidence: float = Field(..., ge=0.0, le=1.0, description="Prediction confidence (0-1)")
-    nutrition: Dict[str, Any] = Field(..., description="Nutrition information")
-    top_3_predictions: List[Dict[str, Any]] = Field(default=[], description="Top 3 predictions with confidence")
-    bounding_box: Optional[Dict[str, int]] = Field(None, description="Bounding box coordinates (if available)")
+    nutrition: NutritionFacts = Field(..., description="Nutrition information")
+    top_3_predictions: List[ClassPrediction] = Field(default=[], description="Top 3 predictions with confidence")
+    bounding_box: Optional[BoundingBox] = Field(None, description="Bounding box coordinates (if available)")
+    expected_nutrition: Optional[NutritionFacts] = Field(None, description="Nutrition weighted by class probabilities (if requested)")
+    explanation: Optional[Explanation] = Field(None, description="Grad-CAM heatmap for the top-1 class (if requested)")
+    similar_dishes: Optional[List[SimilarDish]] = Field(None, description="Dishes with the closest macro profile to the top-1 class (if requested)")
+    detections: Optional[List[Detection]] = Field(None, description="Per-dish detections (multi_dish mode only)")
+    regions_evaluated: Optional[int] = Field(None, description="Candidate regions scored (multi_dish mode only)")
     processing_time: Optional[float] = Field(None, description="Processing time in seconds")
     model_info: Optional[str] = Field(None, description="Model information")
-    
+
     class Config:
         json_schema_extra = {
             "example": {
@@ -62,7 +106,7 @@ class ErrorResponse(BaseModel):
     error: str = Field(..., description="Error message")
     error_code: Optional[str] = Field(None, description="Error code")
     details: Optional[Dict[str, Any]] = Field(None, description="Additional error details")
-    
+
     class Config:
         json_schema_extra = {
             "example": {
@@ -79,7 +123,7 @@ class ErrorResponse(BaseModel):
 class UploadImageRequest(BaseModel):
     """Request model for image upload (for documentation purposes)"""
     file: bytes = Field(..., description="Image file (multipart/form-data)")
-    
+
     class Config:
         json_schema_extra = {
             "example": {
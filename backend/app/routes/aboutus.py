@@ -5,9 +5,12 @@ from fastapi import APIRouter
 from fastapi.responses import HTMLResponse, JSONResponse
 import json
 
+from app.utils.precompressed import precompressed
+
 router = APIRouter()
 
 @router.get("/aboutus", response_class=HTMLResponse)
+@precompressed
 async def get_about_us_html():
     """
     Get About Us information as HTML page
@@ -268,6 +271,7 @@ async def get_about_us_html():
     return html_content
 
 @router.get("/aboutus/json")
+@precompressed
 async def get_about_us_json():
     """
     Get About Us information as JSON data
@@ -399,6 +403,7 @@ async def get_about_us_json():
     return JSONResponse(content=about_data)
 
 @router.get("/aboutus/team")
+@precompressed
 async def get_team_info():
     """
     Get detailed team member information
@@ -0,0 +1,164 @@
+"""
+FastAPI routes for administrative operations
+Enabled only when the ADMIN_API_KEY environment variable is set; clients send it in the X-Admin-Key header
+"""
+from fastapi import APIRouter, UploadFile, File, Form, HTTPException, Depends, Header, Query
+from fastapi.concurrency import run_in_threadpool
+import hmac
+import os
+import re
+import time
+from typing import List, Optional
+
+from app.routes.predict import read_image_upload
+from app.services.inference_service import get_inference_service, FoodInferenceService
+from app.services.nutrition_service import get_nutrition_service, NutritionService
+from app.services.class_metadata import get_class_metadata
+from app.services.display_names import get_display_name
+from app.utils.json_codec import FastJSONResponse
+
+router = APIRouter()
+
+CLASS_NAME_PATTERN = re.compile(r"^[a-z0-9_]{2,64}$")
+MAX_EXAMPLE_IMAGES = 20
+
+def require_admin(x_admin_key: Optional[str] = Header(None)):
+    """Reject the request unless it carries the configured admin key"""
+    expected = os.getenv("ADMIN_API_KEY")
+    if not expected:
+        raise HTTPException(status_code=403, detail="Admin API is disabled (ADMIN_API_KEY not set)")
+    if not x_admin_key or not hmac.compare_digest(x_admin_key, expected):
+        raise HTTPException(status_code=401, detail="Invalid admin key")
+
+@router.post("/admin/classes", dependencies=[Depends(require_admin)])
+async def register_class(
+    class_name: str = Form(..., description="Internal class name, e.g. banh_bao"),
+    display_name: Optional[str] = Form(None, description="Name shown to users, e.g. Bánh Bao"),
+    calories: float = Form(..., ge=0),
+    protein: float = Form(..., ge=0),
+    fat: float = Form(..., ge=0),
+    carbs: float = Form(..., ge=0),
+    serving: str = Form("1 serving"),
+    files: List[UploadFile] = File(..., description="A handful of example images of the dish"),
+    inference_service: FoodInferenceService = Depends(get_inference_service),
+    nutrition_service: NutritionService = Depends(get_nutrition_service)
+):
+    """
+    Register a new dish class from example images, without retraining
+    
+    - **class_name**: Lowercase name with underscores
+    - **files**: 1-20 example images; their averaged embedding becomes the class prototype
+    - Returns: The new class id and how long registration took
+    """
+    start_time = time.time()
+    
+    if not CLASS_NAME_PATTERN.match(class_name):
+        raise HTTPException(status_code=400, detail="class_name must be 2-64 characters of a-z, 0-9 or _")
+    if len(files) > MAX_EXAMPLE_IMAGES:
+        raise HTTPException(status_code=400, detail=f"Maximum {MAX_EXAMPLE_IMAGES} example images")
+    if inference_service.feature_model is None:
+        raise HTTPException(status_code=503, detail="Model not loaded")
+    if inference_service.is_trained_class(class_name):
+        raise HTTPException(status_code=400, detail=f"'{class_name}' is already a trained class")
+    
+    images = [await read_image_upload(file) for file in files]
+    
+    try:
+        prototype = inference_service.compute_prototype(images)
+        nutrition = {
+            "calories": calories,
+            "protein": protein,
+            "fat": fat,
+            "carbs": carbs,
+            "serving": serving,
+            "dataset_source": "Custom"
+        }
+        # The class first: if it is rejected, the catalogue dish must stay untouched
+        class_id = inference_service.add_prototype_class(
+            class_name, display_name or get_display_name(class_name), prototype, nutrition
+        )
+        nutrition_service.add_dish(class_name, nutrition)
+        # Rebuild the class metadata join now rather than on the next prediction
+        get_class_metadata()
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        return FastJSONResponse(
+            status_code=500,
+            content={
+                "success": False,
+                "error": f"Class registration failed: {str(e)}",
+                "class_name": class_name
+            }
+        )
+    
+    return {
+        "success": True,
+        "class_id": class_id,
+        "class_name": class_name,
+        "examples_used": len(images),
+        "total_classes": len(inference_service.class_names),
+        "processing_time": round(time.time() - start_time, 3)
+    }
+
+@router.get("/admin/classes", dependencies=[Depends(require_admin)])
+async def list_registered_classes(
+    inference_service: FoodInferenceService = Depends(get_inference_service)
+):
+    """
+    List classes registered from example images
+    
+    - Returns: Class ids, names and nutrition of the extra classes
+    """
+    classes = inference_service.get_prototype_classes()
+    return {
+        "success": True,
+        "base_classes": inference_service.num_base_classes,
+        "registered_classes": classes,
+        "count": len(classes)
+    }
+
+@router.post("/admin/nutrition/reload", dependencies=[Depends(require_admin)])
+async def reload_nutrition_database(
+    wait: bool = Query(True, description="Wait for the reload to finish instead of running it in the background"),
+    force: bool = Query(False, description="Rebuild even if the files have not changed"),
+    nutrition_service: NutritionService = Depends(get_nutrition_service)
+):
+    """
+    Reload the nutrition CSV and dish aliases without restarting
+    
+    The new dataset is built next to the active one and swapped in atomically; requests keep being served meanwhile
+    - Returns: Active version and etag, whether anything changed, and how long the reload took
+    """
+    if not wait:
+        started = nutrition_service.reload_in_background(force)
+        return FastJSONResponse(
+            status_code=202,
+            content={
+                "success": True,
+                "started": started,
+                "message": "Reload started" if started else "A reload is already running",
+                "status": nutrition_service.get_status()
+            }
+        )
+    
+    result = await run_in_threadpool(nutrition_service.reload, force)
+    if "error" in result:
+        return FastJSONResponse(
+            status_code=500,
+            content={
+                "success": False,
+                "error": f"Reload failed: {result['error']}",
+                "status": nutrition_service.get_status()
+            }
+        )
+    return {"success": True, **result}
+
+@router.get("/admin/nutrition/status", dependencies=[Depends(require_admin)])
+async def get_nutrition_dataset_status(
+    nutrition_service: NutritionService = Depends(get_nutrition_service)
+):
+    """
+    Active nutrition dataset version, etag and last reload
+    """
+    return {"success": True, "status": nutrition_service.get_status()}
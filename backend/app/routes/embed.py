@@ -0,0 +1,101 @@
+"""
+FastAPI route for image embeddings and visual similarity search
+"""
+from fastapi import APIRouter, UploadFile, File, HTTPException, Depends, Query
+import time
+import uuid
+from typing import Optional
+
+from app.routes.predict import read_image_upload
+from app.services.inference_service import get_inference_service, FoodInferenceService
+from app.services.vector_index import get_vector_index
+from app.utils.json_codec import FastJSONResponse
+
+router = APIRouter()
+
+@router.post("/embed")
+async def embed_image(
+    file: UploadFile = File(...),
+    top_k: int = Query(5, ge=0, le=100, description="Number of similar indexed images to return"),
+    add_to_index: bool = Query(False, description="Store this embedding in the index after searching"),
+    item_id: Optional[str] = Query(None, description="Id to store the embedding under (generated if omitted)"),
+    duplicate_threshold: float = Query(0.95, ge=0.0, le=1.0, description="Cosine similarity above which the image counts as a duplicate"),
+    include_embedding: bool = Query(True, description="Include the raw embedding vector in the response"),
+    inference_service: FoodInferenceService = Depends(get_inference_service)
+):
+    """
+    Extract a penultimate-layer ResNet50 embedding and search visually similar images
+    
+    - **top_k**: Number of nearest neighbours (cosine similarity) to return
+    - **add_to_index**: Add the image to the in-memory index (e.g. a user's meal gallery)
+    - Returns: Embedding, nearest neighbours and a duplicate flag
+    """
+    start_time = time.time()
+    
+    try:
+        content = await read_image_upload(file)
+        
+        try:
+            embedding = inference_service.embed(content)
+        except RuntimeError as e:
+            raise HTTPException(status_code=503, detail=str(e))
+        
+        index = get_vector_index(embedding.shape[0])
+        
+        # Search before adding so an image never matches itself
+        similar = [
+            {"id": neighbour_id, "similarity": round(score, 4)}
+            for neighbour_id, score in index.search(embedding, top_k)
+        ]
+        
+        stored_id = None
+        if add_to_index:
+            stored_id = item_id or uuid.uuid4().hex
+            index.add([stored_id], embedding)
+        
+        response_data = {
+            "success": True,
+            "embedding_dim": int(embedding.shape[0]),
+            "similar": similar,
+            "is_duplicate": bool(similar) and similar[0]["similarity"] >= duplicate_threshold,
+            "stored_id": stored_id,
+            "index_size": len(index),
+            "processing_time": round(time.time() - start_time, 3)
+        }
+        if include_embedding:
+            response_data["embedding"] = embedding.tolist()
+        
+        return FastJSONResponse(content=response_data)
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        return FastJSONResponse(
+            status_code=500,
+            content={
+                "success": False,
+                "error": f"Embedding failed: {str(e)}",
+                "processing_time": round(time.time() - start_time, 3)
+            }
+        )
+
+@router.get("/embed/index/status")
+async def get_index_status():
+    """
+    Get the current state of the in-memory embedding index
+    
+    - Returns: Vector count, dimension, quantization and memory usage
+    """
+    index = get_vector_index()
+    if index is None:
+        return {
+            "success": True,
+            "status": "empty",
+            "index": None
+        }
+    
+    return {
+        "success": True,
+        "status": "ready",
+        "index": index.get_status()
+    }
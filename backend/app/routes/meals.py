@@ -0,0 +1,83 @@
+"""
+FastAPI routes for meal-level nutrition
+"""
+from fastapi import APIRouter, Depends
+
+from app.models.meal_model import MealAggregateRequest, MealBatchRequest
+from app.services.nutrition_service import get_nutrition_service, NutritionService
+from app.utils.json_codec import FastJSONResponse
+
+router = APIRouter()
+
+@router.post("/meals/aggregate")
+async def aggregate_meal(
+    request: MealAggregateRequest,
+    nutrition_service: NutritionService = Depends(get_nutrition_service)
+):
+    """
+    Total nutrition of a meal
+    
+    - **items**: Dishes with either **portions** (servings, default 1) or **grams** (scaled by the weight in the
+      dish's serving, e.g. "1 slice (100g)")
+    - Returns: Meal totals, each dish's contribution and share of calories, and the percentage of macronutrient
+      energy from protein, fat and carbs
+    """
+    try:
+        result = nutrition_service.aggregate_meal([item.model_dump() for item in request.items])
+        if not result.get("success"):
+            return FastJSONResponse(status_code=404, content=result)
+        return FastJSONResponse(content=result)
+    
+    except ValueError as e:
+        return FastJSONResponse(
+            status_code=400,
+            content={
+                "success": False,
+                "error": str(e)
+            }
+        )
+    except Exception as e:
+        return FastJSONResponse(
+            status_code=500,
+            content={
+                "success": False,
+                "error": f"Meal aggregation failed: {str(e)}"
+            }
+        )
+
+@router.post("/meals/aggregate/batch")
+async def aggregate_meals(
+    request: MealBatchRequest,
+    nutrition_service: NutritionService = Depends(get_nutrition_service)
+):
+    """
+    Total nutrition of many meals in one pass
+    
+    - **meals**: Up to 10000 meals, each with **items** as in /meals/aggregate
+    - **detail**: Include each dish's contribution (turn off when only totals are needed)
+    - Returns: Per-meal totals and macro energy ratios in request order, plus the sum over all meals
+    """
+    try:
+        meals = [[item.model_dump() for item in meal.items] for meal in request.meals]
+        result = nutrition_service.aggregate_meals(meals, request.detail)
+        if not result.get("success"):
+            return FastJSONResponse(status_code=404, content=result)
+        return FastJSONResponse(content=result)
+    
+    except ValueError as e:
+        return FastJSONResponse(
+            status_code=400,
+            content={
+                "success": False,
+                "error": str(e)
+            }
+        )
+    except Exception as e:
+        return FastJSONResponse(
+            status_code=500,
+            content={
+                "success": False,
+                "error": f"Meal aggregation failed: {str(e)}",
+                "meal_count": len(request.meals)
+            }
+        )
@@ -1,32 +1,141 @@
 """
 FastAPI route for nutrition information retrieval
 """
-from fastapi import APIRouter, HTTPException, Depends, Query
-from fastapi.responses import JSONResponse
-from typing import List, Optional
+from fastapi import APIRouter, Body, HTTPException, Depends, Query
+from fastapi.responses import Response
+from typing import List, Optional, Union
 
-from app.models.nutrition_model import NutritionResponse, NutritionErrorResponse
+from app.models.nutrition_model import NutritionResponse, NutritionErrorResponse, NutritionBatchRequest, BatchDishNames
 from app.services.nutrition_service import get_nutrition_service, NutritionService
+from app.utils.fieldsets import FieldSet
+from app.utils.json_codec import FastJSONResponse, typed_response
 
 router = APIRouter()
 
+@router.get("/nutrition/autocomplete")
+async def autocomplete_dishes(
+    q: str = Query(..., min_length=1, max_length=100, description="Text typed so far"),
+    limit: int = Query(10, ge=1, le=50, description="Maximum number of completions"),
+    nutrition_service: NutritionService = Depends(get_nutrition_service)
+):
+    """
+    Complete a partially typed dish name
+    
+    - **q**: Prefix (or any part) of a dish name, e.g. "bun", "cake"
+    - **limit**: Maximum number of completions (1-50)
+    - Returns: Dish names ranked exact > prefix > word prefix > substring, then by popularity
+    """
+    try:
+        completions = nutrition_service.autocomplete(q, limit)
+        return FastJSONResponse(content={
+            "success": True,
+            "query": q,
+            "count": len(completions),
+            "completions": completions
+        })
+    
+    except Exception as e:
+        return FastJSONResponse(
+            status_code=500,
+            content={
+                "success": False,
+                "error": f"Autocomplete failed: {str(e)}",
+                "query": q
+            }
+        )
+
+@router.get("/nutrition/query")
+async def query_dishes(
+    min_calories: Optional[float] = Query(None, ge=0, description="Minimum calories per serving"),
+    max_calories: Optional[float] = Query(None, ge=0, description="Maximum calories per serving"),
+    min_protein: Optional[float] = Query(None, ge=0, description="Minimum protein (g)"),
+    max_protein: Optional[float] = Query(None, ge=0, description="Maximum protein (g)"),
+    min_fat: Optional[float] = Query(None, ge=0, description="Minimum fat (g)"),
+    max_fat: Optional[float] = Query(None, ge=0, description="Maximum fat (g)"),
+    min_carbs: Optional[float] = Query(None, ge=0, description="Minimum carbohydrates (g)"),
+    max_carbs: Optional[float] = Query(None, ge=0, description="Maximum carbohydrates (g)"),
+    min_fiber: Optional[float] = Query(None, ge=0, description="Minimum fiber (g)"),
+    max_fiber: Optional[float] = Query(None, ge=0, description="Maximum fiber (g)"),
+    sort_by: Optional[str] = Query(None, pattern="^(calories|protein|fat|carbs|fiber|popularity)$", description="Field to sort by"),
+    order: str = Query("asc", pattern="^(asc|desc)$", description="Sort order"),
+    limit: int = Query(20, ge=1, le=100, description="Maximum number of dishes"),
+    offset: int = Query(0, ge=0, le=100000, description="Number of matching dishes to skip"),
+    nutrition_service: NutritionService = Depends(get_nutrition_service)
+):
+    """
+    Find dishes by nutrient ranges, e.g. under 300 kcal with at least 15g protein, sorted by fat
+    
+    - **min_<nutrient>** / **max_<nutrient>**: Inclusive bounds for calories, protein, fat, carbs, fiber
+    - **sort_by**: calories, protein, fat, carbs, fiber or popularity (default: catalogue order)
+    - **order**: asc or desc
+    - **limit** / **offset**: Page of the matching dishes
+    - Returns: Matching dishes with their nutrition and the total number of matches
+    """
+    bounds = {
+        "calories": (min_calories, max_calories),
+        "protein": (min_protein, max_protein),
+        "fat": (min_fat, max_fat),
+        "carbs": (min_carbs, max_carbs),
+        "fiber": (min_fiber, max_fiber)
+    }
+    filters = {field: {"min": low, "max": high} for field, (low, high) in bounds.items() if (low, high) != (None, None)}
+    try:
+        result = nutrition_service.query_dishes(bounds, sort_by, order == "desc", limit, offset)
+        return FastJSONResponse(content={
+            "success": True,
+            "filters": filters,
+            "sort_by": sort_by,
+            "order": order,
+            "limit": limit,
+            "offset": offset,
+            "total_matches": result["total_matches"],
+            "count": len(result["dishes"]),
+            "dishes": result["dishes"]
+        })
+    
+    except Exception as e:
+        return FastJSONResponse(
+            status_code=500,
+            content={
+                "success": False,
+                "error": f"Nutrition query failed: {str(e)}",
+                "filters": filters
+            }
+        )
+
 @router.get("/nutrition/{dish_name}", response_model=NutritionResponse)
 async def get_nutrition_info(
     dish_name: str,
+    fields: Optional[str] = Query(None, description="Comma-separated response fields to return, e.g. nutrition.calories,serving_info"),
     nutrition_service: NutritionService = Depends(get_nutrition_service)
 ):
     """
     Get detailed nutrition information for a specific dish
     
     - **dish_name**: Name of the dish (e.g., "pho_bo", "pizza", "banh_mi")
+    - **fields**: Only return these fields (dotted paths select nested ones); health suggestions are only
+      evaluated when selected
     - Returns: Comprehensive nutrition data including calories, protein, fat, carbs, and health suggestions
     """
     try:
-        # Get nutrition data from service
-        result = nutrition_service.get_nutrition(dish_name)
+        fieldset = FieldSet.parse(fields, NutritionResponse)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    try:
+        # Exact and normalized names are served from pre-serialized bytes
+        if fieldset.everything:
+            body = nutrition_service.get_nutrition_json(dish_name)
+            if body is not None:
+                return Response(content=body, media_type="application/json")
+        
+        # Get nutrition data from service (fuzzy matching, or a fieldset)
+        result = nutrition_service.get_nutrition(dish_name, with_suggestions=fieldset.wants("suggestions"))
         
         if result.get("success"):
-            return JSONResponse(content=result)
+            if not fieldset.everything:
+                return FastJSONResponse(content=fieldset.select(result))
+            return typed_response(NutritionResponse, result)
         else:
             # Dish not found
             error_response = {
@@ -37,13 +146,13 @@ async def get_nutrition_info(
                 "suggestions": result.get("suggestions", [])
             }
             
-            return JSONResponse(
+            return FastJSONResponse(
                 status_code=404,
                 content=error_response
             )
-            
+    
     except Exception as e:
-        return JSONResponse(
+        return FastJSONResponse(
             status_code=500,
             content={
                 "success": False,
@@ -52,6 +161,49 @@ async def get_nutrition_info(
             }
         )
 
+@router.get("/nutrition/{dish_name}/similar")
+async def get_similar_dishes(
+    dish_name: str,
+    k: int = Query(5, ge=1, le=50, description="Number of similar dishes"),
+    basis: str = Query("serving", pattern="^(serving|100g)$", description="Compare nutrients per serving or per 100g"),
+    lower: List[str] = Query([], description="Only dishes with less of these nutrients (calories, protein, fat, carbs)"),
+    higher: List[str] = Query([], description="Only dishes with more of these nutrients"),
+    nutrition_service: NutritionService = Depends(get_nutrition_service)
+):
+    """
+    Dishes with the closest macronutrient profile (calories, protein, fat, carbs)
+    
+    - **dish_name**: Name of the dish (e.g., "pho_bo", "pizza")
+    - **k**: Number of dishes to return (1-50)
+    - **basis**: "serving" or "100g" (dishes whose serving has no weight are skipped for 100g)
+    - **lower** / **higher**: Constraints relative to the dish, e.g. `lower=calories&higher=protein`
+    - Returns: Similar dishes, nearest first, with their distance and macro profile
+    """
+    try:
+        result = nutrition_service.similar_dishes(dish_name, k, basis, lower, higher)
+        if not result.get("success"):
+            return FastJSONResponse(status_code=404, content=result)
+        return FastJSONResponse(content=result)
+    
+    except ValueError as e:
+        return FastJSONResponse(
+            status_code=400,
+            content={
+                "success": False,
+                "error": str(e),
+                "dish_name": dish_name
+            }
+        )
+    except Exception as e:
+        return FastJSONResponse(
+            status_code=500,
+            content={
+                "success": False,
+                "error": f"Similar dish search failed: {str(e)}",
+                "dish_name": dish_name
+            }
+        )
+
 @router.get("/nutrition/search/dishes")
 async def search_dishes(
     query: str = Query(..., min_length=1, description="Search query for dish names"),
@@ -68,16 +220,16 @@ async def search_dishes(
     try:
         matching_dishes = nutrition_service.search_dishes(query, limit)
         
-        return {
+        return FastJSONResponse(content={
             "success": True,
             "query": query,
             "matches_found": len(matching_dishes),
             "dishes": matching_dishes,
             "total_available": len(nutrition_service.get_all_dishes())
-        }
-        
+        })
+    
     except Exception as e:
-        return JSONResponse(
+        return FastJSONResponse(
             status_code=500,
             content={
                 "success": False,
@@ -97,18 +249,22 @@ async def get_database_summary(
     """
     try:
         summary = nutrition_service.get_nutrition_summary()
-        return {
+        return FastJSONResponse(content={
             "success": True,
             "database_info": summary,
             "endpoints": {
                 "get_nutrition": "/api/nutrition/{dish_name}",
                 "search_dishes": "/api/nutrition/search/dishes?query={search_term}",
+                "autocomplete": "/api/nutrition/autocomplete?q={prefix}",
+                "query": "/api/nutrition/query?max_calories={kcal}&min_protein={grams}&sort_by={nutrient}",
+                "similar": "/api/nutrition/{dish_name}/similar?k={count}&lower={nutrient}",
+                "batch": "POST /api/nutrition/batch",
                 "list_all": "/api/nutrition/database/list"
             }
-        }
-        
+        })
+    
     except Exception as e:
-        return JSONResponse(
+        return FastJSONResponse(
             status_code=500,
             content={
                 "success": False,
@@ -118,54 +274,92 @@ async def get_database_summary(
 
 @router.get("/nutrition/database/list")
 async def list_all_dishes(
-    page: int = Query(1, ge=1, description="Page number"),
+    cursor: Optional[str] = Query(None, description="next_cursor of the previous page"),
+    page: Optional[int] = Query(None, ge=1, description="Page number, for clients without cursors"),
     page_size: int = Query(20, ge=1, le=100, description="Number of dishes per page"),
     nutrition_service: NutritionService = Depends(get_nutrition_service)
 ):
     """
     Get paginated list of all available dishes
     
-    - **page**: Page number (starting from 1)
+    - **cursor**: Opaque cursor from the previous page (omit for the first page)
+    - **page**: Page number (starting from 1), used only without a cursor
     - **page_size**: Number of dishes per page (1-100)
-    - Returns: Paginated list of dish names
+    - Returns: Dish names in name order plus the cursor of the next page; every page of a listing comes from
+      the dataset version of its first page, and `dataset_changed` tells when the data was reloaded meanwhile
     """
     try:
-        all_dishes = nutrition_service.get_all_dishes()
-        total_dishes = len(all_dishes)
-        
-        # Calculate pagination
-        start_index = (page - 1) * page_size
-        end_index = start_index + page_size
-        page_dishes = all_dishes[start_index:end_index]
-        
-        total_pages = (total_dishes + page_size - 1) // page_size
-        
-        return {
-            "success": True,
-            "pagination": {
-                "current_page": page,
-                "page_size": page_size,
-                "total_dishes": total_dishes,
-                "total_pages": total_pages,
-                "has_next": page < total_pages,
-                "has_previous": page > 1
-            },
-            "dishes": page_dishes
+        offset = (page - 1) * page_size if page and not cursor else 0
+        result = nutrition_service.list_dishes(cursor, page_size, offset)
+        pagination = {
+            "page_size": page_size,
+            "total_dishes": result["total_dishes"],
+            "next_cursor": result["next_cursor"],
+            "has_next": result["has_next"],
+            "dataset_version": result["dataset_version"],
+            "current_version": result["current_version"],
+            "dataset_changed": result["dataset_changed"]
         }
+        if page and not cursor:
+            total_pages = (result["total_dishes"] + page_size - 1) // page_size
+            pagination.update(current_page=page, total_pages=total_pages, has_previous=page > 1)
         
+        return FastJSONResponse(content={
+            "success": True,
+            "pagination": pagination,
+            "dishes": result["dishes"]
+        })
+    
+    except ValueError as e:
+        return FastJSONResponse(
+            status_code=400,
+            content={
+                "success": False,
+                "error": str(e)
+            }
+        )
     except Exception as e:
-        return JSONResponse(
+        return FastJSONResponse(
             status_code=500,
             content={
                 "success": False,
                 "error": f"Failed to list dishes: {str(e)}",
                 "pagination": {
-                    "current_page": page,
                     "page_size": page_size
                 }
             }
         )
 
+@router.post("/nutrition/batch")
+async def get_nutrition_batch(
+    request: Union[NutritionBatchRequest, BatchDishNames] = Body(...),
+    nutrition_service: NutritionService = Depends(get_nutrition_service)
+):
+    """
+    Nutrition for many dishes in one request
+    
+    - Body: `{"dishes": [...], "fuzzy": true}`, or just the JSON list of names (fuzzy matching on)
+    - **dishes**: Up to 5000 dish names; each is matched exactly, then by alias, then (if **fuzzy**) to the closest name
+    - Returns: Columns (dish_name, calories, protein, fat, carbs, fiber, serving, dataset_source) with one entry
+      per requested name in request order (null when not found), plus how each name matched
+    """
+    if isinstance(request, list):
+        request = NutritionBatchRequest(dishes=request)
+    
+    try:
+        result = nutrition_service.get_nutrition_batch(request.dishes, request.fuzzy)
+        return FastJSONResponse(content={"success": True, **result})
+    
+    except Exception as e:
+        return FastJSONResponse(
+            status_code=500,
+            content={
+                "success": False,
+                "error": f"Batch lookup failed: {str(e)}",
+                "count": len(request.dishes)
+            }
+        )
+
 @router.get("/nutrition/compare")
 async def compare_nutrition(
     dishes: str = Query(..., description="Comma-separated list of dish names to compare"),
@@ -202,7 +396,7 @@ async def compare_nutrition(
                 })
         
         if not successful_dishes:
-            return JSONResponse(
+            return FastJSONResponse(
                 status_code=404,
                 content={
                     "success": False,
@@ -211,18 +405,18 @@ async def compare_nutrition(
                 }
             )
         
-        return {
+        return FastJSONResponse(content={
             "success": True,
             "comparison": comparison_results,
             "successful_dishes": successful_dishes,
             "failed_dishes": failed_dishes,
             "comparison_count": len(successful_dishes)
-        }
-        
+        })
+    
     except HTTPException:
         raise
     except Exception as e:
-        return JSONResponse(
+        return FastJSONResponse(
             status_code=500,
             content={
                 "success": False,
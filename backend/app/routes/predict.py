@@ -1,96 +1,153 @@
 """
 FastAPI route for food prediction using uploaded images
 """
-from fastapi import APIRouter, UploadFile, File, HTTPException, Depends
-from fastapi.responses import JSONResponse
+from fastapi import APIRouter, UploadFile, File, HTTPException, Depends, Query
 import time
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 
 from app.models.predict_model import PredictionResponse, ErrorResponse
 from app.services.inference_service import get_inference_service, FoodInferenceService
-from app.services.nutrition_service import get_nutrition_service, NutritionService
+from app.services.class_metadata import get_class_metadata, ClassMetadataTable
+from app.services.nutrition_service import get_nutrition_service
+from app.utils.fieldsets import FieldSet
+from app.utils.json_codec import FastJSONResponse, typed_response
 
 router = APIRouter()
 
+ALLOWED_EXTENSIONS = ['.jpg', '.jpeg', '.png']
+MAX_UPLOAD_SIZE = 10 * 1024 * 1024  # 10MB
+
+async def read_image_upload(file: UploadFile) -> bytes:
+    """Validate an uploaded image (extension, size) and return its bytes"""
+    if not file.filename:
+        raise HTTPException(status_code=400, detail="No file uploaded")
+    
+    file_extension = '.' + file.filename.split('.')[-1].lower()
+    
+    if file_extension not in ALLOWED_EXTENSIONS:
+        raise HTTPException(
+            status_code=400, 
+            detail=f"Invalid file format. Supported formats: {', '.join(ALLOWED_EXTENSIONS)}"
+        )
+    
+    # Check file size (limit to 10MB)
+    max_size = MAX_UPLOAD_SIZE
+    content = await file.read()
+    file_size = len(content)
+    
+    if file_size > max_size:
+        raise HTTPException(
+            status_code=400,
+            detail=f"File too large. Maximum size: {max_size // (1024*1024)}MB"
+        )
+    
+    if file_size == 0:
+        raise HTTPException(status_code=400, detail="Empty file uploaded")
+    
+    return content
+
 @router.post("/predict", response_model=PredictionResponse)
 async def predict_food(
     file: UploadFile = File(...),
-    inference_service: FoodInferenceService = Depends(get_inference_service),
-    nutrition_service: NutritionService = Depends(get_nutrition_service)
+    multi_dish: bool = Query(False, description="Detect several dishes in one image (e.g. a whole tray)"),
+    expected_nutrition: bool = Query(False, description="Also return nutrition weighted by the full class probability vector"),
+    explain: bool = Query(False, description="Return a Grad-CAM heatmap for the top-1 class"),
+    explain_format: str = Query("png", pattern="^(png|array)$", description="Heatmap as base64 PNG or low-resolution array"),
+    similar: int = Query(0, ge=0, le=10, description="Also return this many dishes with a similar macro profile to the top-1 class"),
+    fields: Optional[str] = Query(None, description="Comma-separated response fields to compute and return, e.g. class_name,confidence,nutrition.calories"),
+    inference_service: FoodInferenceService = Depends(get_inference_service)
 ):
     """
     Upload an image and get food recognition prediction with nutrition information
     - filetype: Image file: JPG, PNG, JPEG
+    - **multi_dish**: Scan overlapping regions and return one entry per detected dish
+    - **expected_nutrition**: Add a probability-weighted nutrition estimate (useful when the model is unsure)
+    - **explain**: Add a class activation heatmap showing which image regions drove the top-1 class
+    - **similar**: Add dishes with the closest calories / protein / fat / carbs to the top-1 class
+    - **fields**: Only compute and return these fields (dotted paths select nested ones); default: all
     - Returns: Food prediction with confidence, nutrition info, and top 3 predictions
     """
     start_time = time.time()
     
     try:
-        if not file.filename:
-            raise HTTPException(status_code=400, detail="No file uploaded")
-        
-        allowed_extensions = ['.jpg', '.jpeg', '.png']
-        file_extension = '.' + file.filename.split('.')[-1].lower()
+        content = await read_image_upload(file)
         
-        if file_extension not in allowed_extensions:
-            raise HTTPException(
-                status_code=400, 
-                detail=f"Invalid file format. Supported formats: {', '.join(allowed_extensions)}"
-            )
+        try:
+            fieldset = FieldSet.parse(fields, PredictionResponse)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
         
-        # Check file size (limit to 10MB)
-        max_size = 10 * 1024 * 1024  # 10MB
-        file_size = 0
-        content = await file.read()
-        file_size = len(content)
+        if explain and multi_dish:
+            raise HTTPException(status_code=400, detail="explain is only available for single-dish prediction")
         
-        if file_size > max_size:
-            raise HTTPException(
-                status_code=400,
-                detail=f"File too large. Maximum size: {max_size // (1024*1024)}MB"
+        # Make prediction (sections left out of the fieldset are never computed)
+        if multi_dish:
+            prediction_result = inference_service.predict_multi(
+                content,
+                top_k=3 if fieldset.wants("top_3_predictions") else 1,
+                want_detections=fieldset.wants("detections")
+            )
+        else:
+            prediction_result = inference_service.predict(
+                content,
+                explain=explain and fieldset.wants("explanation"),
+                explain_format=explain_format,
+                top_k=3 if fieldset.wants("top_3_predictions") else 1
             )
-        
-        if file_size == 0:
-            raise HTTPException(status_code=400, detail="Empty file uploaded")
-        
-        # Make prediction
-        prediction_result = inference_service.predict(content)
         
         if not prediction_result.get("success"):
             error_msg = prediction_result.get("error", "Prediction failed")
             raise HTTPException(status_code=500, detail=error_msg)
         
-        # Get nutrition information
-        class_name = prediction_result["class_name"]
-        nutrition_result = nutrition_service.get_nutrition(class_name)
-        
-        if nutrition_result.get("success"):
-            nutrition_data = nutrition_result["nutrition"]
-        else:
-            # Fallback nutrition data
-            nutrition_data = {
-                "calories": 200,
-                "protein": 10.0,
-                "fat": 8.0,
-                "carbs": 25.0,
-                "fiber": 3.0
-            }
+        # Nutrition comes from the prebuilt class metadata table, addressed by class index
+        # (fetched after predicting so classes registered meanwhile are already in it)
+        class_metadata = get_class_metadata()
+        top_predictions = [
+            class_metadata.prediction_fragment(pred["class_id"], pred["confidence"])
+            for pred in prediction_result.get("top_3_predictions", [])
+        ]
+        main_prediction = top_predictions[0]
         
         # Prepare response
         response_data = {
             "success": True,
-            "food_name": prediction_result["food_name"],
-            "class_name": prediction_result["class_name"], 
-            "confidence": prediction_result["confidence"],
-            "nutrition": nutrition_data,
-            "top_3_predictions": prediction_result.get("top_3_predictions", []),
+            "food_name": main_prediction["name"],
+            "class_name": main_prediction["class_name"], 
+            "confidence": main_prediction["confidence"],
+            "nutrition": main_prediction["nutrition"],
+            "top_3_predictions": top_predictions,
             "bounding_box": prediction_result.get("bounding_box"),
             "processing_time": round(time.time() - start_time, 3),
             "model_info": prediction_result.get("model_info", "Unknown model")
         }
         
-        return JSONResponse(content=response_data)
+        if similar and fieldset.wants("similar_dishes"):
+            similar_result = get_nutrition_service().similar_dishes(main_prediction["class_name"], similar)
+            response_data["similar_dishes"] = similar_result.get("similar", [])
+        
+        if explain and fieldset.wants("explanation"):
+            response_data["explanation"] = prediction_result.get("explanation")
+        
+        if multi_dish:
+            detections = prediction_result.get("detections", [])
+            for detection in detections:
+                detection["nutrition"] = class_metadata[detection["class_id"]].nutrition
+            if expected_nutrition and (fieldset.wants("expected_nutrition") or detections):
+                # All detections in one batched matrix product
+                expected_rows = class_metadata.expected_nutrition(prediction_result["probabilities"])
+                for detection, expected in zip(detections, expected_rows):
+                    detection["expected_nutrition"] = expected
+                response_data["expected_nutrition"] = expected_rows[0]
+            response_data["detections"] = detections
+            response_data["regions_evaluated"] = prediction_result.get("regions_evaluated", 0)
+        elif expected_nutrition and fieldset.wants("expected_nutrition"):
+            response_data["expected_nutrition"] = class_metadata.expected_nutrition(prediction_result["probabilities"])
         
+        if not fieldset.everything:
+            # A partial payload does not match PredictionResponse, so it is not validated
+            return FastJSONResponse(content=fieldset.select(response_data))
+        return typed_response(PredictionResponse, response_data)
+    
     except HTTPException:
         raise
     except Exception as e:
@@ -107,14 +164,15 @@ async def predict_food(
             }
         }
         
-        return JSONResponse(
+        return FastJSONResponse(
             status_code=500,
             content=error_response
         )
 
 @router.get("/predict/status")
 async def get_prediction_status(
-    inference_service: FoodInferenceService = Depends(get_inference_service)
+    inference_service: FoodInferenceService = Depends(get_inference_service),
+    class_metadata: ClassMetadataTable = Depends(get_class_metadata)
 ):
     """
     Get the current status of the prediction service
@@ -127,6 +185,7 @@ async def get_prediction_status(
             "success": True,
             "status": "ready" if status["model_loaded"] else "not_ready",
             "model_info": status,
+            "class_metadata": class_metadata.get_status(),
             "supported_formats": ["jpg", "jpeg", "png"],
             "max_file_size_mb": 10,
             "image_dimensions": "224x224 (auto-resized)"
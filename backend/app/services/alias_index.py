@@ -0,0 +1,65 @@
+"""
+Alias index for dish names
+Maps accent-free, case- and separator-insensitive forms of dish names, display names and
+curated aliases (e.g. "phở bò", "Pho-Bo", "beef pho") to the canonical dish name
+"""
+import csv
+import re
+import unicodedata
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from app.services.display_names import get_display_name
+
+_SEPARATORS = re.compile(r'[^a-z0-9]+')
+
+def fold_text(text: str) -> str:
+    """Lowercase, strip Vietnamese diacritics and collapse separators: "Bún Bò Huế" -> "bun_bo_hue" """
+    # đ has no combining-mark decomposition, so it is mapped by hand
+    text = text.lower().replace('đ', 'd')
+    text = unicodedata.normalize('NFD', text).encode('ascii', 'ignore').decode('ascii')
+    return _SEPARATORS.sub('_', text).strip('_')
+
+def load_alias_csv(path: str) -> List[Tuple[str, str]]:
+    """(alias, dish_name) rows from a CSV with those two columns"""
+    with open(path, newline='', encoding='utf-8') as f:
+        return [
+            (row['alias'].strip(), row['dish_name'].strip())
+            for row in csv.DictReader(f)
+            if row.get('alias') and row.get('dish_name')
+        ]
+
+class AliasIndex:
+    """Folded alias -> canonical dish name, built once per catalogue"""
+    
+    def __init__(self, names: Iterable[str], aliases: Iterable[Tuple[str, str]] = ()):
+        names = list(names)
+        known = set(names)
+        self._aliases: Dict[str, str] = {}
+        
+        # Lowest priority first, so later sources overwrite: display names, curated aliases, canonical names
+        for name in names:
+            self._add(get_display_name(name), name)
+        self.unknown_targets = []
+        for alias, dish_name in aliases:
+            if dish_name in known:
+                self._add(alias, dish_name)
+            else:
+                self.unknown_targets.append(dish_name)
+        for name in names:
+            self._add(name, name)
+    
+    def _add(self, alias: str, dish_name: str):
+        key = fold_text(alias)
+        if key:
+            self._aliases[key] = dish_name
+    
+    def __len__(self) -> int:
+        return len(self._aliases)
+    
+    def items(self) -> List[Tuple[str, str]]:
+        """(folded alias, dish name) pairs"""
+        return list(self._aliases.items())
+    
+    def resolve(self, text: str) -> Optional[str]:
+        """Canonical dish name for any known spelling, or None"""
+        return self._aliases.get(fold_text(text))
@@ -0,0 +1,106 @@
+"""
+Class metadata table joining the model's class mapping, display names and nutrition
+Built once so the prediction path goes from class index to response fragment without string processing
+"""
+from typing import Dict, Any, List, NamedTuple, Sequence, Tuple, Union
+import numpy as np
+
+from app.services.inference_service import get_inference_service
+from app.services.nutrition_service import get_nutrition_service, NutritionService, NUTRIENT_FIELDS, DEFAULT_NUTRITION
+
+class ClassMetadata(NamedTuple):
+    """Everything the API returns about one model class"""
+    class_id: int
+    class_name: str
+    name: str
+    nutrition: Dict[str, float]
+    has_nutrition: bool
+
+class ClassMetadataTable:
+    """Immutable, index-addressable table of class metadata"""
+    
+    def __init__(self, class_names: Sequence[str], display_names: Sequence[str], nutrition_service: NutritionService, version: Any = 0):
+        self.version = version
+        entries = []
+        missing = []
+        
+        for class_id, (class_name, display_name) in enumerate(zip(class_names, display_names)):
+            nutrition_result = nutrition_service.get_nutrition(class_name)
+            # Only exact matches count; a fuzzy match would silently attach another dish's nutrition
+            has_nutrition = bool(nutrition_result.get("success")) and nutrition_result["dish_name"] == class_name
+            if has_nutrition:
+                nutrition = dict(nutrition_result["nutrition"])
+            else:
+                nutrition = dict(DEFAULT_NUTRITION)
+                missing.append(class_name)
+            entries.append(ClassMetadata(class_id, class_name, display_name, nutrition, has_nutrition))
+        
+        self.entries: Tuple[ClassMetadata, ...] = tuple(entries)
+        self.missing_nutrition: Tuple[str, ...] = tuple(missing)
+        
+        # Class x nutrient matrix for probability-weighted estimates
+        self.nutrient_matrix = np.array(
+            [[entry.nutrition[field] for field in NUTRIENT_FIELDS] for entry in self.entries],
+            dtype=np.float64
+        ).reshape(len(self.entries), len(NUTRIENT_FIELDS))
+        self.nutrient_matrix.setflags(write=False)
+        
+        if missing:
+            print(f"Warning: {len(missing)} classes have no nutrition entry, using defaults: {missing}")
+        print(f"Built class metadata table for {len(self.entries)} classes")
+    
+    def __len__(self) -> int:
+        return len(self.entries)
+    
+    def __getitem__(self, class_id: int) -> ClassMetadata:
+        return self.entries[class_id]
+    
+    def prediction_fragment(self, class_id: int, confidence: float) -> Dict[str, Any]:
+        """Response fragment for one predicted class (shares the nutrition dict, callers must not mutate it)"""
+        entry = self.entries[class_id]
+        return {
+            "class_id": entry.class_id,
+            "class_name": entry.class_name,
+            "name": entry.name,
+            "confidence": confidence,
+            "nutrition": entry.nutrition
+        }
+    
+    def expected_nutrition(self, probabilities: np.ndarray) -> Union[Dict[str, float], List[Dict[str, float]]]:
+        """Probability-weighted nutrition: one matrix product for a single vector or a batch of rows"""
+        probabilities = np.asarray(probabilities, dtype=np.float64)
+        # Renormalize in case the probabilities do not sum exactly to 1
+        totals = probabilities.sum(axis=-1, keepdims=True)
+        expected = np.round((probabilities @ self.nutrient_matrix) / np.where(totals > 0, totals, 1.0), 1)
+        
+        if expected.ndim == 1:
+            return dict(zip(NUTRIENT_FIELDS, expected.tolist()))
+        return [dict(zip(NUTRIENT_FIELDS, row)) for row in expected.tolist()]
+    
+    def get_status(self) -> Dict[str, Any]:
+        """Summary of the join, for status endpoints"""
+        return {
+            "classes": len(self.entries),
+            "classes_with_nutrition": len(self.entries) - len(self.missing_nutrition),
+            "missing_nutrition": list(self.missing_nutrition)
+        }
+
+# Global class metadata instance
+class_metadata = None
+
+def get_class_metadata() -> ClassMetadataTable:
+    """Get the class metadata table, rebuilding it when the class list or the nutrition data has changed (singleton pattern)"""
+    global class_metadata
+    inference_service = get_inference_service()
+    nutrition_service = get_nutrition_service()
+    if class_metadata is None or class_metadata.version != (inference_service.classes_version, nutrition_service.version):
+        # Registered extra classes carry their own nutrition (no-op when already added)
+        for class_name, nutrition in inference_service.prototype_nutrition.items():
+            nutrition_service.add_dish(class_name, nutrition)
+        class_metadata = ClassMetadataTable(
+            inference_service.class_names,
+            inference_service.display_names,
+            nutrition_service,
+            version=(inference_service.classes_version, nutrition_service.version)
+        )
+    return class_metadata
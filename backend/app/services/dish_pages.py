@@ -0,0 +1,82 @@
+"""
+Cursor pagination over sorted snapshots of the dish names
+A cursor is an opaque token holding the dataset version it was issued for and the last name it returned, so the next
+page is a binary search and a slice of the same snapshot, and clients can tell when the data was reloaded meanwhile
+"""
+import base64
+import bisect
+import threading
+from collections import OrderedDict
+from typing import Dict, Any, Callable, List, NamedTuple, Optional
+
+from app.utils.json_codec import dumps, loads
+
+# Sorted names of this many recent versions are kept, so a client paging through the list while the data is
+# reloaded keeps getting pages of the version it started on
+KEEP_VERSIONS = 4
+
+class PageCursor(NamedTuple):
+    """Position after `after` in the sorted names of dataset `version`"""
+    version: int
+    after: str
+
+def encode_cursor(cursor: PageCursor) -> str:
+    return base64.urlsafe_b64encode(dumps([cursor.version, cursor.after])).decode('ascii').rstrip('=')
+
+def decode_cursor(token: str) -> PageCursor:
+    """Parse a token from encode_cursor(); anything else raises ValueError"""
+    try:
+        version, after = loads(base64.urlsafe_b64decode(token + '=' * (-len(token) % 4)))
+    except Exception:
+        raise ValueError(f"Invalid cursor: {token!r}")
+    if not isinstance(version, int) or not isinstance(after, str):
+        raise ValueError(f"Invalid cursor: {token!r}")
+    return PageCursor(version, after)
+
+class NamePages:
+    """Sorted dish names of the most recent dataset versions, sorted once per version and paged by cursor"""
+    
+    def __init__(self, keep: int = KEEP_VERSIONS):
+        self.keep = keep
+        self._snapshots: "OrderedDict[int, List[str]]" = OrderedDict()  # version -> sorted names, oldest first
+        self._lock = threading.Lock()
+    
+    def snapshot(self, version: int, load: Callable[[], List[str]]) -> List[str]:
+        """Sorted names of `version`; load() returns its names the first time the version is asked for"""
+        names = self._snapshots.get(version)
+        if names is None:
+            names = sorted(load())
+            with self._lock:
+                names = self._snapshots.setdefault(version, names)
+                while len(self._snapshots) > self.keep:
+                    self._snapshots.popitem(last=False)
+        return names
+    
+    def page(self, version: int, load: Callable[[], List[str]], cursor: Optional[str] = None, limit: int = 20,
+             offset: int = 0) -> Dict[str, Any]:
+        """`limit` names after the cursor (or from `offset` of the current version when there is none); pages
+        continue on the cursor's version while it is kept, and on the current one by name after that"""
+        served = version
+        if cursor:
+            position = decode_cursor(cursor)
+            names = self._snapshots.get(position.version)
+            if names is not None:
+                served = position.version
+            else:
+                names = self.snapshot(version, load)
+            start = bisect.bisect_right(names, position.after)
+        else:
+            names = self.snapshot(version, load)
+            start = offset
+        dishes = names[start:start + limit]
+        has_next = start + len(dishes) < len(names)
+        return {
+            "dishes": dishes,
+            "total_dishes": len(names),
+            "next_cursor": encode_cursor(PageCursor(served, dishes[-1])) if has_next and dishes else None,
+            "has_next": has_next,
+            "dataset_version": served,
+            "current_version": version,
+            # The data was reloaded since the first page: later pages may differ from a fresh listing
+            "dataset_changed": bool(cursor) and position.version != version
+        }
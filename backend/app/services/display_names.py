@@ -0,0 +1,45 @@
+"""
+Display names for recognized food classes
+"""
+
+# Vietnamese dishes keep their proper diacritics
+VIETNAMESE_DISPLAY_NAMES = {
+    "banh_beo": "Bánh Bèo",
+    "banh_bot_loc": "Bánh Bột Lọc",
+    "banh_can": "Bánh Căn",
+    "banh_canh": "Bánh Canh",
+    "banh_chung": "Bánh Chưng",
+    "banh_cuon": "Bánh Cuốn",
+    "banh_duc": "Bánh Đúc",
+    "banh_gio": "Bánh Giò",
+    "banh_khot": "Bánh Khọt",
+    "banh_mi": "Bánh Mì",
+    "banh_pia": "Bánh Pía",
+    "banh_tet": "Bánh Tét",
+    "banh_trang_nuong": "Bánh Tráng Nướng",
+    "banh_xeo": "Bánh Xèo",
+    "bun_bo_hue": "Bún Bò Huế",
+    "bun_dau_mam_tom": "Bún Đậu Mắm Tôm",
+    "bun_mam": "Bún Mắm",
+    "bun_rieu": "Bún Riêu",
+    "bun_thit_nuong": "Bún Thịt Nướng",
+    "cao_lau": "Cao Lầu",
+    "com_tam": "Cơm Tấm",
+    "goi_cuon": "Gỏi Cuốn",
+    "hu_tieu": "Hủ Tiếu",
+    "mi_quang": "Mì Quảng",
+    "nem_lui": "Nem Lụi",
+    "nem_ran": "Nem Rán",
+    "pho_bo": "Phở Bò",
+    "pho_ga": "Phở Gà",
+    "xoi_man": "Xôi Mặn",
+    "xoi_xeo": "Xôi Xéo"
+}
+
+def get_display_name(class_name: str) -> str:
+    """Convert class name to display name"""
+    if class_name in VIETNAMESE_DISPLAY_NAMES:
+        return VIETNAMESE_DISPLAY_NAMES[class_name]
+    
+    # For other dishes, convert underscores to spaces and title case
+    return class_name.replace('_', ' ').title()
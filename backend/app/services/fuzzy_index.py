@@ -0,0 +1,90 @@
+"""
+Fuzzy dish name matching with a character trigram inverted index
+Candidates come from the postings of the query's trigrams only, then are ranked like difflib.get_close_matches
+"""
+import difflib
+import heapq
+from collections import defaultdict
+from functools import lru_cache
+from typing import Dict, Iterable, List, Sequence, Tuple
+import numpy as np
+
+def _trigrams(text: str) -> List[str]:
+    """Distinct character trigrams of a padded string"""
+    padded = f"$${text}$"
+    return list({padded[i:i + 3] for i in range(len(padded) - 2)})
+
+def rank_candidates(query: str, candidates: Iterable[str], limit: int, cutoff: float) -> List[str]:
+    """Rank candidate names with the same scoring and tie-breaking as difflib.get_close_matches"""
+    matcher = difflib.SequenceMatcher()
+    matcher.set_seq2(query)
+    scored = []
+    for name in candidates:
+        matcher.set_seq1(name)
+        if matcher.real_quick_ratio() >= cutoff and matcher.quick_ratio() >= cutoff and matcher.ratio() >= cutoff:
+            scored.append((matcher.ratio(), name))
+    return [name for _, name in heapq.nlargest(limit, scored)]
+
+# Catalogues up to this size are reranked in full, which keeps results identical to difflib
+EXHAUSTIVE_LIMIT = 2000
+
+class FuzzyIndex:
+    """Trigram inverted index over a fixed list of names, with an LRU for recent queries"""
+    
+    def __init__(self, names: Sequence[str], candidate_factor: int = 10, min_candidates: int = 50,
+                 exhaustive_limit: int = EXHAUSTIVE_LIMIT, cache_size: int = 4096):
+        self.names = list(names)
+        self.candidate_factor = candidate_factor
+        self.min_candidates = min_candidates
+        self.exhaustive = len(self.names) <= exhaustive_limit
+        
+        postings: Dict[str, List[int]] = defaultdict(list)
+        trigram_counts = np.empty(len(self.names), dtype=np.int32)
+        for name_id, name in enumerate(self.names):
+            grams = _trigrams(name)
+            trigram_counts[name_id] = len(grams)
+            for gram in grams:
+                postings[gram].append(name_id)
+        
+        self._postings = {gram: np.array(ids, dtype=np.int32) for gram, ids in postings.items()}
+        self._trigram_counts = trigram_counts
+        # Caches hits and misses alike (a miss is an empty tuple)
+        self._cached_search = lru_cache(maxsize=cache_size)(self._search)
+    
+    def __len__(self) -> int:
+        return len(self.names)
+    
+    def search(self, query: str, limit: int = 5, cutoff: float = 0.3) -> List[str]:
+        """Up to `limit` names with difflib similarity >= cutoff, best first"""
+        return list(self._cached_search(query, limit, cutoff))
+    
+    def cache_info(self):
+        return self._cached_search.cache_info()
+    
+    def cache_clear(self):
+        self._cached_search.cache_clear()
+    
+    def _candidates(self, query: str, limit: int) -> np.ndarray:
+        """Name ids sharing the most trigrams with the query (Dice coefficient)"""
+        if self.exhaustive:
+            return np.arange(len(self.names), dtype=np.int32)
+        
+        grams = _trigrams(query)
+        lists = [self._postings[gram] for gram in grams if gram in self._postings]
+        if not lists:
+            return np.empty(0, dtype=np.int32)
+        
+        # Counting into a dense array is cheaper than sorting the postings once common trigrams make them long
+        shared = np.bincount(np.concatenate(lists), minlength=len(self.names))
+        ids = np.flatnonzero(shared).astype(np.int32)
+        dice = 2.0 * shared[ids] / (len(grams) + self._trigram_counts[ids])
+        
+        keep = max(limit * self.candidate_factor, self.min_candidates)
+        if len(ids) > keep:
+            top = np.argpartition(dice, -keep)[-keep:]
+            ids = ids[top]
+        return ids
+    
+    def _search(self, query: str, limit: int, cutoff: float) -> Tuple[str, ...]:
+        candidates = [self.names[name_id] for name_id in self._candidates(query, limit).tolist()]
+        return tuple(rank_candidates(query, candidates, limit, cutoff))
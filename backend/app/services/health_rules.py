@@ -0,0 +1,186 @@
+"""
+Health suggestions from a data-driven rule table
+The rules are compiled once and evaluated with vectorized comparisons over the whole catalogue when a dataset is
+built, so a lookup only picks up the suggestions already stored for its dish
+"""
+import csv
+import operator
+from functools import lru_cache
+from typing import Dict, Any, List, Mapping, NamedTuple, Sequence, Tuple
+import numpy as np
+
+from app.services.nutrition_table import NutritionTable, NUTRIENT_FIELDS
+
+# How the rules of one output combine
+MODE_FIRST = "first"  # the first matching rule (in table order) sets the output and adds its recommendation
+MODE_SUM = "sum"  # every matching rule adds its value, giving a score later rules can compare like a nutrient
+
+# The operator functions compare a scalar or a whole NumPy column alike
+OPERATORS = {"<": operator.lt, "<=": operator.le, ">": operator.gt, ">=": operator.ge}
+ALWAYS = "*"  # matches every dish; the usual last rule of a "first" output
+
+DIETARY_NOTES = "Nutritional values are estimates per serving"
+
+class HealthRule(NamedTuple):
+    """One row of the rule table"""
+    output: str
+    mode: str
+    field: str
+    op: str
+    threshold: float
+    value: str
+    recommendation: str
+
+# The thresholds the suggestions have always used; data/health_rules.csv holds the same table for editing
+DEFAULT_RULES = [
+    HealthRule("calorie_category", MODE_FIRST, "calories", "<", 200, "low", "Light meal - consider pairing with other dishes"),
+    HealthRule("calorie_category", MODE_FIRST, "calories", "<", 400, "moderate", "Moderate caloric content - suitable for most meal plans"),
+    HealthRule("calorie_category", MODE_FIRST, "calories", ALWAYS, 0, "high", "High caloric content - consider portion control"),
+    HealthRule("protein_level", MODE_FIRST, "protein", ">=", 15, "excellent", "Excellent source of protein"),
+    HealthRule("protein_level", MODE_FIRST, "protein", ">=", 8, "good", "Good source of protein"),
+    HealthRule("protein_level", MODE_FIRST, "protein", ALWAYS, 0, "low", "Consider adding protein-rich foods"),
+    HealthRule("fat_note", MODE_FIRST, "fat", ">", 20, "", "High fat content - balance with vegetables"),
+    HealthRule("fat_note", MODE_FIRST, "fat", "<", 5, "", "Low fat content - good for low-fat diets"),
+    HealthRule("carb_note", MODE_FIRST, "carbs", ">", 50, "", "High carbohydrate content - good for energy"),
+    HealthRule("carb_note", MODE_FIRST, "carbs", "<", 15, "", "Low carbohydrate content - suitable for low-carb diets"),
+    HealthRule("health_score", MODE_SUM, "calories", "<=", 400, "1", ""),
+    HealthRule("health_score", MODE_SUM, "protein", ">=", 10, "1", ""),
+    HealthRule("health_score", MODE_SUM, "fat", "<=", 15, "1", ""),
+    HealthRule("health_score", MODE_SUM, "carbs", "<=", 50, "1", ""),
+    HealthRule("health_level", MODE_FIRST, "health_score", ">=", 3, "high", ""),
+    HealthRule("health_level", MODE_FIRST, "health_score", ">=", 2, "moderate", ""),
+    HealthRule("health_level", MODE_FIRST, "health_score", ALWAYS, 0, "low", ""),
+]
+
+def load_rules_csv(path: str) -> List[HealthRule]:
+    """Rules from a CSV with columns output, mode, field, op, threshold, value, recommendation"""
+    with open(path, newline='', encoding='utf-8') as f:
+        rules = []
+        for line, row in enumerate(csv.DictReader(f), start=2):
+            if not (row.get('output') or '').strip():
+                continue
+            op = row['op'].strip()
+            try:
+                threshold = float(row['threshold']) if op != ALWAYS else 0.0
+            except (TypeError, ValueError):
+                raise ValueError(f"{path}:{line}: threshold must be a number, got {row['threshold']!r}")
+            rules.append(HealthRule(
+                row['output'].strip(), (row.get('mode') or MODE_FIRST).strip(), row['field'].strip(), op, threshold,
+                (row.get('value') or '').strip(), (row.get('recommendation') or '').strip()
+            ))
+        return rules
+
+class HealthSuggestions:
+    """Suggestions of every dish in a table: dishes map to one of the few distinct rule outcomes"""
+    
+    def __init__(self, outcomes: List[Dict[str, Any]], row_outcome: np.ndarray):
+        self.outcomes = outcomes
+        self.row_outcome = row_outcome
+    
+    def __len__(self) -> int:
+        return len(self.row_outcome)
+    
+    def for_row(self, row: int) -> Dict[str, Any]:
+        outcome = self.outcomes[self.row_outcome[row]]
+        # Outcomes are shared between dishes, so callers get their own copy
+        return dict(outcome, recommendations=list(outcome["recommendations"]))
+
+class HealthRuleTable:
+    """Validated rules grouped by output, ready for bulk evaluation"""
+    
+    def __init__(self, rules: Sequence[HealthRule], cache_size: int = 4096):
+        self.rules = list(rules)
+        self.groups: Dict[str, List[int]] = {}
+        self.modes: Dict[str, str] = {}
+        for index, rule in enumerate(self.rules):
+            if rule.mode not in (MODE_FIRST, MODE_SUM):
+                raise ValueError(f"Rule {index + 1}: unknown mode {rule.mode!r}")
+            if rule.op != ALWAYS and rule.op not in OPERATORS:
+                raise ValueError(f"Rule {index + 1}: unknown operator {rule.op!r}")
+            if self.modes.setdefault(rule.output, rule.mode) != rule.mode:
+                raise ValueError(f"Rule {index + 1}: {rule.output} mixes {self.modes[rule.output]} and {rule.mode} rules")
+            if rule.field not in NUTRIENT_FIELDS and self.modes.get(rule.field) != MODE_SUM:
+                raise ValueError(f"Rule {index + 1}: {rule.field} is neither a nutrient nor an earlier score")
+            if rule.output in self.groups and rule.output != self.rules[index - 1].output:
+                raise ValueError(f"Rule {index + 1}: the rules of {rule.output} must be consecutive")
+            if rule.mode == MODE_SUM:
+                if rule.recommendation:
+                    raise ValueError(f"Rule {index + 1}: score rules cannot carry recommendations")
+                try:
+                    float(rule.value)
+                except ValueError:
+                    raise ValueError(f"Rule {index + 1}: score rules need a numeric value, got {rule.value!r}")
+            self.groups.setdefault(rule.output, []).append(index)
+        # "first" outputs in table order; those with values appear in the suggestions, the others only recommend
+        self.first_outputs = [output for output, mode in self.modes.items() if mode == MODE_FIRST]
+        self.valued_outputs = {output for output in self.first_outputs if any(self.rules[i].value for i in self.groups[output])}
+        if (len(self.rules) + 1) ** len(self.first_outputs) >= 2 ** 63:
+            raise ValueError("Too many rules and outputs to evaluate in bulk")
+        # Single-record lookups (SQLite backend, runtime-added dishes) keep asking about the same few dishes
+        self._cached_suggest = lru_cache(maxsize=cache_size)(self._suggest)
+    
+    def evaluate(self, table: NutritionTable) -> HealthSuggestions:
+        """Evaluate every rule once over whole columns, then describe each distinct outcome once"""
+        size = len(table)
+        values = dict(table.columns)
+        # One key per dish packs the matched rule of every "first" output: digit j (base len(rules) + 1) is
+        # the rule index + 1 for output j, 0 when none matched
+        base = len(self.rules) + 1
+        keys = np.zeros(size, dtype=np.int64)
+        for output, indices in self.groups.items():
+            if self.modes[output] == MODE_SUM:
+                score = np.zeros(size, dtype=np.float64)
+                for index in indices:
+                    rule = self.rules[index]
+                    score += float(rule.value) * (OPERATORS[rule.op](values[rule.field], rule.threshold) if rule.op != ALWAYS else 1.0)
+                values[output] = score
+            else:
+                chosen = np.full(size, -1, dtype=np.int64)
+                # Last rule first, so earlier rules overwrite later ones: the first match wins
+                for index in reversed(indices):
+                    rule = self.rules[index]
+                    if rule.op == ALWAYS:
+                        chosen.fill(index)
+                    else:
+                        chosen[OPERATORS[rule.op](values[rule.field], rule.threshold)] = index
+                keys += (chosen + 1) * base ** self.first_outputs.index(output)
+        
+        unique, row_outcome = np.unique(keys, return_inverse=True)
+        outcomes = [
+            self._describe([key // base ** j % base - 1 for j in range(len(self.first_outputs))])
+            for key in unique.tolist()
+        ]
+        return HealthSuggestions(outcomes, row_outcome.reshape(-1).astype(np.int32))
+    
+    def suggest(self, nutrition_data: Mapping[str, Any]) -> Dict[str, Any]:
+        """Suggestions for a single record (missing nutrients count as 0), with the same rules in plain Python"""
+        outcome = self._cached_suggest(tuple(float(nutrition_data.get(field) or 0.0) for field in NUTRIENT_FIELDS))
+        return dict(outcome, recommendations=list(outcome["recommendations"]))
+    
+    def _suggest(self, nutrients: Tuple[float, ...]) -> Dict[str, Any]:
+        values = dict(zip(NUTRIENT_FIELDS, nutrients))
+        codes = []
+        for output, indices in self.groups.items():
+            matched = [
+                index for index in indices
+                if self.rules[index].op == ALWAYS
+                or OPERATORS[self.rules[index].op](values[self.rules[index].field], self.rules[index].threshold)
+            ]
+            if self.modes[output] == MODE_SUM:
+                values[output] = sum(float(self.rules[index].value) for index in matched)
+            else:
+                codes.append(matched[0] if matched else -1)
+        return self._describe(codes)
+    
+    def _describe(self, codes: Sequence[int]) -> Dict[str, Any]:
+        suggestions: Dict[str, Any] = {}
+        recommendations = []
+        for output, code in zip(self.first_outputs, codes):
+            rule = self.rules[code] if code >= 0 else None
+            if output in self.valued_outputs:
+                suggestions[output] = rule.value if rule is not None else None
+            if rule is not None and rule.recommendation:
+                recommendations.append(rule.recommendation)
+        suggestions["recommendations"] = recommendations
+        suggestions["dietary_notes"] = DIETARY_NOTES
+        return suggestions
@@ -13,9 +13,15 @@ from tensorflow import keras
 # from tensorflow.keras.models import Model
 from PIL import Image
 import io
-from typing import Tuple, Dict, Any, Optional
+import base64
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Tuple, Dict, Any, Optional, List
 from tensorflow.keras.applications.resnet50 import preprocess_input
 
+from app.services.display_names import get_display_name
+
 class FoodInferenceService:
     """Service for food recognition using trained ML model"""
     
@@ -26,16 +32,50 @@ class FoodInferenceService:
         self.model_path = model_path or os.path.join(base_dir, "ml_models", "best_model_phase2.keras")
         self.class_mapping_path = class_mapping_path or os.path.join(base_dir, "ml_models", "final_class_mapping.json")
         self.model = None
+        self.feature_model = None  # same network, outputs (penultimate features, class probabilities)
+        self._forward = None
+        self._forward_features = None
+        self.embedding_dim = None
         self.class_mapping = {}
+        self.class_names = []  # class index -> class name, aligned with the model output
+        self.display_names = []  # class index -> display name
         self.model_type = None
         self.img_height = 224
         self.img_width = 224
         
+        # Multi-dish (tiling) settings
+        self.tile_scales = (0.75, 0.5, 0.35)  # window side as a fraction of the short image side
+        self.tile_overlap = 0.5
+        self.tile_max_side = 1024  # decoded images are downscaled to this before cropping
+        self.detection_threshold = 0.35
+        self.nms_iou_threshold = 0.3
+        self.max_detections = 6
+        
+        # Extra classes registered from example images, scored by nearest prototype
+        self.prototypes_path = os.getenv("PROTOTYPE_CLASSES_PATH", os.path.join(base_dir, "ml_models", "prototype_classes.json"))
+        self.num_base_classes = 0
+        self.prototype_matrix = None  # (extra classes, embedding_dim), L2-normalized
+        self.prototype_nutrition = {}  # class name -> nutrition supplied at registration
+        self.prototype_temperature = 20.0
+        self.prototype_threshold = 0.75  # cosine similarity at which an extra class takes half the mass
+        self.classes_version = 0  # bumped whenever the class list changes
+        
+        # Grad-CAM explanations
+        self._gradcam_step = None
+        self.heatmap_png_size = 112
+        self.heatmap_cache_size = 256
+        self._heatmap_cache = OrderedDict()  # image hash -> (explained class id, low-res heatmap)
+        self._heatmap_lock = threading.Lock()
+        self._prototype_lock = threading.Lock()
+        
         # Load class mapping
         self._load_class_mapping()
         
         # Load model
         self._load_model()
+        
+        # Load registered extra classes
+        self._load_prototypes()
     
     def _load_class_mapping(self):
         """Load class mapping from JSON file"""
@@ -54,7 +94,11 @@ class FoodInferenceService:
             print(f"Error loading trained model: {e}")
 
             self.class_mapping = {i: f"class_{i}" for i in range(131)}
-
+        
+        num_classes = max(self.class_mapping) + 1 if self.class_mapping else 0
+        self.class_names = [self.class_mapping.get(i, f"class_{i}") for i in range(num_classes)]
+        self.display_names = [get_display_name(class_name) for class_name in self.class_names]
+        self.num_base_classes = num_classes
     
     def _load_model(self):
         print("Loading ML model...")
@@ -77,6 +121,9 @@ class FoodInferenceService:
                 _ = self.model.predict(test_input, verbose=0)
                 print("Model prediction test successful")
                 self.model_type = "trained_model"
+                self._build_feature_model()
+                self._build_explain_model()
+                self._build_forward_functions()
                 return
                 
             except Exception as e:
@@ -84,13 +131,84 @@ class FoodInferenceService:
         
 
     
+    def _build_feature_model(self):
+        """Expose the ResNet50 pooled features next to the classifier output, sharing all weights"""
+        try:
+            feature_layer = None
+            for layer in reversed(self.model.layers[:-1]):
+                if isinstance(layer, keras.layers.GlobalAveragePooling2D):
+                    feature_layer = layer
+                    break
+            if feature_layer is None:
+                feature_layer = self.model.layers[-2]
+            
+            self.feature_model = keras.Model(
+                inputs=self.model.inputs,
+                outputs=[feature_layer.output, self.model.outputs[0]]
+            )
+            self.embedding_dim = int(feature_layer.output.shape[-1])
+            print(f"Feature model ready ({feature_layer.name}, {self.embedding_dim} dims)")
+        except Exception as e:
+            print(f"Error building feature model: {e}")
+    
+    def _build_explain_model(self):
+        """Trace one function that runs the forward pass and the Grad-CAM gradient together"""
+        try:
+            # Last spatial feature map: the input of the global pooling layer, or the last 4D layer output
+            # (a nested ResNet50 sub-model exposes only its inner graph tensors, so it is skipped)
+            conv_maps = None
+            for layer in reversed(self.model.layers):
+                if isinstance(layer, keras.layers.GlobalAveragePooling2D):
+                    conv_maps = layer.input
+                    break
+                if not isinstance(layer, keras.Model) and len(layer.output.shape) == 4:
+                    conv_maps = layer.output
+                    break
+            if conv_maps is None:
+                raise ValueError("No convolutional feature map found")
+            
+            # Pooled features ride along so registered prototype classes can be scored from the same pass
+            if self.feature_model is not None:
+                outputs = [conv_maps] + list(self.feature_model.outputs)
+            else:
+                outputs = [conv_maps, self.model.outputs[0], self.model.outputs[0]]
+            explain_model = keras.Model(inputs=self.model.inputs, outputs=outputs)
+            
+            @tf.function
+            def gradcam_step(images):
+                with tf.GradientTape() as tape:
+                    conv_maps, features, probabilities = explain_model(images, training=False)
+                    top_scores = tf.reduce_max(probabilities, axis=1)
+                grads = tape.gradient(top_scores, conv_maps)
+                channel_weights = tf.reduce_mean(grads, axis=(1, 2))
+                cams = tf.nn.relu(tf.einsum('bhwc,bc->bhw', conv_maps, channel_weights))
+                return cams, features, probabilities
+            
+            self._gradcam_step = gradcam_step
+            print(f"Grad-CAM ready (feature map {tuple(conv_maps.shape[1:])})")
+        except Exception as e:
+            print(f"Error building Grad-CAM model: {e}")
+    
+    def _build_forward_functions(self):
+        """Traced forward passes; Model.predict adds far more per-call overhead than one batch costs"""
+        self._forward = tf.function(lambda images: self.model(images, training=False), reduce_retracing=True)
+        if self.feature_model is not None:
+            self._forward_features = tf.function(
+                lambda images: self.feature_model(images, training=False), reduce_retracing=True
+            )
+    
+    def _decode_image(self, image_bytes: bytes) -> Image.Image:
+        """Decode uploaded bytes into an RGB PIL image"""
+        image = Image.open(io.BytesIO(image_bytes))
+        # Convert to RGB
+        if image.mode != 'RGB':
+            image = image.convert('RGB')
+        return image
+    
     def preprocess_image(self, image_bytes: bytes) -> np.ndarray:
         """Preprocess image for model input"""
         try:
-            image = Image.open(io.BytesIO(image_bytes))
-            # Convert to RGB
-            if image.mode != 'RGB':
-                image = image.convert('RGB')
+            image = self._decode_image(image_bytes)
             image = image.resize((self.img_width, self.img_height))
             
             # Convert to numpy array
@@ -105,8 +223,8 @@ class FoodInferenceService:
         except Exception as e:
             raise ValueError(f"Error preprocessing image: {str(e)}")
     
-    def predict(self, image_bytes: bytes) -> Dict[str, Any]:
-        """Make prediction on uploaded image"""
+    def predict(self, image_bytes: bytes, explain: bool = False, explain_format: str = "png", top_k: int = 3) -> Dict[str, Any]:
+        """Make prediction on uploaded image (optionally with a Grad-CAM heatmap for the top class)"""
         start_time = time.time()
         
         try:
@@ -114,9 +232,14 @@ class FoodInferenceService:
                 raise RuntimeError("Model not loaded")
             # Preprocess image
             processed_image = self.preprocess_image(image_bytes)
+            image_width, image_height = Image.open(io.BytesIO(image_bytes)).size
             
             # Make prediction //Checkpoint
-            predictions = self.model.predict(processed_image, verbose=0)
+            explanation = None
+            if explain:
+                predictions, explanation = self._predict_with_explanation(processed_image, image_bytes, explain_format)
+            else:
+                predictions = self._class_probabilities(processed_image)
             
             if predictions is None or len(predictions) == 0:
                 raise RuntimeError("No predictions returned from model")
@@ -124,21 +247,21 @@ class FoodInferenceService:
             # Get prediction results
             pred = predictions[0]
             
-            # Get top 3 predictions
-            top_indices = np.argsort(pred)[-3:][::-1]
+            # Get top k predictions (a single argmax when only the top class is needed)
+            if top_k <= 1:
+                top_indices = np.array([np.argmax(pred)])
+            else:
+                top_indices = np.argsort(pred)[-top_k:][::-1]
             top_confidences = pred[top_indices]
             
             # Build top predictions list
             top_predictions = []
-            for idx, confidence in zip(top_indices, top_confidences):
-                class_name = self.class_mapping.get(idx, f"class_{idx}")
-                display_name = self._get_display_name(class_name)
-                
+            for idx, confidence in zip(top_indices.tolist(), top_confidences.tolist()):
                 top_predictions.append({
-                    "class_id": int(idx),
-                    "class_name": class_name,
-                    "name": display_name,
-                    "confidence": float(confidence)
+                    "class_id": idx,
+                    "class_name": self.class_names[idx],
+                    "name": self.display_names[idx],
+                    "confidence": confidence
                 })
             
             # Main prediction
@@ -154,10 +277,13 @@ class FoodInferenceService:
                 "class_name": main_prediction["class_name"],
                 "confidence": main_prediction["confidence"],
                 "top_3_predictions": top_predictions,
+                "probabilities": pred,  # full softmax vector, used for expected nutrition
                 "processing_time": round(processing_time, 3),
                 "model_info": self._get_model_info(),
-                "bounding_box": self._generate_dummy_bbox()  # Dummy bounding box
+                "bounding_box": {"x": 0, "y": 0, "width": int(image_width), "height": int(image_height)}
             }
+            if explanation is not None:
+                result["explanation"] = explanation
             
             return result
             
@@ -168,47 +294,206 @@ class FoodInferenceService:
                 "processing_time": time.time() - start_time
             }
     
-    def _get_display_name(self, class_name: str) -> str:
-        """Convert class name to display name"""
-        # Handle Vietnamese dishes
-        vietnamese_mapping = {
-            "banh_beo": "Bánh Bèo",
-            "banh_bot_loc": "Bánh Bột Lọc", 
-            "banh_can": "Bánh Căn",
-            "banh_canh": "Bánh Canh",
-            "banh_chung": "Bánh Chưng",
-            "banh_cuon": "Bánh Cuốn",
-            "banh_duc": "Bánh Đúc",
-            "banh_gio": "Bánh Giò",
-            "banh_khot": "Bánh Khọt",
-            "banh_mi": "Bánh Mì",
-            "banh_pia": "Bánh Pía",
-            "banh_tet": "Bánh Tét",
-            "banh_trang_nuong": "Bánh Tráng Nướng",
-            "banh_xeo": "Bánh Xèo",
-            "bun_bo_hue": "Bún Bò Huế",
-            "bun_dau_mam_tom": "Bún Đậu Mắm Tôm",
-            "bun_mam": "Bún Mắm",
-            "bun_rieu": "Bún Riêu",
-            "bun_thit_nuong": "Bún Thịt Nướng",
-            "cao_lau": "Cao Lầu",
-            "com_tam": "Cơm Tấm",
-            "goi_cuon": "Gỏi Cuốn",
-            "hu_tieu": "Hủ Tiếu",
-            "mi_quang": "Mì Quảng",
-            "nem_lui": "Nem Lụi",
-            "nem_ran": "Nem Rán",
-            "pho_bo": "Phở Bò",
-            "pho_ga": "Phở Gà",
-            "xoi_man": "Xôi Mặn",
-            "xoi_xeo": "Xôi Xéo"
+    def _predict_with_explanation(self, processed_image: np.ndarray, image_bytes: bytes, explain_format: str) -> Tuple[np.ndarray, Dict[str, Any]]:
+        """Class probabilities plus a heatmap for the top trained class, cached by image hash and class"""
+        if self._gradcam_step is None:
+            raise RuntimeError("Grad-CAM not available for this model")
+        
+        image_hash = hashlib.sha1(image_bytes).hexdigest()
+        with self._heatmap_lock:
+            cached = self._heatmap_cache.get(image_hash)
+            if cached is not None:
+                self._heatmap_cache.move_to_end(image_hash)
+        
+        if cached is not None:
+            # Forward pass only; reuse the heatmap if the top class is unchanged
+            predictions = self._class_probabilities(processed_image)
+            class_id, heatmap = cached
+            if int(np.argmax(predictions[0, :self.num_base_classes])) == class_id:
+                return predictions, self._format_explanation(class_id, heatmap, explain_format, cached=True)
+        
+        cams, features, probabilities = self._gradcam_step(tf.convert_to_tensor(processed_image))
+        probabilities = probabilities.numpy()
+        class_id = int(np.argmax(probabilities[0]))
+        cam = cams.numpy()[0]
+        heatmap = (cam / max(float(cam.max()), 1e-12)).astype(np.float32)
+        
+        predictions = probabilities
+        prototype_matrix = self.prototype_matrix
+        if prototype_matrix is not None and self.feature_model is not None:
+            features = features.numpy()
+            embeddings = features / np.maximum(np.linalg.norm(features, axis=1, keepdims=True), 1e-12)
+            predictions = self._combine_with_prototypes(probabilities, embeddings, prototype_matrix)
+        
+        with self._heatmap_lock:
+            self._heatmap_cache[image_hash] = (class_id, heatmap)
+            self._heatmap_cache.move_to_end(image_hash)
+            while len(self._heatmap_cache) > self.heatmap_cache_size:
+                self._heatmap_cache.popitem(last=False)
+        
+        return predictions, self._format_explanation(class_id, heatmap, explain_format, cached=False)
+    
+    def _format_explanation(self, class_id: int, heatmap: np.ndarray, explain_format: str, cached: bool) -> Dict[str, Any]:
+        """Heatmap as a base64 grayscale PNG or as the raw low-resolution array (values 0-1)"""
+        explanation = {
+            "method": "grad-cam",
+            "class_id": class_id,
+            "class_name": self.class_names[class_id],
+            "format": explain_format,
+            "cached": cached
         }
         
-        if class_name in vietnamese_mapping:
-            return vietnamese_mapping[class_name]
+        if explain_format == "array":
+            explanation["height"], explanation["width"] = heatmap.shape
+            explanation["heatmap"] = np.round(heatmap, 3).tolist()
+        else:
+            image = Image.fromarray(np.uint8(heatmap * 255), mode="L")
+            image = image.resize((self.heatmap_png_size, self.heatmap_png_size), Image.BILINEAR)
+            buffer = io.BytesIO()
+            image.save(buffer, format="PNG", optimize=True)
+            explanation["height"] = explanation["width"] = self.heatmap_png_size
+            explanation["heatmap"] = base64.b64encode(buffer.getvalue()).decode("ascii")
+        
+        return explanation
+    
+    def extract_features(self, images: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """One forward pass over a batch: (L2-normalized embeddings, class probabilities)"""
+        if self.feature_model is None:
+            raise RuntimeError("Feature model not available")
+        features, probabilities = self._forward_features(tf.convert_to_tensor(images))
+        features, probabilities = features.numpy(), probabilities.numpy()
+        norms = np.linalg.norm(features, axis=1, keepdims=True)
+        embeddings = (features / np.maximum(norms, 1e-12)).astype(np.float32)
+        return embeddings, probabilities
+    
+    def embed(self, image_bytes: bytes) -> np.ndarray:
+        """L2-normalized penultimate-layer embedding for one image"""
+        embeddings, _ = self.extract_features(self.preprocess_image(image_bytes))
+        return embeddings[0]
+    
+    def _class_probabilities(self, images: np.ndarray) -> np.ndarray:
+        """Class probabilities for a batch, extended with registered prototype classes if any"""
+        prototype_matrix = self.prototype_matrix
+        if prototype_matrix is None or self.feature_model is None:
+            return self._forward(tf.convert_to_tensor(images)).numpy()
+        
+        # Same forward pass yields the embedding, so prototypes only add one small matrix product
+        embeddings, probabilities = self.extract_features(images)
+        return self._combine_with_prototypes(probabilities, embeddings, prototype_matrix)
+    
+    def _combine_with_prototypes(self, probabilities: np.ndarray, embeddings: np.ndarray, prototype_matrix: np.ndarray) -> np.ndarray:
+        """Append extra-class probabilities; the trained head keeps the remaining mass"""
+        similarities = embeddings @ prototype_matrix.T  # (N, extra classes)
+        logits = self.prototype_temperature * similarities
+        
+        # Share of probability mass given to the extra classes, driven by the closest prototype
+        extra_mass = 1.0 / (1.0 + np.exp(-self.prototype_temperature * (similarities.max(axis=1) - self.prototype_threshold)))
+        extra = np.exp(logits - logits.max(axis=1, keepdims=True))
+        extra /= extra.sum(axis=1, keepdims=True)
         
-        # For other dishes, convert underscores to spaces and title case
-        return class_name.replace('_', ' ').title()
+        return np.concatenate([
+            probabilities * (1.0 - extra_mass)[:, None],
+            extra * extra_mass[:, None]
+        ], axis=1).astype(np.float32)
+    
+    def compute_prototype(self, images: List[bytes]) -> np.ndarray:
+        """Averaged, re-normalized embedding of a handful of example images"""
+        if not images:
+            raise ValueError("At least one example image is required")
+        batch = np.concatenate([self.preprocess_image(image_bytes) for image_bytes in images])
+        embeddings, _ = self.extract_features(batch)
+        prototype = embeddings.mean(axis=0)
+        return (prototype / max(np.linalg.norm(prototype), 1e-12)).astype(np.float32)
+    
+    def is_trained_class(self, class_name: str) -> bool:
+        """Whether the name belongs to a class of the trained model (those cannot be replaced by prototypes)"""
+        return class_name in self.class_names[:self.num_base_classes]
+    
+    def add_prototype_class(self, class_name: str, display_name: str, prototype: np.ndarray, nutrition: Dict[str, Any]) -> int:
+        """Register (or replace) an extra class; returns its class id"""
+        with self._prototype_lock:
+            if self.is_trained_class(class_name):
+                raise ValueError(f"'{class_name}' is already a trained class")
+            
+            prototype = np.asarray(prototype, dtype=np.float32).reshape(1, -1)
+            matrix = self.prototype_matrix
+            class_names = list(self.class_names)
+            display_names = list(self.display_names)
+            
+            if class_name in class_names:
+                # Replace an existing extra class in a copy, then swap
+                class_id = class_names.index(class_name)
+                matrix = matrix.copy()
+                matrix[class_id - self.num_base_classes] = prototype
+                display_names[class_id] = display_name
+            else:
+                class_id = len(class_names)
+                matrix = prototype if matrix is None else np.concatenate([matrix, prototype])
+                class_names.append(class_name)
+                display_names.append(display_name)
+            
+            self.prototype_nutrition[class_name] = dict(nutrition)
+            # Names and version change before the matrix, so any class id a prediction
+            # can produce is already known to a freshly built class metadata table
+            self.class_names = class_names
+            self.display_names = display_names
+            self.classes_version += 1
+            self.prototype_matrix = matrix
+            
+            self._save_prototypes()
+        
+        print(f"Registered prototype class '{class_name}' as class {class_id}")
+        return class_id
+    
+    def get_prototype_classes(self) -> List[Dict[str, Any]]:
+        """Registered extra classes"""
+        return [
+            {
+                "class_id": class_id,
+                "class_name": self.class_names[class_id],
+                "name": self.display_names[class_id],
+                "nutrition": self.prototype_nutrition.get(self.class_names[class_id], {})
+            }
+            for class_id in range(self.num_base_classes, len(self.class_names))
+        ]
+    
+    def _save_prototypes(self):
+        """Persist extra classes so they survive restarts"""
+        data = [
+            dict(entry, embedding=self.prototype_matrix[entry["class_id"] - self.num_base_classes].tolist())
+            for entry in self.get_prototype_classes()
+        ]
+        tmp_path = self.prototypes_path + ".tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False)
+        os.replace(tmp_path, self.prototypes_path)
+    
+    def _load_prototypes(self):
+        """Load extra classes registered in earlier runs"""
+        if not os.path.exists(self.prototypes_path):
+            return
+        try:
+            with open(self.prototypes_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if not data:
+                return
+            
+            matrix = np.array([entry["embedding"] for entry in data], dtype=np.float32)
+            if self.embedding_dim is not None and matrix.shape[1] != self.embedding_dim:
+                print(f"Ignoring prototypes: dimension {matrix.shape[1]} does not match model ({self.embedding_dim})")
+                return
+            
+            self.class_names = self.class_names + [entry["class_name"] for entry in data]
+            self.display_names = self.display_names + [entry["name"] for entry in data]
+            self.prototype_nutrition = {entry["class_name"]: entry.get("nutrition", {}) for entry in data}
+            self.prototype_matrix = matrix
+            print(f"Loaded {len(data)} prototype classes")
+        except Exception as e:
+            print(f"Error loading prototype classes: {e}")
+    
+    def _get_display_name(self, class_name: str) -> str:
+        """Convert class name to display name"""
+        return get_display_name(class_name)
     
     def _get_model_info(self) -> str:
         """Get model information string"""
@@ -221,14 +506,146 @@ class FoodInferenceService:
         else:
             return "Unknown model type"
     
-    def _generate_dummy_bbox(self) -> Dict[str, int]:
-        """Generate dummy bounding box (placeholder for future object detection)"""
-        return {
-            "x": 50,
-            "y": 60,
-            "width": 200,
-            "height": 180
-        }
+    def predict_multi(self, image_bytes: bytes, top_k: int = 3, want_detections: bool = True) -> Dict[str, Any]:
+        """Detect several dishes in one image by classifying overlapping tiles in a single batch
+        (without want_detections only the top_k detections that top_3_predictions needs are built)"""
+        start_time = time.time()
+        
+        try:
+            if self.model is None:
+                raise RuntimeError("Model not loaded")
+            
+            try:
+                image = self._decode_image(image_bytes)
+            except Exception as e:
+                raise ValueError(f"Error preprocessing image: {str(e)}")
+            original_width, original_height = image.size
+            if max(image.size) > self.tile_max_side:
+                image.thumbnail((self.tile_max_side, self.tile_max_side))
+            image_array = np.asarray(image)
+            scale_x = original_width / image_array.shape[1]
+            scale_y = original_height / image_array.shape[0]
+            
+            # Propose regions and classify every crop in one forward pass
+            boxes = self._propose_regions(image_array.shape[0], image_array.shape[1])
+            crops = self._extract_crops(image_array, boxes)
+            predictions = self._class_probabilities(crops)
+            
+            if predictions is None or len(predictions) == 0:
+                raise RuntimeError("No predictions returned from model")
+            
+            class_ids = np.argmax(predictions, axis=1)
+            scores = predictions[np.arange(len(predictions)), class_ids]
+            
+            keep = np.flatnonzero(scores >= self.detection_threshold)
+            if len(keep) == 0:
+                # Nothing confident enough: fall back to the best scoring tile
+                keep = np.array([int(np.argmax(scores))])
+            limit = self.max_detections if want_detections else max(top_k, 1)
+            if limit == 1:
+                # NMS always keeps the best scoring tile first, so the top detection needs no suppression pass
+                keep = keep[[int(np.argmax(scores[keep]))]]
+            else:
+                keep = keep[self._non_max_suppression(boxes[keep], scores[keep], class_ids[keep], limit)]
+            
+            detections = []
+            for idx in keep:
+                class_id = int(class_ids[idx])
+                x1, y1, x2, y2 = boxes[idx]
+                detections.append({
+                    "class_id": class_id,
+                    "class_name": self.class_names[class_id],
+                    "name": self.display_names[class_id],
+                    "confidence": float(scores[idx]),
+                    "bounding_box": {
+                        "x": int(round(x1 * scale_x)),
+                        "y": int(round(y1 * scale_y)),
+                        "width": int(round((x2 - x1) * scale_x)),
+                        "height": int(round((y2 - y1) * scale_y))
+                    }
+                })
+            
+            main_detection = detections[0]
+            
+            result = {
+                "success": True,
+                "food_name": main_detection["name"],
+                "class_name": main_detection["class_name"],
+                "confidence": main_detection["confidence"],
+                "top_3_predictions": [
+                    {key: det[key] for key in ("class_id", "class_name", "name", "confidence")}
+                    for det in detections[:top_k]
+                ],
+                "probabilities": predictions[keep],  # one softmax row per detection
+                "regions_evaluated": int(len(boxes)),
+                "processing_time": round(time.time() - start_time, 3),
+                "model_info": self._get_model_info(),
+                "bounding_box": main_detection["bounding_box"]
+            }
+            if want_detections:
+                result["detections"] = detections
+            
+            return result
+            
+        except Exception as e:
+            return {
+                "success": False,
+                "error": f"Prediction failed: {str(e)}",
+                "processing_time": time.time() - start_time
+            }
+    
+    def _propose_regions(self, height: int, width: int) -> np.ndarray:
+        """Build candidate boxes (x1, y1, x2, y2): the full image plus multi-scale sliding windows"""
+        boxes = [np.array([[0, 0, width, height]])]
+        short_side = min(height, width)
+        
+        for scale in self.tile_scales:
+            window = min(max(int(short_side * scale), 32), short_side)
+            stride = max(int(window * (1 - self.tile_overlap)), 1)
+            # Last window is snapped to the border so the whole image is covered
+            xs = np.unique(np.append(np.arange(0, width - window + 1, stride), width - window))
+            ys = np.unique(np.append(np.arange(0, height - window + 1, stride), height - window))
+            grid_x, grid_y = np.meshgrid(xs, ys)
+            x1 = grid_x.ravel()
+            y1 = grid_y.ravel()
+            boxes.append(np.stack([x1, y1, x1 + window, y1 + window], axis=1))
+        
+        return np.concatenate(boxes).astype(np.int32)
+    
+    def _extract_crops(self, image_array: np.ndarray, boxes: np.ndarray) -> np.ndarray:
+        """Cut and resize all boxes to model input size with one gather (nearest-neighbour sampling)"""
+        x1, y1, x2, y2 = boxes[:, 0:1], boxes[:, 1:2], boxes[:, 2:3], boxes[:, 3:4]
+        # Sample at pixel centres of the target grid, shape (N, H) and (N, W)
+        rows = y1 + ((np.arange(self.img_height) + 0.5) * (y2 - y1) / self.img_height).astype(np.int32)
+        cols = x1 + ((np.arange(self.img_width) + 0.5) * (x2 - x1) / self.img_width).astype(np.int32)
+        crops = image_array[rows[:, :, None], cols[:, None, :]]
+        return crops.astype(np.float32)  # Keep [0,255] range for preprocess_input
+    
+    def _non_max_suppression(self, boxes: np.ndarray, scores: np.ndarray, class_ids: np.ndarray,
+                             limit: int = None) -> List[int]:
+        """Greedy NMS; also drops same-class boxes mostly contained in a stronger one (stops after `limit` boxes)"""
+        x1, y1, x2, y2 = [boxes[:, i].astype(np.float32) for i in range(4)]
+        areas = (x2 - x1) * (y2 - y1)
+        order = np.argsort(scores)[::-1]
+        keep = []
+        
+        while order.size > 0 and (limit is None or len(keep) < limit):
+            best = order[0]
+            keep.append(int(best))
+            rest = order[1:]
+            
+            inter_w = np.clip(np.minimum(x2[best], x2[rest]) - np.maximum(x1[best], x1[rest]), 0, None)
+            inter_h = np.clip(np.minimum(y2[best], y2[rest]) - np.maximum(y1[best], y1[rest]), 0, None)
+            inter = inter_w * inter_h
+            iou = inter / (areas[best] + areas[rest] - inter)
+            containment = inter / np.minimum(areas[best], areas[rest])
+            
+            suppressed = (iou > self.nms_iou_threshold) | (
+                (class_ids[rest] == class_ids[best]) & (containment > 0.8)
+            )
+            order = rest[~suppressed]
+        
+        return keep
     
     def get_model_status(self) -> Dict[str, Any]:
         """Get current model status"""
@@ -236,6 +653,9 @@ class FoodInferenceService:
             "model_loaded": self.model is not None,
             "model_type": self.model_type,
             "classes_loaded": len(self.class_mapping),
+            "prototype_classes": len(self.class_names) - self.num_base_classes,
+            "embedding_dim": self.embedding_dim,
+            "explain_available": self._gradcam_step is not None,
             "model_info": self._get_model_info() if self.model else "No model loaded"
         }
 
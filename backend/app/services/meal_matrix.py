@@ -0,0 +1,47 @@
+"""
+Meal aggregation over a per-gram nutrient matrix built once per catalogue version
+Portions and gram amounts both become grams, so any number of meals is one row gather,
+one weighted product and one segmented sum
+"""
+from typing import Tuple
+import numpy as np
+
+from app.services.nutrient_neighbors import serving_grams
+from app.services.nutrition_table import NutritionTable, NUTRIENT_FIELDS
+
+# kcal per gram of each macronutrient (Atwater factors), for the share of energy coming from each
+MACRO_ENERGY = {"protein": 4.0, "fat": 9.0, "carbs": 4.0}
+
+class MealMatrix:
+    """(dishes, nutrients) matrix of nutrients per gram, plus each dish's serving weight"""
+    
+    def __init__(self, table: NutritionTable):
+        self.table = table
+        grams = np.array([serving_grams(serving) for serving in table.serving], dtype=np.float64)
+        self.has_weight = np.isfinite(grams)
+        # A dish whose serving text gives no weight counts one serving as one "gram", so portions still scale it
+        self.unit_grams = np.where(self.has_weight, grams, 1.0)
+        per_serving = np.column_stack([table.columns[field] for field in NUTRIENT_FIELDS])
+        self.per_gram = np.ascontiguousarray(per_serving / self.unit_grams[:, None])
+        self.per_gram.setflags(write=False)
+    
+    def amounts(self, rows: np.ndarray, portions: np.ndarray, grams: np.ndarray) -> np.ndarray:
+        """Grams eaten of each item: `grams` where given (not NaN), otherwise `portions` servings"""
+        unweighable = ~np.isnan(grams) & ~self.has_weight[rows]
+        if unweighable.any():
+            missing = [self.table.names[row] for row in rows[unweighable].tolist()]
+            raise ValueError(f"No serving weight for {', '.join(missing)}; give portions instead of grams")
+        return np.where(np.isnan(grams), portions * self.unit_grams[rows], grams)
+    
+    def aggregate(self, rows: np.ndarray, amounts: np.ndarray, starts: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """(per-item contributions, per-meal totals) as (items, nutrients) and (meals, nutrients) arrays; the items
+        of meal i are rows[starts[i]:starts[i + 1]] and no meal is empty"""
+        contributions = self.per_gram[rows] * amounts[:, None]
+        return contributions, np.add.reduceat(contributions, starts, axis=0)
+    
+    @staticmethod
+    def macro_ratios(totals: np.ndarray) -> np.ndarray:
+        """(meals, 3) percentage of macronutrient energy from each MACRO_ENERGY nutrient (0 for energy-free meals)"""
+        energy = totals[:, [NUTRIENT_FIELDS.index(field) for field in MACRO_ENERGY]] * np.array(list(MACRO_ENERGY.values()))
+        total = energy.sum(axis=1, keepdims=True)
+        return np.round(100.0 * np.divide(energy, total, out=np.zeros_like(energy), where=total > 0), 1)
@@ -0,0 +1,103 @@
+"""
+Nearest-neighbour search over dish macronutrient profiles
+Calories, protein, fat and carbs per serving or per 100g, standardized per nutrient and searched with one
+vectorized distance pass over a prebuilt matrix
+"""
+import re
+import threading
+from functools import lru_cache
+from typing import Dict, List, Optional, Sequence, Tuple
+import numpy as np
+
+from app.services.nutrition_table import NutritionTable
+
+MACRO_FIELDS = ["calories", "protein", "fat", "carbs"]
+
+BASIS_SERVING = "serving"
+BASIS_100G = "100g"
+BASES = (BASIS_SERVING, BASIS_100G)
+
+# "1 slice (100g)", "1 cup (250ml)", "100g": the serving weight, with ml counted as grams
+_SERVING_GRAMS = re.compile(r'(\d+(?:\.\d+)?)\s*(?:g|ml)\b', re.IGNORECASE)
+
+# Added to the distance of dishes that are excluded; far above any real (standardized) distance
+_EXCLUDED = np.float32(1e30)
+
+def serving_grams(serving: str) -> float:
+    """Weight of one serving in grams, NaN when the serving text has none"""
+    match = _SERVING_GRAMS.search(serving or "")
+    grams = float(match.group(1)) if match else 0.0
+    return grams if grams > 0 else float('nan')
+
+class NutrientNeighbors:
+    """k nearest dishes by standardized macro profile, with optional "lower / higher than this dish" constraints"""
+    
+    def __init__(self, table: NutritionTable, cache_size: int = 4096):
+        self.table = table
+        self._lock = threading.Lock()
+        self._profiles: Dict[str, np.ndarray] = {}
+        self._scaled: Dict[str, np.ndarray] = {}
+        # The table never changes, so answers can be cached; predictions ask about the same few classes all the time
+        self._cached_nearest = lru_cache(maxsize=cache_size)(self._nearest)
+    
+    def profiles(self, basis: str) -> Tuple[np.ndarray, np.ndarray]:
+        """(raw, standardized) (nutrients, dishes) matrices for a basis; NaN columns for dishes without a weight"""
+        if basis not in BASES:
+            raise ValueError(f"Unknown basis: {basis}")
+        if basis not in self._profiles:
+            with self._lock:
+                if basis not in self._profiles:
+                    raw = np.vstack([self.table.columns[field] for field in MACRO_FIELDS]).astype(np.float64)
+                    if basis == BASIS_100G:
+                        raw = raw * (100.0 / np.array([serving_grams(serving) for serving in self.table.serving]))
+                    known = np.isfinite(raw).all(axis=0)
+                    mean = raw[:, known].mean(axis=1, keepdims=True) if known.any() else np.zeros((len(MACRO_FIELDS), 1))
+                    std = raw[:, known].std(axis=1, keepdims=True) if known.any() else np.ones((len(MACRO_FIELDS), 1))
+                    std[std == 0] = 1.0
+                    # One contiguous float32 row per nutrient keeps the distance pass to a few vector operations
+                    self._scaled[basis] = np.ascontiguousarray((raw - mean) / std, dtype=np.float32)
+                    self._profiles[basis] = raw
+        return self._profiles[basis], self._scaled[basis]
+    
+    def nearest(self, row: int, k: int = 5, basis: str = BASIS_SERVING,
+                lower: Sequence[str] = (), higher: Sequence[str] = ()) -> List[Tuple[int, float]]:
+        """(row, distance) of the k dishes closest to `row`, nearest first; `lower` / `higher` keep only dishes
+        with strictly less / more of those nutrients than `row`"""
+        for field in list(lower) + list(higher):
+            if field not in MACRO_FIELDS:
+                raise ValueError(f"Unknown nutrient: {field}")
+        return self._cached_nearest(row, k, basis, tuple(sorted(lower)), tuple(sorted(higher)))
+    
+    def _nearest(self, row: int, k: int, basis: str, lower: Tuple[str, ...], higher: Tuple[str, ...]) -> List[Tuple[int, float]]:
+        raw, scaled = self.profiles(basis)
+        if not np.isfinite(raw[:, row]).all():
+            raise ValueError(f"No serving weight for {self.table.names[row]}, so it has no per-100g profile")
+        
+        distances = np.zeros(scaled.shape[1], dtype=np.float32)
+        for values, value in zip(scaled, scaled[:, row]):
+            distances += (values - value) ** 2
+        distances[row] = _EXCLUDED
+        # Constraints add a penalty instead of masked writes, which are several times slower on large arrays;
+        # dishes without a weight (per-100g basis) are NaN, which argpartition also puts last
+        excluded = None
+        for field, violates in [(field, np.greater_equal) for field in lower] + [(field, np.less_equal) for field in higher]:
+            values = raw[MACRO_FIELDS.index(field)]
+            mask = violates(values, values[row])
+            excluded = mask if excluded is None else excluded | mask
+        if excluded is not None:
+            distances += excluded * _EXCLUDED
+        
+        k = min(k, len(distances))
+        if k <= 0:
+            return []
+        candidates = np.argpartition(distances, k - 1)[:k] if k < len(distances) else np.arange(len(distances))
+        candidates = candidates[distances[candidates] < _EXCLUDED]
+        candidates = candidates[np.lexsort((candidates, distances[candidates]))]
+        return [(neighbor, float(np.sqrt(distances[neighbor]))) for neighbor in candidates.tolist()]
+    
+    def profile(self, row: int, basis: str) -> Optional[Dict[str, float]]:
+        """Macro values of one dish under a basis, None when it has no weight for per-100g"""
+        raw, _ = self.profiles(basis)
+        if not np.isfinite(raw[:, row]).all():
+            return None
+        return {field: round(float(value), 1) for field, value in zip(MACRO_FIELDS, raw[:, row])}
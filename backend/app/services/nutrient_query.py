@@ -0,0 +1,160 @@
+"""
+Range filter and sort queries over the nutrient columns
+Each column gets a sorted index (stable argsort plus the sorted values), so a selective filter is a binary search;
+unselective filters fall back to vectorized boolean masks over the full columns
+"""
+import threading
+from typing import Dict, Optional, Tuple
+import numpy as np
+
+from app.services.nutrition_table import NutritionTable, FILTERABLE_FIELDS
+
+Range = Tuple[Optional[float], Optional[float]]
+
+class NutrientIndex:
+    """Sorted indexes over one table's filterable columns, built per column on first use"""
+    
+    # A filter matching more than this fraction of rows is cheaper to evaluate as a full-column mask
+    # than by gathering its rows through the sorted index
+    INDEX_SELECTIVITY = 1 / 16
+    
+    def __init__(self, table: NutritionTable):
+        self.table = table
+        self._sorted: Dict[str, Tuple[np.ndarray, np.ndarray]] = {}
+        self._lock = threading.Lock()
+    
+    def column(self, field: str) -> np.ndarray:
+        return self.table.popularity if field == "popularity" else self.table.columns[field]
+    
+    def sorted_index(self, field: str) -> Tuple[np.ndarray, np.ndarray]:
+        """(rows ordered by value, ties by row; the values in that order)"""
+        index = self._sorted.get(field)
+        if index is None:
+            with self._lock:
+                index = self._sorted.get(field)
+                if index is None:
+                    values = self.column(field)
+                    dtype = np.int32 if len(values) < 2**31 else np.int64
+                    order = np.argsort(values, kind='stable').astype(dtype)
+                    index = (order, values[order])
+                    self._sorted[field] = index
+        return index
+    
+    def _bounds(self, field: str, low: Optional[float], high: Optional[float]) -> Tuple[int, int]:
+        """Positions [lo, hi) of the sorted index holding values inside [low, high]"""
+        _, values = self.sorted_index(field)
+        lo = 0 if low is None else int(np.searchsorted(values, low, side='left'))
+        hi = len(values) if high is None else int(np.searchsorted(values, high, side='right'))
+        return lo, max(lo, hi)
+    
+    def _mask(self, rows: Optional[np.ndarray], field: str, low: Optional[float], high: Optional[float]) -> np.ndarray:
+        values = self.column(field) if rows is None else self.column(field)[rows]
+        mask = np.ones(len(values), dtype=bool)
+        if low is not None:
+            mask &= values >= low
+        if high is not None:
+            mask &= values <= high
+        return mask
+    
+    def matching_rows(self, ranges: Dict[str, Range]) -> Tuple[Optional[np.ndarray], Optional[np.ndarray]]:
+        """(rows, mask): rows found through a selective filter's sorted index, or a full-column boolean mask
+        when every filter matches many rows; (None, None) without filters"""
+        ranges = {field: bounds for field, bounds in ranges.items() if bounds != (None, None)}
+        if not ranges:
+            return None, None
+        
+        # The most selective filter decides the strategy; binary searches make its size cheap to know
+        bounds = {field: self._bounds(field, low, high) for field, (low, high) in ranges.items()}
+        field = min(bounds, key=lambda name: bounds[name][1] - bounds[name][0])
+        lo, hi = bounds[field]
+        
+        if hi - lo <= self.INDEX_SELECTIVITY * len(self.table):
+            rows = self.sorted_index(field)[0][lo:hi]
+            for other, (low, high) in ranges.items():
+                if other != field and len(rows):
+                    rows = rows[self._mask(rows, other, low, high)]
+            return rows, None
+        
+        mask = None
+        for other, (low, high) in ranges.items():
+            column_mask = self._mask(None, other, low, high)
+            mask = column_mask if mask is None else mask & column_mask
+        return None, mask
+    
+    def _scan_sorted(self, mask: Optional[np.ndarray], sort_by: str, descending: bool, offset: int, end: int,
+                     window: Tuple[int, int]) -> np.ndarray:
+        """Rows [offset, end) of the rows passing `mask` (None: all rows) in sort order, found by walking the
+        sort field's sorted index (within `window`, the positions its own filter allows) from the wanted end"""
+        order, values = self.sorted_index(sort_by)
+        lo, hi = window
+        parts, found, scanned, chunk = [], 0, 0, max(256, 2 * end)
+        while found < end and scanned < hi - lo:
+            if descending:
+                span = slice(max(hi - scanned - chunk, lo), hi - scanned)
+            else:
+                span = slice(lo + scanned, min(lo + scanned + chunk, hi))
+            part = order[span]
+            if mask is not None:
+                part = part[mask[part]]
+            parts.append(part)
+            found += len(part)
+            scanned += chunk
+            chunk *= 2  # sparse masks need longer walks
+        
+        if not descending:
+            # The sorted index already breaks ties by row
+            return np.concatenate(parts)[offset:end]
+        
+        rows = np.concatenate(parts[::-1])
+        boundary = max(hi - scanned, lo)
+        if found >= end:
+            # Rows tied with the end-th largest value may sit below the scanned range
+            threshold = self.column(sort_by)[rows[-end]]
+            tie_start = max(int(np.searchsorted(values, threshold, side='left')), lo)
+            if tie_start < boundary:
+                extra = order[tie_start:boundary]
+                if mask is not None:
+                    extra = extra[mask[extra]]
+                rows = np.concatenate([extra, rows])
+        page = np.lexsort((rows, -self.column(sort_by)[rows]))[offset:end]
+        return rows[page]
+    
+    def query(self, ranges: Dict[str, Range], sort_by: str = None, descending: bool = False,
+              limit: int = 20, offset: int = 0) -> Tuple[int, np.ndarray]:
+        """(number of matching rows, rows of the requested page); ties and unsorted results go by row order"""
+        for field in list(ranges) + ([sort_by] if sort_by else []):
+            if field not in FILTERABLE_FIELDS:
+                raise ValueError(f"Unknown field: {field}")
+        
+        rows, mask = self.matching_rows(ranges)
+        if rows is not None:
+            total = len(rows)
+        elif mask is not None:
+            total = int(np.count_nonzero(mask))
+        else:
+            total = len(self.table)
+        end = offset + limit
+        if offset >= total or limit <= 0:
+            return total, np.empty(0, dtype=np.int64)
+        
+        if rows is None:
+            # Many (or all) rows match: read the page straight off the sorted index or the mask
+            if sort_by is not None:
+                window = self._bounds(sort_by, *ranges.get(sort_by, (None, None)))
+                return total, self._scan_sorted(mask, sort_by, descending, offset, end, window)
+            if mask is None:
+                return total, np.arange(offset, min(end, total))
+            return total, np.flatnonzero(mask)[offset:end]
+        
+        if sort_by is None:
+            return total, np.sort(rows)[offset:end]
+        keys = self.column(sort_by)[rows]
+        if descending:
+            keys = -keys
+        if len(rows) > end:
+            # Keep only the first `end` keys (plus any ties with the last one) before sorting
+            kth = np.partition(keys, end - 1)[end - 1]
+            keep = keys <= kth
+            rows, keys = rows[keep], keys[keep]
+        page = np.lexsort((rows, keys))[offset:end]
+        return total, rows[page]
@@ -1,62 +1,303 @@
 """
 Nutrition Service for retrieving nutritional information from CSV database
 """
-import pandas as pd
+import hashlib
 import os
-from typing import Dict, Any, Optional, List
-import difflib
+import threading
+import time
+from typing import Dict, Any, Optional, List, Tuple
+import numpy as np
+
+from app.services.alias_index import AliasIndex, load_alias_csv
+from app.services.dish_pages import NamePages
+from app.services.fuzzy_index import FuzzyIndex
+from app.services.health_rules import HealthRuleTable, HealthSuggestions, DEFAULT_RULES, load_rules_csv
+from app.services.meal_matrix import MealMatrix, MACRO_ENERGY
+from app.services.nutrient_neighbors import NutrientNeighbors, BASIS_SERVING
+from app.services.nutrient_query import NutrientIndex
+from app.services.nutrition_stats import CatalogueStats
+from app.services.nutrition_snapshot import (
+    NutritionSnapshot, SnapshotAliasIndex, SnapshotResponses, SnapshotTable, SNAPSHOT_FILENAME, write_snapshot
+)
+from app.services.nutrition_table import NutritionTable, NUTRIENT_FIELDS
+from app.services.prefix_index import PrefixIndex
+from app.utils.json_codec import dumps
+
+# Values used when a dish has no entry in the database
+DEFAULT_NUTRITION = {
+    "calories": 200,
+    "protein": 10.0,
+    "fat": 8.0,
+    "carbs": 25.0,
+    "fiber": 3.0
+}
+
+# How a batch lookup matched each requested name
+MATCH_EXACT = "exact"
+MATCH_NORMALIZED = "normalized"
+MATCH_ALIAS = "alias"
+MATCH_FUZZY = "fuzzy"
+
+class NutritionDataset:
+    """One version of the catalogue with everything derived from it; never modified, only replaced as a whole"""
+    
+    def __init__(self, table: NutritionTable, response_bytes: Dict[str, bytes], aliases: List, version: int, etag: str, source_path: Optional[str],
+                 alias_index: AliasIndex = None, snapshot_path: str = None, health_rules: HealthRuleTable = None,
+                 health: HealthSuggestions = None, stats: CatalogueStats = None):
+        self.table = table
+        self.response_bytes = response_bytes  # dish name -> serialized get_nutrition() response
+        self.aliases = aliases
+        self.alias_index = alias_index if alias_index is not None else AliasIndex(table.names, aliases)
+        self.version = version
+        self.etag = etag
+        self.source_path = source_path
+        self.snapshot_path = snapshot_path  # set when the data is served from a mapped snapshot
+        self.health_rules = health_rules if health_rules is not None else HealthRuleTable(DEFAULT_RULES)
+        self._health = health
+        self._stats = stats
+        self.loaded_at = time.time()
+        self.build_seconds = 0.0
+        self._fuzzy_index = None
+        self._prefix_index = None
+        self._nutrient_index = None
+        self._neighbors = None
+        self._meal_matrix = None
+        self._index_lock = threading.Lock()
+    
+    # Built on first use when the dataset comes from a snapshot, so exact lookups never pay for them
+    @property
+    def fuzzy_index(self) -> FuzzyIndex:
+        if self._fuzzy_index is None:
+            with self._index_lock:
+                if self._fuzzy_index is None:
+                    self._fuzzy_index = FuzzyIndex(self.table.names)
+        return self._fuzzy_index
+    
+    @property
+    def prefix_index(self) -> PrefixIndex:
+        if self._prefix_index is None:
+            with self._index_lock:
+                if self._prefix_index is None:
+                    self._prefix_index = PrefixIndex(self.table.names, self.table.popularity)
+        return self._prefix_index
+    
+    @property
+    def nutrient_index(self) -> NutrientIndex:
+        # Only range queries use it, and its per-column sorted indexes are themselves built on demand
+        if self._nutrient_index is None:
+            with self._index_lock:
+                if self._nutrient_index is None:
+                    self._nutrient_index = NutrientIndex(self.table)
+        return self._nutrient_index
+    
+    @property
+    def neighbors(self) -> NutrientNeighbors:
+        if self._neighbors is None:
+            with self._index_lock:
+                if self._neighbors is None:
+                    self._neighbors = NutrientNeighbors(self.table)
+        return self._neighbors
+    
+    @property
+    def health(self) -> HealthSuggestions:
+        """Every dish's health suggestions, from one bulk evaluation of the rule table"""
+        if self._health is None:
+            with self._index_lock:
+                if self._health is None:
+                    self._health = self.health_rules.evaluate(self.table)
+        return self._health
+    
+    @property
+    def meal_matrix(self) -> MealMatrix:
+        if self._meal_matrix is None:
+            with self._index_lock:
+                if self._meal_matrix is None:
+                    self._meal_matrix = MealMatrix(self.table)
+        return self._meal_matrix
+    
+    @property
+    def stats(self) -> CatalogueStats:
+        """Summary statistics, computed once per version"""
+        if self._stats is None:
+            with self._index_lock:
+                if self._stats is None:
+                    self._stats = CatalogueStats.from_table(self.table)
+        return self._stats
+    
+    def build_indexes(self):
+        """Build the fuzzy and prefix indexes, the meal matrix and the statistics now instead of on the first request"""
+        self.fuzzy_index, self.prefix_index, self.meal_matrix, self.stats
 
 class NutritionService:
     """Service for managing nutrition database and queries"""
     
-    def __init__(self, csv_path: str = None):
+    def __init__(self, csv_path: str = None, aliases_path: str = None, snapshot_path: str = None,
+                 health_rules_path: str = None):
         self.csv_path = csv_path or "../../data/nutrition_database.csv"
-        self.nutrition_df = None
-        self.dishes_dict = {}
-        self._load_nutrition_database()
+        # Optional alias,dish_name CSV; defaults to dish_aliases.csv next to the nutrition database
+        self.aliases_path = aliases_path or os.getenv("DISH_ALIASES_PATH")
+        # Optional health suggestion rule table; defaults to health_rules.csv next to the nutrition database
+        self.health_rules_path = health_rules_path or os.getenv("HEALTH_RULES_PATH")
+        self.health_rules = HealthRuleTable(DEFAULT_RULES)
+        # Compiled binary snapshot; defaults to nutrition_database.snapshot next to the nutrition database
+        self.snapshot_path = snapshot_path or os.getenv("NUTRITION_SNAPSHOT_PATH")
+        self.source_path = None
+        self.aliases = []
+        self._custom_dishes = {}  # dishes added at runtime, re-applied after every reload
+        self._reload_lock = threading.Lock()  # serializes writers; readers never take it
+        self._watcher = None
+        self.last_reload = None
+        self._name_pages = NamePages()
+        dataset = self._load_snapshot()
+        if dataset is not None:
+            self.dataset = dataset
+            return
+        table = self._load_nutrition_database()
+        self._load_aliases()
+        self._load_health_rules()
+        self._publish(table, version=1, etag=self._compute_etag())
+    
+    # The active dataset is swapped with a single attribute assignment, so a request that reads
+    # self.dataset once sees either the old or the new version, never a mix
+    @property
+    def table(self) -> NutritionTable:
+        return self.dataset.table
     
-    def _load_nutrition_database(self):
-        """Load nutrition data from CSV file"""
+    @property
+    def fuzzy_index(self) -> FuzzyIndex:
+        return self.dataset.fuzzy_index
+    
+    @property
+    def prefix_index(self) -> PrefixIndex:
+        return self.dataset.prefix_index
+    
+    @property
+    def alias_index(self) -> AliasIndex:
+        return self.dataset.alias_index
+    
+    @property
+    def version(self) -> int:
+        """Increases every time the served data changes"""
+        return self.dataset.version
+    
+    @property
+    def etag(self) -> str:
+        return self.dataset.etag
+    
+    def dish_count(self) -> int:
+        return len(self.dataset.table)
+    
+    def _publish(self, table: NutritionTable, version: int, etag: str):
+        """Make a freshly loaded table the served data"""
+        self.dataset = self._build_dataset(table, version, etag)
+    
+    def _locate_sources(self) -> Optional[str]:
+        """Find the nutrition CSV (and the default alias file next to it); None if there is none"""
+        # Try multiple possible paths
+        possible_paths = [
+            self.csv_path,
+            "data/nutrition_database.csv",
+            "../data/nutrition_database.csv", 
+            "../../data/nutrition_database.csv",
+            "app/data/nutrition_database.csv"
+        ]
+        
+        for path in possible_paths:
+            if os.path.exists(path):
+                self.source_path = path
+                if self.aliases_path is None:
+                    self.aliases_path = os.path.join(os.path.dirname(path), "dish_aliases.csv")
+                if self.health_rules_path is None:
+                    self.health_rules_path = os.path.join(os.path.dirname(path), "health_rules.csv")
+                return path
+        return None
+    
+    def _load_nutrition_database(self, strict: bool = False) -> NutritionTable:
+        """Load nutrition data from CSV file (strict: raise instead of falling back to default data)"""
         try:
-            # Try multiple possible paths
-            possible_paths = [
-                self.csv_path,
-                "data/nutrition_database.csv",
-                "../data/nutrition_database.csv", 
-                "../../data/nutrition_database.csv",
-                "app/data/nutrition_database.csv"
-            ]
-            
-            for path in possible_paths:
-                if os.path.exists(path):
-                    self.nutrition_df = pd.read_csv(path)
-                    print(f"Loaded nutrition database from: {path}")
-                    break
-            else:
+            path = self._locate_sources()
+            if path is None:
+                if strict:
+                    raise FileNotFoundError("Nutrition database CSV not found")
                 print("Nutrition database CSV not found, creating default data")
-                self._create_default_nutrition_data()
-                return
-            
-            # Convert to dictionary for faster lookups
-            self.dishes_dict = {}
-            for _, row in self.nutrition_df.iterrows():
-                dish_name = row['dish_name']
-                self.dishes_dict[dish_name] = {
-                    'calories': float(row['calories']),
-                    'protein': float(row['protein']),
-                    'fat': float(row['fat']),
-                    'carbs': float(row['carbs']),
-                    'serving': row.get('serving', '1 serving'),
-                    'dataset_source': row.get('dataset_source', 'Unknown')
-                }
-            
-            print(f"Loaded nutrition data for {len(self.dishes_dict)} dishes")
+                return self._create_default_nutrition_data()
             
+            # Parsed straight into typed columns plus a name -> row index
+            table = NutritionTable.from_csv(path)
+            if strict and not len(table):
+                raise ValueError(f"No dishes in {path}")
+            print(f"Loaded nutrition database from: {path}")
+            print(f"Loaded nutrition data for {len(table)} dishes")
+            return table
+        
         except Exception as e:
+            if strict:
+                raise
             print(f"Error loading nutrition database: {e}")
-            self._create_default_nutrition_data()
+            return self._create_default_nutrition_data()
+    
+    def _load_snapshot(self) -> Optional[NutritionDataset]:
+        """Dataset served from the compiled snapshot, if there is one and it matches the source files"""
+        found = self._locate_sources() is not None
+        if self.snapshot_path is None and found:
+            self.snapshot_path = os.path.join(os.path.dirname(self.source_path), SNAPSHOT_FILENAME)
+        if not self.snapshot_path or not os.path.exists(self.snapshot_path):
+            return None
+        
+        start_time = time.time()
+        try:
+            snapshot = NutritionSnapshot(self.snapshot_path)
+            self._load_aliases()
+            self._load_health_rules()
+            # Without the CSV the snapshot is the only copy of the data, so it is served as is
+            if found and snapshot.etag != self._compute_etag():
+                print(f"Nutrition snapshot {self.snapshot_path} is out of date, loading the CSV instead "
+                      f"(recompile with: python -m app.services.nutrition_snapshot {self.source_path})")
+                return None
+        except Exception as e:
+            print(f"Error loading nutrition snapshot: {e}")
+            return None
+        
+        dataset = NutritionDataset(
+            SnapshotTable(snapshot), SnapshotResponses(snapshot), self.aliases, 1, snapshot.etag, self.source_path,
+            alias_index=SnapshotAliasIndex(snapshot), snapshot_path=self.snapshot_path, health_rules=self.health_rules
+        )
+        dataset.build_seconds = time.time() - start_time
+        print(f"Mapped nutrition snapshot from: {self.snapshot_path} ({len(snapshot)} dishes)")
+        return dataset
+    
+    def write_snapshot(self, path: str):
+        """Compile the served dataset into a snapshot file that other workers can map"""
+        dataset = self.dataset
+        write_snapshot(path, dataset.table, dataset.response_bytes, dataset.alias_index.items(), dataset.etag)
+    
+    def _load_aliases(self):
+        """Load curated dish aliases (e.g. "beef pho" -> pho) if the alias CSV exists"""
+        self.aliases = []
+        if not self.aliases_path or not os.path.exists(self.aliases_path):
+            return
+        try:
+            self.aliases = load_alias_csv(self.aliases_path)
+            print(f"Loaded {len(self.aliases)} dish aliases from: {self.aliases_path}")
+        except Exception as e:
+            print(f"Error loading dish aliases: {e}")
+    
+    def _load_health_rules(self, strict: bool = False):
+        """Load the health suggestion rule table if its CSV exists (strict: raise instead of keeping the defaults)"""
+        if not self.health_rules_path or not os.path.exists(self.health_rules_path):
+            self.health_rules = HealthRuleTable(DEFAULT_RULES)
+            return
+        try:
+            # Assigned only once the table is valid, so a failed strict load leaves the current rules in place
+            self.health_rules = HealthRuleTable(load_rules_csv(self.health_rules_path))
+            print(f"Loaded {len(self.health_rules.rules)} health rules from: {self.health_rules_path}")
+        except Exception as e:
+            if strict:
+                raise
+            self.health_rules = HealthRuleTable(DEFAULT_RULES)
+            print(f"Error loading health rules, using the defaults: {e}")
     
-    def _create_default_nutrition_data(self):
+    def _create_default_nutrition_data(self) -> NutritionTable:
         """Create default nutrition data if CSV not found"""
         print("Creating default nutrition database...")
         
@@ -88,170 +329,434 @@ class NutritionService:
         for dish in default_data:
             default_data[dish]["dataset_source"] = "Default"
         
-        self.dishes_dict = default_data
         print(f"Created default nutrition data for {len(default_data)} dishes")
+        return NutritionTable.from_records(default_data)
     
-    def get_nutrition(self, dish_name: str) -> Dict[str, Any]:
-        """Get nutrition information for a specific dish"""
+    def get_nutrition(self, dish_name: str, with_suggestions: bool = True) -> Dict[str, Any]:
+        """Get nutrition information for a specific dish (health suggestions are left out unless with_suggestions)"""
         # Normalize dish name (lowercase, replace spaces with underscores)
         normalized_name = dish_name.lower().replace(' ', '_').replace('-', '_')
         
+        # Every lookup below uses the same dataset version, even if a reload swaps it meanwhile
+        dataset = self.dataset
+        table = dataset.table
+        
+        def respond(name: str, row: int) -> Dict[str, Any]:
+            suggestions = dataset.health.for_row(row) if with_suggestions else None
+            return self._build_nutrition_response(name, table.record(row), suggestions, with_suggestions)
+        
         # Direct lookup
-        if normalized_name in self.dishes_dict:
-            nutrition_data = self.dishes_dict[normalized_name].copy()
-            return {
-                "success": True,
-                "dish_name": normalized_name,
-                "nutrition": {
-                    "calories": nutrition_data["calories"],
-                    "protein": nutrition_data["protein"],
-                    "fat": nutrition_data["fat"],
-                    "carbs": nutrition_data["carbs"],
-                    "fiber": nutrition_data.get("fiber", 2.0)  # Default fiber value
-                },
-                "serving_info": nutrition_data.get("serving", "1 serving"),
-                "dataset_source": nutrition_data.get("dataset_source", "Unknown"),
-                "suggestions": self._get_health_suggestions(nutrition_data)
-            }
+        row = table.get_row(normalized_name)
+        if row is not None:
+            return respond(normalized_name, row)
         
-        # Try fuzzy matching
-        similar_dishes = self._find_similar_dishes(normalized_name, limit=3)
+        # Accent-free spellings, display names and curated aliases
+        canonical = dataset.alias_index.resolve(dish_name)
+        if canonical is not None:
+            return respond(canonical, table.get_row(canonical))
+        
+        # Try fuzzy matching (one index query serves both the closest match and the miss suggestions)
+        similar_dishes = self._find_similar_dishes(normalized_name, limit=5, dataset=dataset)
         
         if similar_dishes:
             # Use the closest match
             closest_match = similar_dishes[0]
-            nutrition_data = self.dishes_dict[closest_match].copy()
-            
-            return {
-                "success": True,
-                "dish_name": closest_match,
-                "nutrition": {
-                    "calories": nutrition_data["calories"],
-                    "protein": nutrition_data["protein"],
-                    "fat": nutrition_data["fat"], 
-                    "carbs": nutrition_data["carbs"],
-                    "fiber": nutrition_data.get("fiber", 2.0)
-                },
-                "serving_info": nutrition_data.get("serving", "1 serving"),
-                "dataset_source": nutrition_data.get("dataset_source", "Unknown"),
-                "suggestions": self._get_health_suggestions(nutrition_data),
-                "match_info": f"Closest match for '{dish_name}'"
-            }
+            response = respond(closest_match, table.get_row(closest_match))
+            response["match_info"] = f"Closest match for '{dish_name}'"
+            return response
         
         # No match found
         return {
             "success": False,
             "error": f"Nutrition information not found for '{dish_name}'",
             "dish_name": dish_name,
-            "available_dishes": list(self.dishes_dict.keys())[:20],  # First 20 dishes
-            "suggestions": self._find_similar_dishes(normalized_name, limit=5)
+            "available_dishes": table.names[:20],  # First 20 dishes
+            "suggestions": similar_dishes
+        }
+    
+    def _build_nutrition_response(self, dish_name: str, nutrition_data: Dict[str, Any],
+                                  suggestions: Dict[str, Any] = None, with_suggestions: bool = True) -> Dict[str, Any]:
+        """Successful get_nutrition() response for an exact match (suggestions are evaluated here if not given)"""
+        response = {
+            "success": True,
+            "dish_name": dish_name,
+            "nutrition": {
+                "calories": nutrition_data["calories"],
+                "protein": nutrition_data["protein"],
+                "fat": nutrition_data["fat"],
+                "carbs": nutrition_data["carbs"],
+                "fiber": nutrition_data.get("fiber", 2.0)  # Default fiber value
+            },
+            "serving_info": nutrition_data.get("serving", "1 serving"),
+            "dataset_source": nutrition_data.get("dataset_source", "Unknown")
+        }
+        if with_suggestions:
+            response["suggestions"] = suggestions if suggestions is not None else self._get_health_suggestions(nutrition_data)
+        return response
+    
+    def _build_dataset(self, table: NutritionTable, version: int, etag: str = None) -> NutritionDataset:
+        """Serialize every dish's response and build the name indexes for a new dataset version"""
+        start_time = time.time()
+        health = self.health_rules.evaluate(table)
+        response_bytes = {
+            dish_name: dumps(self._build_nutrition_response(dish_name, table.record(row), health.for_row(row)))
+            for row, dish_name in enumerate(table.names)
         }
+        dataset = NutritionDataset(table, response_bytes, self.aliases, version, etag or self._compute_etag(), self.source_path,
+                                   health_rules=self.health_rules, health=health)
+        dataset.build_indexes()
+        if dataset.alias_index.unknown_targets:
+            print(f"Ignoring aliases for unknown dishes: {sorted(set(dataset.alias_index.unknown_targets))}")
+        dataset.build_seconds = time.time() - start_time
+        return dataset
     
-    def _find_similar_dishes(self, dish_name: str, limit: int = 5) -> List[str]:
-        """Find similar dish names using fuzzy matching"""
+    def _compute_etag(self) -> str:
+        """Content hash of the source files plus runtime-added dishes"""
+        digest = hashlib.sha1()
+        for path in (self.source_path, self.aliases_path, self.health_rules_path):
+            if path and os.path.exists(path):
+                with open(path, 'rb') as f:
+                    digest.update(f.read())
+            digest.update(b'\0')
+        digest.update(repr(sorted(self._custom_dishes.items())).encode('utf-8'))
+        return digest.hexdigest()[:16]
+    
+    def get_nutrition_json(self, dish_name: str) -> Optional[bytes]:
+        """Pre-serialized response for an exact, normalized or aliased dish name, None if it needs fuzzy matching"""
+        dataset = self.dataset
+        body = dataset.response_bytes.get(dish_name)
+        if body is None:
+            body = dataset.response_bytes.get(dish_name.lower().replace(' ', '_').replace('-', '_'))
+        if body is None:
+            canonical = dataset.alias_index.resolve(dish_name)
+            if canonical is not None:
+                body = dataset.response_bytes.get(canonical)
+        return body
+    
+    def _match_dish(self, dish_name: str, fuzzy: bool = True, dataset: NutritionDataset = None) -> Tuple[Optional[str], Optional[str]]:
+        """(catalogue name, match type) resolved like get_nutrition(), or (None, None)"""
+        dataset = dataset or self.dataset
+        normalized_name = dish_name.lower().replace(' ', '_').replace('-', '_')
+        if dataset.table.get_row(dish_name) is not None:
+            return dish_name, MATCH_EXACT
+        if dataset.table.get_row(normalized_name) is not None:
+            return normalized_name, MATCH_NORMALIZED
+        canonical = dataset.alias_index.resolve(dish_name)
+        if canonical is not None:
+            return canonical, MATCH_ALIAS
+        if fuzzy:
+            # limit=5 like get_nutrition(), so both share the fuzzy index's query cache
+            similar_dishes = self._find_similar_dishes(normalized_name, limit=5, dataset=dataset)
+            if similar_dishes:
+                return similar_dishes[0], MATCH_FUZZY
+        return None, None
+    
+    def _batch_columns(self, dish_names: List[Optional[str]], dataset: NutritionDataset) -> Dict[str, list]:
+        """Nutrient, serving and source columns for catalogue names (None entries give nulls)"""
+        table = dataset.table
+        rows = [table.get_row(name) if name is not None else None for name in dish_names]
+        # One fancy-indexing gather per nutrient; missing names read row 0 and are blanked afterwards
+        gather = np.array([row or 0 for row in rows], dtype=np.int64)
+        columns = {}
+        for field in NUTRIENT_FIELDS:
+            values = table.columns[field][gather].tolist() if len(table) else [None] * len(rows)
+            columns[field] = [value if row is not None else None for value, row in zip(values, rows)]
+        records = {row: table.record(row) for row in set(rows) if row is not None}
+        for key in ("serving", "dataset_source"):
+            columns[key] = [records[row][key] if row is not None else None for row in rows]
+        return columns
+    
+    def get_nutrition_batch(self, dish_names: List[str], fuzzy: bool = True) -> Dict[str, Any]:
+        """Nutrition for many names in one pass: columnar values aligned with the input, plus how each name matched"""
+        dataset = self.dataset
+        matches: Dict[str, Tuple[Optional[str], Optional[str]]] = {}
+        for dish_name in dish_names:
+            if dish_name not in matches:
+                matches[dish_name] = self._match_dish(dish_name, fuzzy, dataset)
+        
+        resolved = [matches[dish_name][0] for dish_name in dish_names]
+        columns = {"dish_name": resolved}
+        columns.update(self._batch_columns(resolved, dataset))
+        return {
+            "count": len(dish_names),
+            "found": sum(name is not None for name in resolved),
+            "columns": columns,
+            "match": [matches[dish_name][1] for dish_name in dish_names],
+            "not_found": [dish_name for dish_name, name in zip(dish_names, resolved) if name is None]
+        }
+    
+    def _find_similar_dishes(self, dish_name: str, limit: int = 5, dataset: NutritionDataset = None) -> List[str]:
+        """Find similar dish names using the trigram fuzzy index"""
         try:
-            available_dishes = list(self.dishes_dict.keys())
-            # Use difflib to find similar matches
-            similar = difflib.get_close_matches(dish_name, available_dishes, n=limit, cutoff=0.3)
-            return similar
+            return (dataset or self.dataset).fuzzy_index.search(dish_name, limit=limit, cutoff=0.3)
         except Exception:
             return []
     
     def _get_health_suggestions(self, nutrition_data: Dict[str, Any]) -> Dict[str, Any]:
-        """Generate health suggestions based on nutrition data"""
-        calories = nutrition_data.get("calories", 0)
-        protein = nutrition_data.get("protein", 0)
-        fat = nutrition_data.get("fat", 0)
-        carbs = nutrition_data.get("carbs", 0)
-        
-        recommendations = []
-        
-        # Calorie analysis
-        if calories < 200:
-            calorie_category = "low"
-            recommendations.append("Light meal - consider pairing with other dishes")
-        elif calories < 400:
-            calorie_category = "moderate"
-            recommendations.append("Moderate caloric content - suitable for most meal plans")
-        else:
-            calorie_category = "high"
-            recommendations.append("High caloric content - consider portion control")
-        
-        # Protein analysis
-        if protein >= 15:
-            protein_level = "excellent"
-            recommendations.append("Excellent source of protein")
-        elif protein >= 8:
-            protein_level = "good"
-            recommendations.append("Good source of protein")
-        else:
-            protein_level = "low"
-            recommendations.append("Consider adding protein-rich foods")
-        
-        # Fat analysis
-        if fat > 20:
-            recommendations.append("High fat content - balance with vegetables")
-        elif fat < 5:
-            recommendations.append("Low fat content - good for low-fat diets")
-        
-        # Carb analysis
-        if carbs > 50:
-            recommendations.append("High carbohydrate content - good for energy")
-        elif carbs < 15:
-            recommendations.append("Low carbohydrate content - suitable for low-carb diets")
-        
-        # Overall health level
-        health_score = 0
-        if calories <= 400: health_score += 1
-        if protein >= 10: health_score += 1  
-        if fat <= 15: health_score += 1
-        if carbs <= 50: health_score += 1
-        
-        if health_score >= 3:
-            health_level = "high"
-        elif health_score >= 2:
-            health_level = "moderate"
-        else:
-            health_level = "low"
-        
+        """Health suggestions for one record from the rule table (dataset dishes use their precomputed ones)"""
+        return self.health_rules.suggest(nutrition_data)
+    
+    def add_dish(self, dish_name: str, nutrition: Dict[str, Any]):
+        """Add or replace a dish at runtime (e.g. a class registered from example images)"""
+        record = dict(nutrition)
+        record.setdefault('serving', '1 serving')
+        record.setdefault('dataset_source', 'Custom')
+        with self._reload_lock:
+            if self._custom_dishes.get(dish_name) == record:
+                return
+            self._custom_dishes[dish_name] = record
+            
+            current = self.dataset
+            appended = current.table.get_row(dish_name) is None
+            table = current.table.with_record(dish_name, record)
+            response_bytes = dict(current.response_bytes)
+            stored = table.record(table.get_row(dish_name))
+            response_bytes[dish_name] = dumps(self._build_nutrition_response(dish_name, stored))
+            etag = hashlib.sha1(f"{current.etag}:{dish_name}:{sorted(record.items())}".encode('utf-8')).hexdigest()[:16]
+            # A new dish updates the statistics incrementally; replacing one needs a full pass
+            stats = current._stats.with_dish(stored, stored['dataset_source']) if appended and current._stats is not None else None
+            dataset = NutritionDataset(table, response_bytes, current.aliases, current.version + 1, etag, current.source_path,
+                                       health_rules=current.health_rules, stats=stats)
+            dataset.build_indexes()
+            self.dataset = dataset
+    
+    def reload(self, force: bool = False) -> Dict[str, Any]:
+        """Re-read the CSV and alias files, build a new dataset off to the side and swap it in"""
+        with self._reload_lock:
+            start_time = time.time()
+            current_version, current_etag = self.version, self.etag
+            result = {"reloaded": False, "version": current_version, "etag": current_etag}
+            try:
+                table = self._load_nutrition_database(strict=True)
+                self._load_aliases()
+                self._load_health_rules(strict=True)
+                for dish_name, record in self._custom_dishes.items():
+                    table = table.with_record(dish_name, record)
+                
+                etag = self._compute_etag()
+                if force or etag != current_etag:
+                    self._publish(table, current_version + 1, etag)
+                    result.update(reloaded=True, version=self.version, etag=etag)
+                result["dishes"] = self.dish_count()
+            except Exception as e:
+                # Keep serving the current version
+                print(f"Nutrition database reload failed: {e}")
+                result["error"] = str(e)
+            
+            result["duration_seconds"] = round(time.time() - start_time, 3)
+            result["finished_at"] = time.time()
+            self.last_reload = result
+            return result
+    
+    def reload_in_background(self, force: bool = False) -> bool:
+        """Start a reload thread unless one is already running"""
+        if self._reload_lock.locked():
+            return False
+        threading.Thread(target=self.reload, args=(force,), daemon=True, name="nutrition-reload").start()
+        return True
+    
+    def start_watcher(self, interval: float):
+        """Poll the CSV and alias files and reload once they have changed and stopped changing"""
+        if self._watcher is not None:
+            return
+        self._watcher = threading.Thread(target=self._watch, args=(interval,), daemon=True, name="nutrition-watcher")
+        self._watcher.start()
+        print(f"Watching nutrition database for changes every {interval}s")
+    
+    def _source_mtimes(self):
+        return tuple(
+            os.path.getmtime(path) if path and os.path.exists(path) else None
+            for path in (self.source_path, self.aliases_path, self.health_rules_path)
+        )
+    
+    def _watch(self, interval: float):
+        seen = self._source_mtimes()
+        pending = seen
+        while True:
+            time.sleep(interval)
+            current = self._source_mtimes()
+            # Wait one quiet interval so a file that is still being written is not picked up half-way
+            if current != seen and current == pending:
+                seen = current
+                self.reload()
+            pending = current
+    
+    def get_status(self) -> Dict[str, Any]:
+        """Active dataset version and reload history, for status endpoints"""
+        dataset = self.dataset
         return {
-            "health_level": health_level,
-            "recommendations": recommendations,
-            "dietary_notes": "Nutritional values are estimates per serving",
-            "calorie_category": calorie_category,
-            "protein_level": protein_level
+            "backend": "memory",
+            "version": dataset.version,
+            "etag": dataset.etag,
+            "dishes": len(dataset.table),
+            "source_path": dataset.source_path,
+            "snapshot_path": dataset.snapshot_path,
+            "aliases_path": self.aliases_path,
+            "health_rules_path": self.health_rules_path,
+            "loaded_at": dataset.loaded_at,
+            "build_seconds": round(dataset.build_seconds, 3),
+            "custom_dishes": len(self._custom_dishes),
+            "watching": self._watcher is not None,
+            "last_reload": self.last_reload
         }
     
     def get_all_dishes(self) -> List[str]:
         """Get list of all available dishes"""
-        return list(self.dishes_dict.keys())
+        return list(self.table.names)
+    
+    def list_dishes(self, cursor: str = None, limit: int = 20, offset: int = 0) -> Dict[str, Any]:
+        """A page of dish names in name order, from a sorted snapshot of one dataset version (see NamePages.page)"""
+        dataset = self.dataset
+        return self._name_pages.page(dataset.version, lambda: dataset.table.names, cursor, limit, offset)
+    
+    def _complete(self, query: str, limit: int) -> List[Tuple[str, str]]:
+        """(dish_name, match_type) pairs, best match first"""
+        return self.prefix_index.complete(query, limit)
     
     def search_dishes(self, query: str, limit: int = 10) -> List[str]:
-        """Search for dishes matching query"""
-        query_lower = query.lower()
-        matching_dishes = []
+        """Search for dishes matching query (prefix matches first, then substring matches)"""
+        return [dish for dish, _ in self._complete(query, limit)]
+    
+    def autocomplete(self, query: str, limit: int = 10) -> List[Dict[str, str]]:
+        """Dish name completions ranked by match quality, then popularity"""
+        return [{"dish_name": dish, "match": match} for dish, match in self._complete(query, limit)]
+    
+    def query_dishes(self, ranges: Dict[str, Tuple[Optional[float], Optional[float]]], sort_by: str = None,
+                     descending: bool = False, limit: int = 20, offset: int = 0) -> Dict[str, Any]:
+        """Dishes whose nutrients fall inside [min, max] ranges (either bound optional), sorted and paginated"""
+        dataset = self.dataset
+        total, rows = dataset.nutrient_index.query(ranges, sort_by, descending, limit, offset)
+        table = dataset.table
+        return {
+            "total_matches": total,
+            "dishes": [dict(dish_name=table.names[row], **table.record(row)) for row in rows.tolist()]
+        }
+    
+    def _canonical_name(self, dish_name: str) -> Optional[str]:
+        """Catalogue name for an exact, normalized or aliased dish name (no fuzzy matching)"""
+        table = self.dataset.table
+        for name in (dish_name, dish_name.lower().replace(' ', '_').replace('-', '_')):
+            if table.get_row(name) is not None:
+                return name
+        return self.dataset.alias_index.resolve(dish_name)
+    
+    def _neighbor_index(self) -> NutrientNeighbors:
+        return self.dataset.neighbors
+    
+    def similar_dishes(self, dish_name: str, k: int = 5, basis: str = BASIS_SERVING,
+                       lower: List[str] = (), higher: List[str] = ()) -> Dict[str, Any]:
+        """The k dishes with the closest macro profile, optionally only those lower / higher in some nutrients"""
+        canonical = self._canonical_name(dish_name)
+        neighbors = self._neighbor_index()
+        row = neighbors.table.get_row(canonical) if canonical is not None else None
+        if row is None:
+            return {
+                "success": False,
+                "error": f"Nutrition information not found for '{dish_name}'",
+                "dish_name": dish_name,
+                "suggestions": self._find_similar_dishes(dish_name.lower().replace(' ', '_').replace('-', '_'))
+            }
         
-        for dish in self.dishes_dict.keys():
-            if query_lower in dish.lower():
-                matching_dishes.append(dish)
+        names = neighbors.table.names
+        return {
+            "success": True,
+            "dish_name": canonical,
+            "basis": basis,
+            "profile": neighbors.profile(row, basis),
+            "similar": [
+                {"dish_name": names[neighbor], "distance": round(distance, 4), "nutrition": neighbors.profile(neighbor, basis)}
+                for neighbor, distance in neighbors.nearest(row, k, basis, lower, higher)
+            ]
+        }
+    
+    def _meal_index(self) -> MealMatrix:
+        return self.dataset.meal_matrix
+    
+    def aggregate_meals(self, meals: List[List[Dict[str, Any]]], detail: bool = True) -> Dict[str, Any]:
+        """Totals, macro energy ratios and (with `detail`) per-dish contributions for each meal plus the sum over all
+        meals, in one pass; an item is {dish_name} plus at most one of portions (default 1) or grams, as MealItem validates"""
+        names = {}
+        for items in meals:
+            for item in items:
+                if item["dish_name"] not in names:
+                    names[item["dish_name"]] = self._canonical_name(item["dish_name"])
+        matrix = self._meal_index()
+        rows = {name: matrix.table.get_row(canonical) if canonical is not None else None for name, canonical in names.items()}
+        not_found = [name for name, row in rows.items() if row is None]
+        if not_found:
+            return {
+                "success": False,
+                "error": f"Nutrition information not found for {', '.join(repr(name) for name in not_found)}",
+                "not_found": not_found,
+                "suggestions": {
+                    name: self._find_similar_dishes(name.lower().replace(' ', '_').replace('-', '_')) for name in not_found
+                }
+            }
         
-        return matching_dishes[:limit]
+        items = [item for meal in meals for item in meal]
+        item_rows = np.array([rows[item["dish_name"]] for item in items], dtype=np.int64)
+        portions = np.array([1.0 if item.get("portions") is None else item["portions"] for item in items], dtype=np.float64)
+        grams = np.array([np.nan if item.get("grams") is None else item["grams"] for item in items], dtype=np.float64)
+        starts = np.cumsum([0] + [len(meal) for meal in meals[:-1]])
+        amounts = matrix.amounts(item_rows, portions, grams)
+        contributions, totals = matrix.aggregate(item_rows, amounts, starts)
+        
+        results = [
+            {"totals": dict(zip(NUTRIENT_FIELDS, meal_totals)), "macro_ratios": dict(zip(MACRO_ENERGY, ratios))}
+            for meal_totals, ratios in zip(np.round(totals, 1).tolist(), matrix.macro_ratios(totals).tolist())
+        ]
+        if detail:
+            calories = NUTRIENT_FIELDS.index("calories")
+            meal_calories = np.repeat(totals[:, calories], [len(meal) for meal in meals])
+            shares = np.divide(contributions[:, calories], meal_calories, out=np.zeros(len(items)), where=meal_calories > 0)
+            # Rounded as arrays: per-value round() calls cost more than the arithmetic for large batches
+            detailed = list(zip(
+                [names[item["dish_name"]] for item in items], np.round(amounts / matrix.unit_grams[item_rows], 3).tolist(),
+                np.round(amounts, 1).tolist(), matrix.has_weight[item_rows].tolist(), np.round(contributions, 1).tolist(),
+                np.round(shares, 4).tolist()
+            ))
+            for result, start, meal in zip(results, starts.tolist(), meals):
+                result["items"] = [
+                    {
+                        "dish_name": name,
+                        "portions": servings,
+                        "grams": amount if has_weight else None,
+                        "nutrition": dict(zip(NUTRIENT_FIELDS, contribution)),
+                        "calorie_share": share
+                    }
+                    for name, servings, amount, has_weight, contribution, share in detailed[start:start + len(meal)]
+                ]
+        return {
+            "success": True,
+            "meal_count": len(meals),
+            "totals": dict(zip(NUTRIENT_FIELDS, np.round(totals.sum(axis=0), 1).tolist())),
+            "meals": results
+        }
+    
+    def aggregate_meal(self, items: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """aggregate_meals() for a single meal"""
+        result = self.aggregate_meals([items])
+        if not result["success"]:
+            return result
+        return {"success": True, **result["meals"][0]}
     
     def get_nutrition_summary(self) -> Dict[str, Any]:
         """Get summary statistics of nutrition database"""
-        if not self.dishes_dict:
+        dataset = self.dataset
+        table = dataset.table
+        if not len(table):
             return {"error": "No nutrition data loaded"}
         
-        total_dishes = len(self.dishes_dict)
-        avg_calories = sum(dish["calories"] for dish in self.dishes_dict.values()) / total_dishes
-        avg_protein = sum(dish["protein"] for dish in self.dishes_dict.values()) / total_dishes
-        
+        stats = dataset.stats
         return {
-            "total_dishes": total_dishes,
-            "average_calories": round(avg_calories, 1),
-            "average_protein": round(avg_protein, 1),
+            "total_dishes": len(table),
+            "average_calories": round(stats.mean_of("calories"), 1),
+            "average_protein": round(stats.mean_of("protein"), 1),
             "database_status": "loaded",
-            "sample_dishes": list(self.dishes_dict.keys())[:10]
+            "dataset_version": dataset.version,
+            "dataset_etag": dataset.etag,
+            "sample_dishes": table.names[:10],
+            "statistics": stats.summary()
         }
 
 # Global nutrition service instance
@@ -261,5 +766,12 @@ def get_nutrition_service() -> NutritionService:
     """Get or create nutrition service instance (singleton pattern)"""
     global nutrition_service
     if nutrition_service is None:
-        nutrition_service = NutritionService()
+        if os.getenv("NUTRITION_BACKEND", "memory").lower() == "sqlite":
+            from app.services.nutrition_sqlite import SQLiteNutritionService
+            nutrition_service = SQLiteNutritionService(os.getenv("NUTRITION_SQLITE_PATH", "data/nutrition.sqlite"))
+        else:
+            nutrition_service = NutritionService()
+        watch_interval = float(os.getenv("NUTRITION_WATCH_INTERVAL", "0"))
+        if watch_interval > 0:
+            nutrition_service.start_watcher(watch_interval)
     return nutrition_service
\ No newline at end of file
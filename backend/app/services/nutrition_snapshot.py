@@ -0,0 +1,326 @@
+"""
+Memory-mapped binary snapshot of the nutrition catalogue
+Compiled once from the CSV: fixed-width numeric columns, '\\n'-joined string tables, pre-serialized responses
+and open-addressing hash indexes for dish names and aliases. Every worker maps the file read-only, so startup
+skips CSV parsing and the pages are shared between processes
+
+Compile (from backend/):
+    python -m app.services.nutrition_snapshot ../data/nutrition_database.csv
+"""
+import argparse
+import json
+import mmap
+import os
+import struct
+import sys
+import zlib
+from collections.abc import Mapping
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+import numpy as np
+
+from app.services.alias_index import fold_text
+from app.services.nutrition_table import NutritionTable, NUTRIENT_FIELDS
+
+MAGIC = b"NUTRSNAP"
+FORMAT_VERSION = 1
+SNAPSHOT_FILENAME = "nutrition_database.snapshot"
+
+# Numeric columns, stored as little-endian float64 arrays in this order
+COLUMN_FIELDS = NUTRIENT_FIELDS + ["popularity"]
+
+_HEADER_LENGTH = struct.Struct("<I")
+_ALIGN = 8
+_EMPTY = -1
+
+def _hash(key: bytes) -> int:
+    return zlib.crc32(key)
+
+def _hash_table(keys: Sequence[bytes]) -> np.ndarray:
+    """Open-addressing table (linear probing, at most half full) of row numbers, -1 for empty slots"""
+    size = _ALIGN
+    while size < 2 * len(keys):
+        size <<= 1
+    mask = size - 1
+    slots = [_EMPTY] * size
+    for row, key in enumerate(keys):
+        slot = _hash(key) & mask
+        while slots[slot] != _EMPTY:
+            slot = (slot + 1) & mask
+        slots[slot] = row
+    return np.array(slots, dtype='<i4')
+
+def _string_table(values: Sequence[str]) -> Tuple[bytes, np.ndarray]:
+    """'\\n'-joined UTF-8 blob plus the byte offset where each value starts (and one past the end)"""
+    encoded = [value.encode('utf-8') for value in values]
+    if any(b'\n' in value for value in encoded):
+        raise ValueError("Snapshot strings cannot contain newlines")
+    offsets = np.zeros(len(encoded) + 1, dtype='<u8')
+    if encoded:
+        np.cumsum([len(value) + 1 for value in encoded], out=offsets[1:])
+    return b'\n'.join(encoded), offsets
+
+def _dictionary(values: Sequence[str]) -> Tuple[bytes, np.ndarray]:
+    """Distinct values ('\\n'-joined) plus one uint32 code per row; servings and sources repeat a lot"""
+    codes: Dict[str, int] = {}
+    column = np.array([codes.setdefault(value, len(codes)) for value in values], dtype='<u4')
+    return '\n'.join(codes).encode('utf-8'), column
+
+def write_snapshot(path: str, table: NutritionTable, response_bytes: Dict[str, bytes],
+                   aliases: Sequence[Tuple[str, str]], etag: str):
+    """Write a snapshot of `table` (atomically: readers see the old file or the new one)"""
+    names_blob, name_offsets = _string_table(table.names)
+    encoded_names = [name.encode('utf-8') for name in table.names]
+    responses = [response_bytes[name] for name in table.names]
+    response_offsets = np.zeros(len(responses) + 1, dtype='<u8')
+    if responses:
+        np.cumsum([len(body) for body in responses], out=response_offsets[1:])
+    serving_values, serving_codes = _dictionary(table.serving)
+    source_values, source_codes = _dictionary(table.dataset_source)
+    
+    alias_keys = [key for key, dish_name in aliases if dish_name in table]
+    alias_rows = np.array([table.get_row(dish_name) for key, dish_name in aliases if dish_name in table], dtype='<i4')
+    alias_blob, alias_offsets = _string_table(alias_keys)
+    
+    sections: List[Tuple[str, bytes]] = [
+        (field, np.ascontiguousarray(table.popularity if field == "popularity" else table.columns[field], dtype='<f8').tobytes())
+        for field in COLUMN_FIELDS
+    ]
+    sections += [
+        ("names", names_blob),
+        ("name_offsets", name_offsets.tobytes()),
+        ("name_hash", _hash_table(encoded_names).tobytes()),
+        ("serving_values", serving_values),
+        ("serving_codes", serving_codes.tobytes()),
+        ("source_values", source_values),
+        ("source_codes", source_codes.tobytes()),
+        ("responses", b''.join(responses)),
+        ("response_offsets", response_offsets.tobytes()),
+        ("alias_keys", alias_blob),
+        ("alias_offsets", alias_offsets.tobytes()),
+        ("alias_rows", alias_rows.tobytes()),
+        ("alias_hash", _hash_table([key.encode('utf-8') for key in alias_keys]).tobytes()),
+    ]
+    
+    # Section offsets depend on the header length, so lay them out relative to the (padded) header end
+    layout, position = {}, 0
+    for name, data in sections:
+        layout[name] = [position, len(data)]
+        position += len(data) + (-len(data) % _ALIGN)
+    header = {"format": FORMAT_VERSION, "etag": etag, "rows": len(table), "aliases": len(alias_keys), "sections": layout}
+    header_bytes = json.dumps(header, separators=(",", ":")).encode('utf-8')
+    data_start = len(MAGIC) + _HEADER_LENGTH.size + len(header_bytes)
+    data_start += -data_start % _ALIGN
+    
+    tmp_path = f"{path}.tmp-{os.getpid()}"
+    try:
+        with open(tmp_path, 'wb') as f:
+            f.write(MAGIC)
+            f.write(_HEADER_LENGTH.pack(len(header_bytes)))
+            f.write(header_bytes)
+            f.write(b'\0' * (data_start - f.tell()))
+            for name, data in sections:
+                f.write(data)
+                f.write(b'\0' * (-len(data) % _ALIGN))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+class NutritionSnapshot:
+    """Read-only view of a snapshot file; arrays are zero-copy views into the shared mapping"""
+    
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, 'rb') as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        
+        if self._mm[:len(MAGIC)] != MAGIC:
+            raise ValueError(f"{path} is not a nutrition snapshot")
+        (header_length,) = _HEADER_LENGTH.unpack_from(self._mm, len(MAGIC))
+        header_start = len(MAGIC) + _HEADER_LENGTH.size
+        header = json.loads(self._mm[header_start:header_start + header_length])
+        if header.get("format") != FORMAT_VERSION:
+            raise ValueError(f"Unsupported snapshot format {header.get('format')} in {path}")
+        data_start = header_start + header_length
+        data_start += -data_start % _ALIGN
+        self._sections = {name: (data_start + offset, length) for name, (offset, length) in header["sections"].items()}
+        
+        self.etag: str = header["etag"]
+        self.rows: int = header["rows"]
+        self.columns = {field: self._array(field, '<f8') for field in COLUMN_FIELDS}
+        self._name_offsets = self._array("name_offsets", '<u8')
+        self._name_hash = self._array("name_hash", '<i4')
+        self._serving_codes = self._array("serving_codes", '<u4')
+        self._source_codes = self._array("source_codes", '<u4')
+        self._serving_values = self._text("serving_values").split('\n')
+        self._source_values = self._text("source_values").split('\n')
+        self._response_offsets = self._array("response_offsets", '<u8')
+        self._alias_offsets = self._array("alias_offsets", '<u8')
+        self._alias_rows = self._array("alias_rows", '<i4')
+        self._alias_hash = self._array("alias_hash", '<i4')
+        self._names: Optional[List[str]] = None
+    
+    def _array(self, name: str, dtype: str) -> np.ndarray:
+        offset, length = self._sections[name]
+        return np.frombuffer(self._mm, dtype=dtype, count=length // np.dtype(dtype).itemsize, offset=offset)
+    
+    def _text(self, name: str) -> str:
+        offset, length = self._sections[name]
+        return self._mm[offset:offset + length].decode('utf-8')
+    
+    def _string(self, section: str, offsets: np.ndarray, i: int) -> bytes:
+        base = self._sections[section][0]
+        return self._mm[base + int(offsets[i]):base + int(offsets[i + 1]) - 1]
+    
+    def _find(self, key: bytes, table: np.ndarray, section: str, offsets: np.ndarray) -> Optional[int]:
+        """Row stored under `key` in a hash section, or None"""
+        if not len(table):
+            return None
+        mask = len(table) - 1
+        slot = _hash(key) & mask
+        while True:
+            row = int(table[slot])
+            if row == _EMPTY:
+                return None
+            if self._string(section, offsets, row) == key:
+                return row
+            slot = (slot + 1) & mask
+    
+    def __len__(self) -> int:
+        return self.rows
+    
+    @property
+    def names(self) -> List[str]:
+        """All dish names in row order, decoded on first use"""
+        if self._names is None:
+            self._names = self._text("names").split('\n') if self.rows else []
+        return self._names
+    
+    def find(self, dish_name: str) -> Optional[int]:
+        """Row number of a dish, or None"""
+        return self._find(dish_name.encode('utf-8'), self._name_hash, "names", self._name_offsets)
+    
+    def name(self, row: int) -> str:
+        return self._string("names", self._name_offsets, row).decode('utf-8')
+    
+    def serving(self, row: int) -> str:
+        return self._serving_values[self._serving_codes[row]]
+    
+    def dataset_source(self, row: int) -> str:
+        return self._source_values[self._source_codes[row]]
+    
+    def response(self, row: int) -> bytes:
+        base = self._sections["responses"][0]
+        return self._mm[base + int(self._response_offsets[row]):base + int(self._response_offsets[row + 1])]
+    
+    def resolve_alias(self, folded: str) -> Optional[str]:
+        row = self._find(folded.encode('utf-8'), self._alias_hash, "alias_keys", self._alias_offsets)
+        return None if row is None else self.name(int(self._alias_rows[row]))
+    
+    def alias_items(self) -> List[Tuple[str, str]]:
+        keys = self._text("alias_keys").split('\n') if len(self._alias_rows) else []
+        return [(key, self.name(int(row))) for key, row in zip(keys, self._alias_rows)]
+    
+    def file_bytes(self) -> int:
+        return len(self._mm)
+
+class SnapshotTable(NutritionTable):
+    """NutritionTable over a snapshot: columns are views of the mapping and lookups use its hash index"""
+    
+    def __init__(self, snapshot: NutritionSnapshot):
+        self.snapshot = snapshot
+        self.columns = {field: snapshot.columns[field] for field in NUTRIENT_FIELDS}
+        self.popularity = snapshot.columns["popularity"]
+        self._index: Optional[Dict[str, int]] = None
+    
+    @property
+    def names(self) -> List[str]:
+        return self.snapshot.names
+    
+    @property
+    def index(self) -> Dict[str, int]:
+        if self._index is None:
+            self._index = {name: row for row, name in enumerate(self.names)}
+        return self._index
+    
+    @property
+    def serving(self) -> List[str]:
+        return [self.snapshot.serving(row) for row in range(len(self))]
+    
+    @property
+    def dataset_source(self) -> List[str]:
+        return [self.snapshot.dataset_source(row) for row in range(len(self))]
+    
+    def __len__(self) -> int:
+        return self.snapshot.rows
+    
+    def __contains__(self, dish_name: str) -> bool:
+        return self.get_row(dish_name) is not None
+    
+    def get_row(self, dish_name: str) -> Optional[int]:
+        return self.snapshot.find(dish_name)
+    
+    def record(self, row: int) -> Dict[str, Any]:
+        record = {field: float(self.columns[field][row]) for field in NUTRIENT_FIELDS}
+        record['serving'] = self.snapshot.serving(row)
+        record['dataset_source'] = self.snapshot.dataset_source(row)
+        return record
+
+class SnapshotResponses(Mapping):
+    """Dish name -> pre-serialized response, read from the snapshot"""
+    
+    def __init__(self, snapshot: NutritionSnapshot):
+        self.snapshot = snapshot
+    
+    def get(self, dish_name: str, default: Optional[bytes] = None) -> Optional[bytes]:
+        row = self.snapshot.find(dish_name)
+        return default if row is None else self.snapshot.response(row)
+    
+    def __getitem__(self, dish_name: str) -> bytes:
+        body = self.get(dish_name)
+        if body is None:
+            raise KeyError(dish_name)
+        return body
+    
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.snapshot.names)
+    
+    def __len__(self) -> int:
+        return self.snapshot.rows
+
+class SnapshotAliasIndex:
+    """AliasIndex interface over the snapshot's alias hash index"""
+    
+    unknown_targets: List[str] = []
+    
+    def __init__(self, snapshot: NutritionSnapshot):
+        self.snapshot = snapshot
+    
+    def __len__(self) -> int:
+        return len(self.snapshot._alias_rows)
+    
+    def items(self) -> List[Tuple[str, str]]:
+        return self.snapshot.alias_items()
+    
+    def resolve(self, text: str) -> Optional[str]:
+        return self.snapshot.resolve_alias(fold_text(text))
+
+def main(argv: List[str] = None):
+    parser = argparse.ArgumentParser(description="Compile the nutrition CSV into a memory-mapped snapshot")
+    parser.add_argument("csv_path", help="nutrition_database.csv")
+    parser.add_argument("--aliases", default=None, help="alias CSV (default: dish_aliases.csv next to the CSV)")
+    parser.add_argument("--output", default=None, help=f"snapshot path (default: {SNAPSHOT_FILENAME} next to the CSV)")
+    args = parser.parse_args(argv)
+    
+    from app.services.nutrition_service import NutritionService
+    if not os.path.exists(args.csv_path):
+        sys.exit(f"{args.csv_path} not found")
+    output = args.output or os.path.join(os.path.dirname(args.csv_path), SNAPSHOT_FILENAME)
+    service = NutritionService(args.csv_path, args.aliases)
+    service.write_snapshot(output)
+    print(f"Wrote {output} ({os.path.getsize(output) / 2**20:.1f}MB, {service.dish_count()} dishes, etag {service.etag})")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,575 @@
+"""
+SQLite backend for the nutrition catalogue
+Keeps large food composition tables in a local database file (WAL mode) instead of per-worker memory;
+selected with NUTRITION_BACKEND=sqlite
+"""
+import os
+import queue
+import sqlite3
+import threading
+from contextlib import contextmanager
+from typing import Dict, Any, Iterator, List, Optional, Sequence, Tuple
+import numpy as np
+
+from app.services.alias_index import AliasIndex, fold_text
+from app.services.dish_pages import NamePages
+from app.services.fuzzy_index import rank_candidates, EXHAUSTIVE_LIMIT
+from app.services.health_rules import HealthRuleTable, DEFAULT_RULES
+from app.services.meal_matrix import MealMatrix
+from app.services.nutrient_neighbors import NutrientNeighbors
+from app.services.nutrition_stats import CatalogueStats
+from app.services.nutrition_service import NutritionService, MATCH_EXACT, MATCH_NORMALIZED, MATCH_ALIAS, MATCH_FUZZY
+from app.services.nutrition_table import NutritionTable, NUTRIENT_FIELDS, FILTERABLE_FIELDS, DEFAULT_SERVING, DEFAULT_SOURCE
+from app.services.prefix_index import normalize_query, MATCH_PREFIX, MATCH_WORD_PREFIX, MATCH_SUBSTRING
+from app.utils.json_codec import dumps
+
+_RECORD_COLUMNS = ", ".join(["dish_name"] + NUTRIENT_FIELDS + ["serving", "dataset_source"])
+
+SCHEMA = [
+    f"""CREATE TABLE IF NOT EXISTS dishes (
+        id INTEGER PRIMARY KEY,
+        dish_name TEXT NOT NULL UNIQUE,
+        name_lower TEXT NOT NULL,
+        {", ".join(f"{field} REAL NOT NULL" for field in NUTRIENT_FIELDS)},
+        popularity REAL NOT NULL DEFAULT 0,
+        serving TEXT NOT NULL,
+        dataset_source TEXT NOT NULL
+    )""",
+    "CREATE INDEX IF NOT EXISTS idx_dishes_name_lower ON dishes(name_lower)",
+    *[f"CREATE INDEX IF NOT EXISTS idx_dishes_{field} ON dishes({field})" for field in FILTERABLE_FIELDS],
+    "CREATE TABLE IF NOT EXISTS aliases (alias TEXT PRIMARY KEY, dish_name TEXT NOT NULL) WITHOUT ROWID",
+    "CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL) WITHOUT ROWID",
+]
+
+# Trigram full-text index for substring and fuzzy candidate search (SQLite >= 3.34)
+FTS_SCHEMA = "CREATE VIRTUAL TABLE IF NOT EXISTS dish_trigrams USING fts5(name_lower, tokenize='trigram')"
+
+# Fixed statement texts, so each pooled connection prepares them once and reuses them from its statement cache
+SQL_GET = f"SELECT {_RECORD_COLUMNS} FROM dishes WHERE dish_name = ?"
+SQL_ALIAS = "SELECT dish_name FROM aliases WHERE alias = ?"
+SQL_META = "SELECT value FROM meta WHERE key = ?"
+SQL_COUNT = "SELECT COUNT(*) FROM dishes"
+SQL_PAGE = "SELECT dish_name FROM dishes ORDER BY id LIMIT ? OFFSET ?"
+SQL_ALL_NAMES = "SELECT dish_name FROM dishes ORDER BY id"
+SQL_ALL_RECORDS = f"SELECT {_RECORD_COLUMNS} FROM dishes ORDER BY id"
+# Ranking by popularity looks at no more than RANK_WINDOW matches (in name / rowid order), so a one-letter prefix
+# over a million rows stays cheap; results are exact whenever fewer names match
+RANK_WINDOW = 2000
+SQL_PREFIX = f"""SELECT dish_name, name_lower FROM (
+        SELECT dish_name, name_lower, popularity FROM dishes WHERE name_lower >= ? AND name_lower < ?
+        ORDER BY name_lower LIMIT {RANK_WINDOW}
+    ) ORDER BY name_lower != ?, popularity DESC, length(name_lower), name_lower LIMIT ?"""
+SQL_TRIGRAM_SUBSTRING = f"""SELECT dish_name FROM (
+        SELECT d.dish_name, d.name_lower, d.popularity FROM dish_trigrams t JOIN dishes d ON d.id = t.rowid
+        WHERE dish_trigrams MATCH ? LIMIT {RANK_WINDOW}
+    ) ORDER BY popularity DESC, length(name_lower), name_lower LIMIT ?"""
+SQL_SCAN_SUBSTRING = f"""SELECT dish_name FROM (
+        SELECT dish_name, name_lower, popularity FROM dishes WHERE instr(name_lower, ?) > 0 LIMIT {RANK_WINDOW}
+    ) ORDER BY popularity DESC, length(name_lower), name_lower LIMIT ?"""
+SQL_TRIGRAM_CANDIDATES = """SELECT d.dish_name FROM dish_trigrams t JOIN dishes d ON d.id = t.rowid
+    WHERE dish_trigrams MATCH ? ORDER BY t.rank LIMIT ?"""
+
+_KEY_END = "\U0010ffff"
+
+def _fts_phrase(text: str) -> str:
+    """Quote text as one FTS5 phrase"""
+    return '"' + text.replace('"', '""') + '"'
+
+def _record(row: Sequence) -> Dict[str, Any]:
+    record = dict(zip(NUTRIENT_FIELDS, row[1:1 + len(NUTRIENT_FIELDS)]))
+    record["serving"] = row[-2]
+    record["dataset_source"] = row[-1]
+    return record
+
+class SQLiteNutritionStore:
+    """Nutrition catalogue in a SQLite file: one writer connection, a pool of read-only connections"""
+    
+    def __init__(self, db_path: str, pool_size: int = 4):
+        self.db_path = db_path
+        self.pool_size = pool_size
+        
+        directory = os.path.dirname(os.path.abspath(db_path))
+        os.makedirs(directory, exist_ok=True)
+        self._writer = sqlite3.connect(db_path, check_same_thread=False, isolation_level=None)
+        self._writer.execute("PRAGMA journal_mode=WAL")
+        self._writer.execute("PRAGMA synchronous=NORMAL")
+        for statement in SCHEMA:
+            self._writer.execute(statement)
+        try:
+            self._writer.execute(FTS_SCHEMA)
+            self.has_trigrams = True
+        except sqlite3.OperationalError:
+            # SQLite built without FTS5 or too old for the trigram tokenizer: substring search scans the table
+            self.has_trigrams = False
+        self._write_lock = threading.Lock()
+        
+        self._pool: "queue.LifoQueue[sqlite3.Connection]" = queue.LifoQueue()
+        self._opened = 0
+        self._pool_lock = threading.Lock()
+    
+    def _connect_reader(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(f"file:{self.db_path}?mode=ro", uri=True, check_same_thread=False, cached_statements=64)
+        conn.execute("PRAGMA query_only=ON")
+        conn.execute("PRAGMA mmap_size=268435456")
+        return conn
+    
+    @contextmanager
+    def _reader(self) -> Iterator[sqlite3.Connection]:
+        """Borrow a read-only connection; WAL lets readers run while a reload is being written"""
+        try:
+            conn = self._pool.get_nowait()
+        except queue.Empty:
+            with self._pool_lock:
+                can_open = self._opened < self.pool_size
+                if can_open:
+                    self._opened += 1
+            conn = self._connect_reader() if can_open else self._pool.get()
+        try:
+            yield conn
+        finally:
+            self._pool.put(conn)
+    
+    def _meta(self, key: str, default: str) -> str:
+        with self._reader() as conn:
+            row = conn.execute(SQL_META, (key,)).fetchone()
+        return row[0] if row else default
+    
+    @property
+    def version(self) -> int:
+        return int(self._meta("version", "0"))
+    
+    @property
+    def etag(self) -> str:
+        return self._meta("etag", "")
+    
+    def count(self) -> int:
+        with self._reader() as conn:
+            return conn.execute(SQL_COUNT).fetchone()[0]
+    
+    def get(self, dish_name: str) -> Optional[Dict[str, Any]]:
+        """One dish as a plain dict, or None"""
+        with self._reader() as conn:
+            row = conn.execute(SQL_GET, (dish_name,)).fetchone()
+        return _record(row) if row else None
+    
+    def get_many(self, dish_names: Sequence[str]) -> Dict[str, Dict[str, Any]]:
+        """Records for the names that exist, in chunks that stay under SQLite's parameter limit"""
+        dish_names = list(dict.fromkeys(dish_names))
+        records = {}
+        with self._reader() as conn:
+            for start in range(0, len(dish_names), 500):
+                chunk = dish_names[start:start + 500]
+                sql = f"SELECT {_RECORD_COLUMNS} FROM dishes WHERE dish_name IN ({', '.join('?' * len(chunk))})"
+                for row in conn.execute(sql, chunk):
+                    records[row[0]] = _record(row)
+        return records
+    
+    def resolve_alias(self, folded: str) -> Optional[str]:
+        with self._reader() as conn:
+            row = conn.execute(SQL_ALIAS, (folded,)).fetchone()
+        return row[0] if row else None
+    
+    def names_page(self, offset: int, limit: int) -> List[str]:
+        """Dish names in catalogue order"""
+        with self._reader() as conn:
+            return [row[0] for row in conn.execute(SQL_PAGE, (limit, offset))]
+    
+    def all_names(self) -> List[str]:
+        with self._reader() as conn:
+            return [row[0] for row in conn.execute(SQL_ALL_NAMES)]
+    
+    def load_table(self) -> NutritionTable:
+        """The whole catalogue as an in-memory table (for computations that need every row at once)"""
+        with self._reader() as conn:
+            rows = conn.execute(SQL_ALL_RECORDS).fetchall()
+        columns = {field: np.array([row[i] for row in rows], dtype=np.float64) for i, field in enumerate(NUTRIENT_FIELDS, start=1)}
+        return NutritionTable([row[0] for row in rows], columns, [row[-2] for row in rows], [row[-1] for row in rows])
+    
+    def prefix(self, prefix: str, limit: int) -> List[Tuple[str, str]]:
+        """(dish_name, name_lower) for names starting with prefix, exact match first, then by popularity"""
+        with self._reader() as conn:
+            return conn.execute(SQL_PREFIX, (prefix, prefix + _KEY_END, prefix, limit)).fetchall()
+    
+    def substring(self, text: str, limit: int) -> List[str]:
+        """Names containing text, most popular first"""
+        with self._reader() as conn:
+            if self.has_trigrams and len(text) >= 3:
+                rows = conn.execute(SQL_TRIGRAM_SUBSTRING, (_fts_phrase(text), limit))
+            else:
+                rows = conn.execute(SQL_SCAN_SUBSTRING, (text, limit))
+            return [row[0] for row in rows]
+    
+    def similar_candidates(self, text: str, limit: int) -> List[str]:
+        """Names sharing the most trigrams with text (best-effort candidates for fuzzy ranking)"""
+        grams = {text[i:i + 3] for i in range(len(text) - 2)}
+        if not self.has_trigrams or not grams:
+            return self.substring(text[:3], limit) if text else []
+        with self._reader() as conn:
+            query = " OR ".join(_fts_phrase(gram) for gram in sorted(grams))
+            return [row[0] for row in conn.execute(SQL_TRIGRAM_CANDIDATES, (query, limit))]
+    
+    @staticmethod
+    def _range_where(ranges: Dict[str, Tuple[Optional[float], Optional[float]]]) -> Tuple[str, List[float]]:
+        """WHERE clause (or "") and parameters for [min, max] ranges on filterable fields"""
+        clauses, params = [], []
+        for field, (low, high) in ranges.items():
+            if field not in FILTERABLE_FIELDS:
+                raise ValueError(f"Unknown field: {field}")
+            if low is not None:
+                clauses.append(f"{field} >= ?")
+                params.append(low)
+            if high is not None:
+                clauses.append(f"{field} <= ?")
+                params.append(high)
+        return (" WHERE " + " AND ".join(clauses) if clauses else ""), params
+    
+    def _filter_page(self, conn: sqlite3.Connection, where: str, params: List[float], sort_by: Optional[str],
+                     descending: bool, limit: int, offset: int) -> List[Dict[str, Any]]:
+        if sort_by is not None and sort_by not in FILTERABLE_FIELDS:
+            raise ValueError(f"Unknown sort field: {sort_by}")
+        sql = f"SELECT {_RECORD_COLUMNS} FROM dishes" + where
+        sql += f" ORDER BY {sort_by} {'DESC' if descending else 'ASC'}, id" if sort_by else " ORDER BY id"
+        sql += " LIMIT ? OFFSET ?"
+        rows = conn.execute(sql, (*params, limit, offset)).fetchall()
+        return [dict(_record(row), dish_name=row[0]) for row in rows]
+    
+    def filter_range(self, ranges: Dict[str, Tuple[Optional[float], Optional[float]]], sort_by: str = None,
+                     descending: bool = False, limit: int = 20, offset: int = 0) -> List[Dict[str, Any]]:
+        """Dishes whose fields fall inside [min, max] (either bound optional), sorted and paginated"""
+        where, params = self._range_where(ranges)
+        with self._reader() as conn:
+            return self._filter_page(conn, where, params, sort_by, descending, limit, offset)
+    
+    def query_range(self, ranges: Dict[str, Tuple[Optional[float], Optional[float]]], sort_by: str = None,
+                    descending: bool = False, limit: int = 20, offset: int = 0) -> Tuple[int, List[Dict[str, Any]]]:
+        """(total matches, page) like filter_range(), both read in one transaction so a reload committing in
+        between cannot make the total disagree with the rows"""
+        where, params = self._range_where(ranges)
+        with self._reader() as conn:
+            conn.execute("BEGIN")
+            try:
+                total = conn.execute("SELECT COUNT(*) FROM dishes" + where, params).fetchone()[0]
+                return total, self._filter_page(conn, where, params, sort_by, descending, limit, offset)
+            finally:
+                conn.execute("COMMIT")
+    
+    def replace_all(self, table: NutritionTable, aliases: List[Tuple[str, str]], version: int, etag: str):
+        """Replace the whole catalogue in one transaction; readers keep seeing the old data until it commits"""
+        rows = zip(
+            table.names,
+            [name.lower() for name in table.names],
+            *[table.columns[field].tolist() for field in NUTRIENT_FIELDS],
+            table.popularity.tolist(),
+            table.serving,
+            table.dataset_source
+        )
+        placeholders = ", ".join("?" * (len(NUTRIENT_FIELDS) + 5))
+        with self._write_lock:
+            conn = self._writer
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                conn.execute("DELETE FROM dishes")
+                conn.execute("DELETE FROM aliases")
+                conn.executemany(
+                    f"INSERT INTO dishes (dish_name, name_lower, {', '.join(NUTRIENT_FIELDS)}, popularity, serving, dataset_source) "
+                    f"VALUES ({placeholders})",
+                    rows
+                )
+                conn.executemany("INSERT INTO aliases (alias, dish_name) VALUES (?, ?)", aliases)
+                if self.has_trigrams:
+                    conn.execute("DELETE FROM dish_trigrams")
+                    conn.execute("INSERT INTO dish_trigrams (rowid, name_lower) SELECT id, name_lower FROM dishes")
+                self._set_meta(conn, version, etag)
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+            # Fresh statistics let the planner pick the most selective index for range filters
+            conn.execute("ANALYZE")
+            conn.execute("PRAGMA wal_checkpoint(PASSIVE)")
+    
+    def upsert(self, dish_name: str, record: Dict[str, Any], version: int, etag: str):
+        """Add or replace one dish"""
+        values = [float(record.get(field, 0.0)) for field in NUTRIENT_FIELDS]
+        with self._write_lock:
+            conn = self._writer
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                conn.execute(
+                    f"INSERT INTO dishes (dish_name, name_lower, {', '.join(NUTRIENT_FIELDS)}, popularity, serving, dataset_source) "
+                    f"VALUES ({', '.join('?' * (len(NUTRIENT_FIELDS) + 5))}) "
+                    f"ON CONFLICT(dish_name) DO UPDATE SET "
+                    + ", ".join(f"{field} = excluded.{field}" for field in NUTRIENT_FIELDS + ["popularity", "serving", "dataset_source"]),
+                    (dish_name, dish_name.lower(), *values, float(record.get('popularity', 0.0)),
+                     record.get('serving', DEFAULT_SERVING), record.get('dataset_source', DEFAULT_SOURCE))
+                )
+                conn.execute("INSERT OR IGNORE INTO aliases (alias, dish_name) VALUES (?, ?)", (fold_text(dish_name), dish_name))
+                if self.has_trigrams:
+                    row_id = conn.execute("SELECT id FROM dishes WHERE dish_name = ?", (dish_name,)).fetchone()[0]
+                    conn.execute("DELETE FROM dish_trigrams WHERE rowid = ?", (row_id,))
+                    conn.execute("INSERT INTO dish_trigrams (rowid, name_lower) VALUES (?, ?)", (row_id, dish_name.lower()))
+                self._set_meta(conn, version, etag)
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+    
+    @staticmethod
+    def _set_meta(conn: sqlite3.Connection, version: int, etag: str):
+        conn.executemany(
+            "INSERT INTO meta (key, value) VALUES (?, ?) ON CONFLICT(key) DO UPDATE SET value = excluded.value",
+            [("version", str(version)), ("etag", etag)]
+        )
+    
+    def file_bytes(self) -> int:
+        return sum(os.path.getsize(path) for path in (self.db_path, self.db_path + "-wal") if os.path.exists(path))
+
+class SQLiteNutritionService(NutritionService):
+    """NutritionService with the same API, serving from SQLite instead of in-memory tables and indexes"""
+    
+    dataset = None
+    
+    def __init__(self, db_path: str, csv_path: str = None, aliases_path: str = None, pool_size: int = 4,
+                 health_rules_path: str = None):
+        self.csv_path = csv_path or "../../data/nutrition_database.csv"
+        self.aliases_path = aliases_path or os.getenv("DISH_ALIASES_PATH")
+        self.health_rules_path = health_rules_path or os.getenv("HEALTH_RULES_PATH")
+        self.health_rules = HealthRuleTable(DEFAULT_RULES)
+        self.source_path = None
+        self.aliases = []
+        self._custom_dishes = {}
+        self._reload_lock = threading.Lock()
+        self._watcher = None
+        self.last_reload = None
+        self.store = SQLiteNutritionStore(db_path, pool_size=pool_size)
+        self._neighbors = (None, None)  # (store version, NutrientNeighbors)
+        self._meals = (None, None)  # (store version, MealMatrix)
+        self._stats = (None, None)  # (store version, CatalogueStats)
+        self._name_pages = NamePages()
+        
+        # Import the CSV only when the database does not already hold it (e.g. another worker imported it)
+        found = self._locate_sources() is not None
+        if not found and self.store.count():
+            self._load_health_rules()
+            print(f"Serving nutrition data from {db_path} (no CSV found)")
+        elif not self.store.count() or self._compute_etag() != self.store.etag:
+            table = self._load_nutrition_database()
+            self._load_aliases()
+            self._load_health_rules()
+            self._publish(table, self.store.version + 1, self._compute_etag())
+        else:
+            self._load_aliases()
+            self._load_health_rules()
+            print(f"Serving nutrition data from {db_path} ({self.store.count()} dishes, up to date)")
+    
+    @property
+    def table(self) -> NutritionTable:
+        raise RuntimeError("The SQLite nutrition backend has no in-memory table")
+    
+    @property
+    def version(self) -> int:
+        return self.store.version
+    
+    @property
+    def etag(self) -> str:
+        return self.store.etag
+    
+    def dish_count(self) -> int:
+        return self.store.count()
+    
+    def _publish(self, table: NutritionTable, version: int, etag: str):
+        aliases = AliasIndex(table.names, self.aliases)
+        self.store.replace_all(table, aliases.items(), version, etag)
+    
+    def _resolve(self, dish_name: str) -> Optional[Tuple[str, Dict[str, Any]]]:
+        """(canonical name, record) for an exact, normalized or aliased name"""
+        normalized_name = dish_name.lower().replace(' ', '_').replace('-', '_')
+        for name in (dish_name, normalized_name):
+            record = self.store.get(name)
+            if record is not None:
+                return name, record
+        canonical = self.store.resolve_alias(fold_text(dish_name))
+        if canonical is not None:
+            record = self.store.get(canonical)
+            if record is not None:
+                return canonical, record
+        return None
+    
+    def get_nutrition(self, dish_name: str, with_suggestions: bool = True) -> Dict[str, Any]:
+        """Get nutrition information for a specific dish (health suggestions are left out unless with_suggestions)"""
+        normalized_name = dish_name.lower().replace(' ', '_').replace('-', '_')
+        
+        resolved = self._resolve(dish_name)
+        if resolved is not None:
+            return self._build_nutrition_response(*resolved, with_suggestions=with_suggestions)
+        
+        similar_dishes = self._find_similar_dishes(normalized_name, limit=5)
+        for closest_match in similar_dishes:
+            record = self.store.get(closest_match)
+            if record is not None:
+                response = self._build_nutrition_response(closest_match, record, with_suggestions=with_suggestions)
+                response["match_info"] = f"Closest match for '{dish_name}'"
+                return response
+        
+        return {
+            "success": False,
+            "error": f"Nutrition information not found for '{dish_name}'",
+            "dish_name": dish_name,
+            "available_dishes": self.store.names_page(0, 20),
+            "suggestions": similar_dishes
+        }
+    
+    def _match_dish(self, dish_name: str, fuzzy: bool = True, dataset=None) -> Tuple[Optional[str], Optional[str]]:
+        normalized_name = dish_name.lower().replace(' ', '_').replace('-', '_')
+        for name, match in ((dish_name, MATCH_EXACT), (normalized_name, MATCH_NORMALIZED)):
+            if self.store.get(name) is not None:
+                return name, match
+        canonical = self.store.resolve_alias(fold_text(dish_name))
+        if canonical is not None and self.store.get(canonical) is not None:
+            return canonical, MATCH_ALIAS
+        if fuzzy:
+            for closest_match in self._find_similar_dishes(normalized_name, limit=5):
+                if self.store.get(closest_match) is not None:
+                    return closest_match, MATCH_FUZZY
+        return None, None
+    
+    def _batch_columns(self, dish_names: List[Optional[str]], dataset=None) -> Dict[str, list]:
+        records = self.store.get_many([name for name in dish_names if name is not None])
+        return {
+            key: [records[name][key] if name in records else None for name in dish_names]
+            for key in NUTRIENT_FIELDS + ["serving", "dataset_source"]
+        }
+    
+    def get_nutrition_json(self, dish_name: str) -> Optional[bytes]:
+        """Serialized response for an exact, normalized or aliased dish name, None if it needs fuzzy matching"""
+        resolved = self._resolve(dish_name)
+        return dumps(self._build_nutrition_response(*resolved)) if resolved is not None else None
+    
+    def _find_similar_dishes(self, dish_name: str, limit: int = 5, dataset=None) -> List[str]:
+        try:
+            if self.store.count() <= EXHAUSTIVE_LIMIT:
+                candidates = self.store.all_names()
+            else:
+                candidates = self.store.similar_candidates(dish_name, 50)
+            return rank_candidates(dish_name, candidates, limit, 0.3)
+        except Exception:
+            return []
+    
+    def _complete(self, query: str, limit: int) -> List[Tuple[str, str]]:
+        query = normalize_query(query)
+        if not query:
+            return []
+        results = [
+            (dish_name, MATCH_EXACT if name_lower == query else MATCH_PREFIX)
+            for dish_name, name_lower in self.store.prefix(query, limit)
+        ]
+        seen = {dish_name for dish_name, _ in results}
+        # A later word starts right after an underscore, so "_" + query finds word prefixes
+        for match, text in ((MATCH_WORD_PREFIX, "_" + query), (MATCH_SUBSTRING, query)):
+            if len(results) >= limit:
+                break
+            for dish_name in self.store.substring(text, limit + len(seen)):
+                if dish_name not in seen:
+                    results.append((dish_name, match))
+                    seen.add(dish_name)
+        return results[:limit]
+    
+    def add_dish(self, dish_name: str, nutrition: Dict[str, Any]):
+        """Add or replace a dish at runtime (e.g. a class registered from example images)"""
+        record = dict(nutrition)
+        record.setdefault('serving', '1 serving')
+        record.setdefault('dataset_source', 'Custom')
+        with self._reload_lock:
+            if self._custom_dishes.get(dish_name) == record:
+                return
+            self._custom_dishes[dish_name] = record
+            version, stats = self._stats
+            appended = self.store.get(dish_name) is None
+            self.store.upsert(dish_name, record, self.store.version + 1, self._compute_etag())
+            # Statistics of the previous version plus one new dish are still current; a replaced dish needs a full pass
+            if appended and stats is not None and version == self.store.version - 1:
+                self._stats = (self.store.version, stats.with_dish(record, record['dataset_source']))
+    
+    def get_all_dishes(self) -> List[str]:
+        """Get list of all available dishes"""
+        return self.store.all_names()
+    
+    def list_dishes(self, cursor: str = None, limit: int = 20, offset: int = 0) -> Dict[str, Any]:
+        """A page of dish names in name order; each database version is read and sorted once"""
+        return self._name_pages.page(self.store.version, self.store.all_names, cursor, limit, offset)
+    
+    def query_dishes(self, ranges: Dict[str, Tuple[Optional[float], Optional[float]]], sort_by: str = None,
+                     descending: bool = False, limit: int = 20, offset: int = 0) -> Dict[str, Any]:
+        """Dishes whose nutrients fall inside [min, max] ranges, answered from the per-column SQLite indexes"""
+        total, records = self.store.query_range(ranges, sort_by, descending, limit, offset)
+        return {
+            "total_matches": total,
+            "dishes": [dict(dish_name=record.pop("dish_name"), **record) for record in records]
+        }
+    
+    def _canonical_name(self, dish_name: str) -> Optional[str]:
+        resolved = self._resolve(dish_name)
+        return resolved[0] if resolved is not None else None
+    
+    def _neighbor_index(self) -> NutrientNeighbors:
+        """Neighbour search needs the whole nutrient matrix, so it is loaded once per database version"""
+        version, neighbors = self._neighbors
+        if version != self.store.version:
+            version = self.store.version
+            neighbors = NutrientNeighbors(self.store.load_table())
+            self._neighbors = (version, neighbors)
+        return neighbors
+    
+    def _meal_index(self) -> MealMatrix:
+        """Like the neighbour index, the per-gram matrix covers every dish and is built once per database version"""
+        version, matrix = self._meals
+        if version != self.store.version:
+            version = self.store.version
+            matrix = MealMatrix(self.store.load_table())
+            self._meals = (version, matrix)
+        return matrix
+    
+    def _catalogue_stats(self) -> CatalogueStats:
+        """Summary statistics, computed from the whole table once per database version"""
+        version, stats = self._stats
+        if version != self.store.version:
+            version = self.store.version
+            stats = CatalogueStats.from_table(self.store.load_table())
+            self._stats = (version, stats)
+        return stats
+    
+    def get_nutrition_summary(self) -> Dict[str, Any]:
+        """Get summary statistics of nutrition database"""
+        stats = self._catalogue_stats()
+        total_dishes = int(stats.count[0])
+        if not total_dishes:
+            return {"error": "No nutrition data loaded"}
+        
+        return {
+            "total_dishes": total_dishes,
+            "average_calories": round(stats.mean_of("calories"), 1),
+            "average_protein": round(stats.mean_of("protein"), 1),
+            "database_status": "loaded",
+            "dataset_version": self.version,
+            "dataset_etag": self.etag,
+            "sample_dishes": self.store.names_page(0, 10),
+            "statistics": stats.summary()
+        }
+    
+    def get_status(self) -> Dict[str, Any]:
+        """Active dataset version and reload history, for status endpoints"""
+        return {
+            "backend": "sqlite",
+            "version": self.version,
+            "etag": self.etag,
+            "dishes": self.store.count(),
+            "database_path": self.store.db_path,
+            "database_bytes": self.store.file_bytes(),
+            "trigram_index": self.store.has_trigrams,
+            "source_path": self.source_path,
+            "aliases_path": self.aliases_path,
+            "health_rules_path": self.health_rules_path,
+            "custom_dishes": len(self._custom_dishes),
+            "watching": self._watcher is not None,
+            "last_reload": self.last_reload
+        }
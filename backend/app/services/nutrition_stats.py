@@ -0,0 +1,164 @@
+"""
+Summary statistics of the nutrition catalogue, overall and per dataset_source
+Built with a few vectorized passes once per dataset version, and kept as streaming state (count, mean, sum of squared
+deviations, min, max, fixed-edge histograms) so a dish appended at runtime updates them without another pass
+"""
+from typing import Dict, Any, List, Mapping, Optional
+import numpy as np
+
+from app.services.nutrition_table import NutritionTable, NUTRIENT_FIELDS
+
+PERCENTILES = (5, 25, 50, 75, 95)
+HISTOGRAM_BINS = 20
+ALL_SOURCES = "all"
+
+def _histogram_edges(values: np.ndarray) -> np.ndarray:
+    low, high = (float(values.min()), float(values.max())) if len(values) else (0.0, 1.0)
+    return np.linspace(low, high if high > low else low + 1.0, HISTOGRAM_BINS + 1)
+
+def _bins(values: np.ndarray, edges: np.ndarray) -> np.ndarray:
+    """Histogram bin of each value; values outside the edges (appended later) count in the first or last bin"""
+    scaled = (values - edges[0]) / (edges[-1] - edges[0]) * HISTOGRAM_BINS
+    return np.clip(np.floor(scaled), 0, HISTOGRAM_BINS - 1).astype(np.int64)
+
+class CatalogueStats:
+    """Per-group (all dishes, then each dataset_source) and per-nutrient statistics; never modified, only replaced"""
+    
+    def __init__(self, groups: List[str], count: np.ndarray, mean: np.ndarray, m2: np.ndarray, minimum: np.ndarray,
+                 maximum: np.ndarray, edges: np.ndarray, histogram: np.ndarray, percentiles: np.ndarray,
+                 percentiles_exact: bool = True):
+        self.groups = groups  # ALL_SOURCES first
+        self.count = count  # (groups,)
+        self.mean = mean  # (groups, nutrients)
+        self.m2 = m2  # (groups, nutrients) sum of squared deviations from the mean
+        self.minimum = minimum
+        self.maximum = maximum
+        self.edges = edges  # (nutrients, bins + 1), shared by all groups
+        self.histogram = histogram  # (groups, nutrients, bins)
+        self.percentiles = percentiles  # (groups, nutrients, len(PERCENTILES))
+        self.percentiles_exact = percentiles_exact
+        self._summary = None
+    
+    @classmethod
+    def from_table(cls, table: NutritionTable) -> "CatalogueStats":
+        sources = table.dataset_source
+        # Group 0 is the whole catalogue, sources follow in name order
+        order = sorted(dict.fromkeys(sources), key=str)
+        group_of = {source: group for group, source in enumerate(order, start=1)}
+        codes = np.fromiter(map(group_of.__getitem__, sources), dtype=np.int64, count=len(sources))
+        groups = [ALL_SOURCES] + order
+        size, fields = len(groups), len(NUTRIENT_FIELDS)
+        
+        count = np.bincount(codes, minlength=size).astype(np.float64)
+        count[0] = len(table)
+        mean, m2 = np.zeros((size, fields)), np.zeros((size, fields))
+        minimum, maximum = np.full((size, fields), np.nan), np.full((size, fields), np.nan)
+        edges = np.empty((fields, HISTOGRAM_BINS + 1))
+        histogram = np.zeros((size, fields, HISTOGRAM_BINS), dtype=np.int64)
+        percentiles = np.full((size, fields, len(PERCENTILES)), np.nan)
+        by_group = np.argsort(codes, kind='stable')
+        ends = np.cumsum(count[1:]).astype(np.int64).tolist()
+        bounds = list(zip([0] + ends[:-1], ends))
+        
+        with np.errstate(invalid='ignore', divide='ignore'):
+            for j, field in enumerate(NUTRIENT_FIELDS):
+                values = table.columns[field]
+                group_sums = np.bincount(codes, weights=values, minlength=size)
+                group_sums[0] = values.sum()
+                mean[:, j] = np.divide(group_sums, count, out=np.zeros(size), where=count > 0)
+                group_m2 = np.bincount(codes, weights=(values - mean[codes, j]) ** 2, minlength=size)
+                group_m2[0] = ((values - mean[0, j]) ** 2).sum()
+                m2[:, j] = group_m2
+                
+                edges[j] = _histogram_edges(values)
+                bins = _bins(values, edges[j])
+                histogram[:, j] = np.bincount(codes * HISTOGRAM_BINS + bins, minlength=size * HISTOGRAM_BINS).reshape(size, HISTOGRAM_BINS)
+                histogram[0, j] = np.bincount(bins, minlength=HISTOGRAM_BINS)
+                
+                # Rows grouped by source once, then each group's percentiles by partitioning its own run
+                grouped = values[by_group]
+                for group, (start, end) in enumerate(bounds, start=1):
+                    cls._fill(grouped[start:end], group, j, minimum, maximum, percentiles)
+                cls._fill(values, 0, j, minimum, maximum, percentiles)
+        return cls(groups, count, mean, m2, minimum, maximum, edges, histogram, percentiles)
+    
+    @staticmethod
+    def _fill(values: np.ndarray, group: int, j: int, minimum: np.ndarray, maximum: np.ndarray, percentiles: np.ndarray):
+        if len(values):
+            minimum[group, j], maximum[group, j] = values.min(), values.max()
+            percentiles[group, j] = np.percentile(values, PERCENTILES)
+    
+    def with_dish(self, record: Mapping[str, Any], source: str) -> "CatalogueStats":
+        """Statistics after appending one (new) dish: Welford updates of the moments, one histogram increment per
+        nutrient, and percentiles re-estimated from the histograms"""
+        groups = list(self.groups)
+        count, mean, m2 = self.count.copy(), self.mean.copy(), self.m2.copy()
+        minimum, maximum = self.minimum.copy(), self.maximum.copy()
+        histogram, percentiles = self.histogram.copy(), self.percentiles.copy()
+        if source not in groups:
+            groups.append(source)
+            count = np.append(count, 0.0)
+            mean, m2 = np.vstack([mean, np.zeros(len(NUTRIENT_FIELDS))]), np.vstack([m2, np.zeros(len(NUTRIENT_FIELDS))])
+            minimum = np.vstack([minimum, np.full(len(NUTRIENT_FIELDS), np.nan)])
+            maximum = np.vstack([maximum, np.full(len(NUTRIENT_FIELDS), np.nan)])
+            histogram = np.concatenate([histogram, np.zeros((1,) + histogram.shape[1:], dtype=np.int64)])
+            percentiles = np.concatenate([percentiles, np.full((1,) + percentiles.shape[1:], np.nan)])
+        
+        values = np.array([float(record.get(field, 0.0)) for field in NUTRIENT_FIELDS])
+        bins = np.array([_bins(values[j:j + 1], self.edges[j])[0] for j in range(len(NUTRIENT_FIELDS))])
+        for group in (0, groups.index(source)):
+            count[group] += 1
+            delta = values - mean[group]
+            mean[group] += delta / count[group]
+            m2[group] += delta * (values - mean[group])
+            minimum[group] = np.fmin(minimum[group], values)
+            maximum[group] = np.fmax(maximum[group], values)
+            histogram[group, np.arange(len(NUTRIENT_FIELDS)), bins] += 1
+            estimates = np.array([self._estimate(histogram[group, j], self.edges[j]) for j in range(len(NUTRIENT_FIELDS))])
+            # Appended values beyond the edges sit in the end bins; keep the estimates within the group's range
+            percentiles[group] = np.clip(estimates, minimum[group][:, None], maximum[group][:, None])
+        return CatalogueStats(groups, count, mean, m2, minimum, maximum, self.edges, histogram, percentiles, percentiles_exact=False)
+    
+    @staticmethod
+    def _estimate(counts: np.ndarray, edges: np.ndarray) -> List[float]:
+        """Percentiles from a histogram, assuming values are spread evenly within each bin"""
+        cumulative = np.concatenate([[0], np.cumsum(counts)])
+        if cumulative[-1] == 0:
+            return [np.nan] * len(PERCENTILES)
+        return np.interp(np.array(PERCENTILES) / 100.0 * cumulative[-1], cumulative, edges).tolist()
+    
+    def _group_summary(self, group: int) -> Dict[str, Any]:
+        std = np.sqrt(self.m2[group] / self.count[group]) if self.count[group] else np.full(len(NUTRIENT_FIELDS), np.nan)
+        
+        def number(value: float) -> Optional[float]:
+            return round(float(value), 2) if np.isfinite(value) else None
+        
+        return {
+            "dishes": int(self.count[group]),
+            "nutrients": {
+                field: {
+                    "mean": number(self.mean[group, j]) if self.count[group] else None,
+                    "std": number(std[j]),
+                    "min": number(self.minimum[group, j]),
+                    "max": number(self.maximum[group, j]),
+                    "percentiles": {f"p{q}": number(value) for q, value in zip(PERCENTILES, self.percentiles[group, j])},
+                    "histogram": {
+                        "edges": [round(float(edge), 2) for edge in self.edges[j]],
+                        "counts": self.histogram[group, j].tolist()
+                    }
+                }
+                for j, field in enumerate(NUTRIENT_FIELDS)
+            }
+        }
+    
+    def summary(self) -> Dict[str, Any]:
+        """JSON-ready statistics, built on first use and then returned as is"""
+        if self._summary is None:
+            summary = self._group_summary(0)
+            summary["percentiles_exact"] = self.percentiles_exact
+            summary["by_source"] = {source: self._group_summary(group) for group, source in enumerate(self.groups) if group > 0}
+            self._summary = summary
+        return self._summary
+    
+    def mean_of(self, field: str) -> float:
+        return float(self.mean[0, NUTRIENT_FIELDS.index(field)])
@@ -0,0 +1,177 @@
+"""
+Columnar nutrition table: typed NumPy arrays per nutrient plus a dish name -> row index
+Loaded straight from CSV with the standard library (no pandas)
+"""
+import csv
+import gc
+import numpy as np
+from typing import Dict, Any, Iterable, List, Optional
+
+# Nutrient columns, in matrix column order
+NUTRIENT_FIELDS = ["calories", "protein", "fat", "carbs", "fiber"]
+
+# Columns that range filters and sorting may use
+FILTERABLE_FIELDS = NUTRIENT_FIELDS + ["popularity"]
+
+# Value used when a nutrient column is missing from the source (fiber is not in the CSV)
+NUTRIENT_DEFAULTS = {"calories": 0.0, "protein": 0.0, "fat": 0.0, "carbs": 0.0, "fiber": 2.0}
+
+DEFAULT_SERVING = "1 serving"
+DEFAULT_SOURCE = "Unknown"
+
+def _parse_float_column(values: Iterable[str], default: float) -> np.ndarray:
+    """Convert a column of strings in one NumPy call; fall back per value when cells are empty or invalid"""
+    values = list(values)
+    try:
+        return np.array(values, dtype=np.float64)
+    except ValueError:
+        parsed = np.empty(len(values), dtype=np.float64)
+        for i, value in enumerate(values):
+            try:
+                parsed[i] = float(value)
+            except ValueError:
+                parsed[i] = default
+        return parsed
+
+class NutritionTable:
+    """Immutable columnar nutrition catalogue"""
+    
+    def __init__(self, names: List[str], columns: Dict[str, np.ndarray], serving: List[str], dataset_source: List[str],
+                 popularity: Optional[np.ndarray] = None):
+        if popularity is None:
+            popularity = np.zeros(len(names), dtype=np.float64)
+        index = {name: row for row, name in enumerate(names)}
+        if len(index) != len(names):
+            # Duplicate dish names: keep the last occurrence, like a dict built row by row
+            keep = np.array(sorted(index.values()), dtype=np.int64)
+            names = [names[row] for row in keep]
+            columns = {field: values[keep] for field, values in columns.items()}
+            serving = [serving[row] for row in keep]
+            dataset_source = [dataset_source[row] for row in keep]
+            popularity = popularity[keep]
+            index = {name: row for row, name in enumerate(names)}
+        
+        self.names = names
+        self.index = index
+        self.columns = {}
+        for field in NUTRIENT_FIELDS:
+            values = columns.get(field)
+            if values is None:
+                values = np.full(len(names), NUTRIENT_DEFAULTS[field], dtype=np.float64)
+            values = np.ascontiguousarray(values, dtype=np.float64)
+            values.setflags(write=False)
+            self.columns[field] = values
+        self.serving = serving
+        self.dataset_source = dataset_source
+        # Optional ranking signal for autocomplete (e.g. order counts); 0 when the source has none
+        self.popularity = np.ascontiguousarray(popularity, dtype=np.float64)
+        self.popularity.setflags(write=False)
+    
+    @classmethod
+    def from_csv(cls, path: str) -> "NutritionTable":
+        """Parse a nutrition CSV (header row with at least dish_name) into columns"""
+        # Millions of short-lived row lists would trigger repeated cyclic GC passes; none are cyclic
+        gc_was_enabled = gc.isenabled()
+        gc.disable()
+        try:
+            with open(path, newline='', encoding='utf-8') as f:
+                reader = csv.reader(f)
+                header = [name.strip() for name in next(reader)]
+                width = len(header)
+                rows = [row if len(row) == width else (row + [''] * width)[:width] for row in reader if row]
+            
+            positions = {name: i for i, name in enumerate(header)}
+            if 'dish_name' not in positions:
+                raise ValueError(f"Missing 'dish_name' column in {path}")
+            
+            raw_columns = list(zip(*rows)) if rows else [()] * width
+            names = [name.strip() for name in raw_columns[positions['dish_name']]]
+            
+            columns = {
+                field: _parse_float_column(raw_columns[positions[field]], NUTRIENT_DEFAULTS[field])
+                for field in NUTRIENT_FIELDS if field in positions
+            }
+            serving = [value or DEFAULT_SERVING for value in raw_columns[positions['serving']]] \
+                if 'serving' in positions else [DEFAULT_SERVING] * len(names)
+            if 'dataset_source' in positions:
+                # Only a handful of distinct sources: share one string object per value
+                shared = {}
+                dataset_source = [shared.setdefault(value, value) or DEFAULT_SOURCE for value in raw_columns[positions['dataset_source']]]
+            else:
+                dataset_source = [DEFAULT_SOURCE] * len(names)
+            popularity = _parse_float_column(raw_columns[positions['popularity']], 0.0) \
+                if 'popularity' in positions else None
+            del rows, raw_columns
+        finally:
+            if gc_was_enabled:
+                gc.enable()
+        
+        return cls(names, columns, serving, dataset_source, popularity)
+    
+    @classmethod
+    def from_records(cls, records: Dict[str, Dict[str, Any]]) -> "NutritionTable":
+        """Build a table from {dish_name: {calories, protein, ..., serving, dataset_source}}"""
+        names = list(records.keys())
+        columns = {
+            field: np.array([float(records[name].get(field, NUTRIENT_DEFAULTS[field])) for name in names], dtype=np.float64)
+            for field in NUTRIENT_FIELDS
+        }
+        serving = [records[name].get('serving', DEFAULT_SERVING) for name in names]
+        dataset_source = [records[name].get('dataset_source', DEFAULT_SOURCE) for name in names]
+        popularity = np.array([float(records[name].get('popularity', 0.0)) for name in names], dtype=np.float64)
+        return cls(names, columns, serving, dataset_source, popularity)
+    
+    def __len__(self) -> int:
+        return len(self.names)
+    
+    def __contains__(self, dish_name: str) -> bool:
+        return dish_name in self.index
+    
+    def get_row(self, dish_name: str) -> Optional[int]:
+        """Row number of a dish, or None"""
+        return self.index.get(dish_name)
+    
+    def record(self, row: int) -> Dict[str, Any]:
+        """One dish as a plain dict of Python values"""
+        record = {field: float(self.columns[field][row]) for field in NUTRIENT_FIELDS}
+        record['serving'] = self.serving[row]
+        record['dataset_source'] = self.dataset_source[row]
+        return record
+    
+    def with_record(self, dish_name: str, record: Dict[str, Any]) -> "NutritionTable":
+        """Copy of the table with one dish added or replaced"""
+        row = self.index.get(dish_name)
+        names = list(self.names)
+        serving = list(self.serving)
+        dataset_source = list(self.dataset_source)
+        popularity = float(record.get('popularity', 0.0 if row is None else self.popularity[row]))
+        columns = {}
+        
+        for field in NUTRIENT_FIELDS:
+            value = float(record.get(field, NUTRIENT_DEFAULTS[field]))
+            if row is None:
+                columns[field] = np.append(self.columns[field], value)
+            else:
+                columns[field] = self.columns[field].copy()
+                columns[field][row] = value
+        
+        if row is None:
+            names.append(dish_name)
+            serving.append(record.get('serving', DEFAULT_SERVING))
+            dataset_source.append(record.get('dataset_source', DEFAULT_SOURCE))
+            popularity_column = np.append(self.popularity, popularity)
+        else:
+            serving[row] = record.get('serving', DEFAULT_SERVING)
+            dataset_source[row] = record.get('dataset_source', DEFAULT_SOURCE)
+            popularity_column = self.popularity.copy()
+            popularity_column[row] = popularity
+        
+        return NutritionTable(names, columns, serving, dataset_source, popularity_column)
+    
+    def nutrient_matrix(self, fields: List[str] = NUTRIENT_FIELDS) -> np.ndarray:
+        """(dishes, nutrients) matrix for vectorized queries"""
+        return np.column_stack([self.columns[field] for field in fields]) if len(self) else np.empty((0, len(fields)))
+    
+    def memory_bytes(self) -> int:
+        """Approximate bytes held by the numeric columns"""
+        return sum(values.nbytes for values in self.columns.values())
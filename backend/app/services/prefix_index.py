@@ -0,0 +1,159 @@
+"""
+Prefix index for dish name autocomplete
+Sorted arrays of lowercased names (and of the word suffixes after each '_'), searched with bisect,
+with a substring scan as the last resort
+"""
+from bisect import bisect_left, bisect_right
+from typing import Dict, List, Optional, Sequence, Tuple
+import numpy as np
+
+# Match quality, best first
+MATCH_EXACT = "exact"
+MATCH_PREFIX = "prefix"
+MATCH_WORD_PREFIX = "word_prefix"
+MATCH_SUBSTRING = "substring"
+
+# Sorts after every character that appears in dish names, so [prefix, prefix + _KEY_END) spans all keys with that prefix
+_KEY_END = "\U0010ffff"
+
+def normalize_query(text: str) -> str:
+    """Same normalization as NutritionService.get_nutrition"""
+    return text.strip().lower().replace(' ', '_').replace('-', '_')
+
+class _SortedKeys:
+    """Sorted keys with the name id and rank of each key, for top-k lookups over a prefix range"""
+    
+    def __init__(self, keys: List[str], name_ids: np.ndarray, name_ranks: np.ndarray, short_prefix_len: int = 2, short_prefix_top: int = 64):
+        order = sorted(range(len(keys)), key=keys.__getitem__)
+        self.keys = [keys[i] for i in order]
+        self.name_ids = name_ids[np.array(order, dtype=np.int64)] if order else np.empty(0, dtype=np.int64)
+        self.ranks = name_ranks[self.name_ids]
+        
+        # One or two typed characters match the widest ranges, so their best positions are computed up front
+        self.short_prefix_top = short_prefix_top
+        self._short: Dict[str, np.ndarray] = {}
+        for length in range(1, short_prefix_len + 1):
+            for prefix in sorted({key[:length] for key in self.keys if len(key) >= length}):
+                lo, hi = self.prefix_range(prefix)
+                self._short[prefix] = self.top(lo, hi, short_prefix_top)
+    
+    def prefix_range(self, prefix: str) -> Tuple[int, int]:
+        return bisect_left(self.keys, prefix), bisect_left(self.keys, prefix + _KEY_END)
+    
+    def top(self, lo: int, hi: int, k: int) -> np.ndarray:
+        """Positions in [lo, hi) holding the k best-ranked keys, best first"""
+        ranks = self.ranks[lo:hi]
+        if len(ranks) > k:
+            part = np.argpartition(ranks, k - 1)[:k]
+        else:
+            part = np.arange(len(ranks))
+        return lo + part[np.argsort(ranks[part], kind='stable')]
+    
+    def top_in_prefix(self, prefix: str, lo: int, hi: int, k: int) -> np.ndarray:
+        """Like top(), using the precomputed positions when [lo, hi) lies inside a short prefix's range"""
+        cached = self._short.get(prefix)
+        if cached is None:
+            return self.top(lo, hi, k)
+        picked = cached[(cached >= lo) & (cached < hi)]
+        if len(picked) >= k or len(cached) < self.short_prefix_top:
+            return picked[:k]
+        return self.top(lo, hi, k)
+
+class PrefixIndex:
+    """Autocomplete over a fixed list of dish names, ranked by match quality then popularity"""
+    
+    def __init__(self, names: Sequence[str], popularity: Optional[np.ndarray] = None):
+        self.names = list(names)
+        lowered = []
+        for name in self.names:
+            low = name.lower()
+            lowered.append(name if low == name else low)
+        
+        # Global rank of every name: most popular first, then shorter (more generic) names, then alphabetical
+        if popularity is None or len(popularity) != len(self.names):
+            popularity = np.zeros(len(self.names))
+        order = sorted(range(len(self.names)), key=lambda i: (-popularity[i], len(lowered[i]), lowered[i]))
+        ranks = np.empty(len(self.names), dtype=np.int64)
+        ranks[np.array(order, dtype=np.int64)] = np.arange(len(order))
+        self._ranks = ranks
+        self._by_rank = np.array(order, dtype=np.int64)
+        
+        self._names = _SortedKeys(lowered, np.arange(len(lowered), dtype=np.int64), ranks)
+        
+        # Word suffixes after the first word ("bun_bo_hue" -> "bo_hue", "hue"); the first word is covered by _names
+        suffixes, suffix_ids = [], []
+        for name_id, low in enumerate(lowered):
+            start = low.find('_')
+            while start != -1:
+                if start + 1 < len(low):
+                    suffixes.append(low[start + 1:])
+                    suffix_ids.append(name_id)
+                start = low.find('_', start + 1)
+        self._words = _SortedKeys(suffixes, np.array(suffix_ids, dtype=np.int64), ranks)
+        
+        # One string for the substring fallback, best-ranked name first, so a scan can stop at the first hits;
+        # each name is followed by '\n' so matches never straddle two names
+        self._joined = ''.join(lowered[i] + '\n' for i in order)
+        self._offsets = np.cumsum([0] + [len(lowered[i]) + 1 for i in order[:-1]]) if order else np.empty(0, dtype=np.int64)
+    
+    def __len__(self) -> int:
+        return len(self.names)
+    
+    def complete(self, query: str, limit: int = 10, substring: bool = True) -> List[Tuple[str, str]]:
+        """Up to `limit` (dish_name, match_type) pairs: exact, then prefix, word prefix and substring matches"""
+        query = normalize_query(query)
+        if not query or limit <= 0:
+            return []
+        
+        results: List[Tuple[str, str]] = []
+        seen = set()
+        
+        # Exact matches sort first within the prefix range, so they are always kept whatever their rank
+        lo, hi = self._names.prefix_range(query)
+        exact_hi = bisect_right(self._names.keys, query, lo, hi)
+        for pos in range(lo, exact_hi):
+            name_id = int(self._names.name_ids[pos])
+            results.append((name_id, MATCH_EXACT))
+            seen.add(name_id)
+        
+        # Prefix of the whole name
+        if exact_hi < hi and len(results) < limit:
+            for pos in self._names.top_in_prefix(query, exact_hi, hi, limit - len(results)).tolist():
+                name_id = int(self._names.name_ids[pos])
+                results.append((name_id, MATCH_PREFIX))
+                seen.add(name_id)
+        
+        # Prefix of a later word
+        if len(results) < limit:
+            lo, hi = self._words.prefix_range(query)
+            if lo < hi:
+                # A name can match through several words, so ask for extra positions before deduplicating
+                for pos in self._words.top_in_prefix(query, lo, hi, 2 * limit).tolist():
+                    name_id = int(self._words.name_ids[pos])
+                    if name_id not in seen:
+                        results.append((name_id, MATCH_WORD_PREFIX))
+                        seen.add(name_id)
+                        if len(results) >= limit:
+                            break
+        
+        if substring and len(results) < limit:
+            for name_id in self._substring_matches(query, seen, limit - len(results)):
+                results.append((name_id, MATCH_SUBSTRING))
+        
+        return [(self.names[name_id], match) for name_id, match in results[:limit]]
+    
+    def _substring_matches(self, query: str, exclude: set, limit: int) -> List[int]:
+        """Best-ranked names containing the query anywhere (scan in rank order, stops after `limit` new names)"""
+        joined, find = self._joined, self._joined.find
+        matches = []
+        pos = find(query)
+        while pos != -1:
+            rank_pos = int(np.searchsorted(self._offsets, pos, side='right')) - 1
+            name_id = int(self._by_rank[rank_pos])
+            if name_id not in exclude:
+                matches.append(name_id)
+                if len(matches) >= limit:
+                    break
+            # Jump to the next name so each name is counted once
+            pos = find(query, joined.index('\n', pos) + 1)
+        return matches
@@ -0,0 +1,123 @@
+"""
+In-memory vector index for image embeddings
+Stores L2-normalized vectors in a NumPy matrix (float32 or int8) and answers top-k cosine queries
+"""
+import os
+import threading
+import numpy as np
+from typing import Dict, Any, List, Optional, Sequence, Tuple
+
+class VectorIndex:
+    """Append-only, NumPy-backed cosine similarity index"""
+    
+    def __init__(self, dim: int, quantize: bool = False, initial_capacity: int = 1024, search_chunk_size: int = 65536):
+        self.dim = dim
+        self.quantize = quantize
+        self.search_chunk_size = search_chunk_size
+        self.ids: List[str] = []
+        self._size = 0
+        dtype = np.int8 if quantize else np.float32
+        self._vectors = np.empty((initial_capacity, dim), dtype=dtype)
+        # Per-vector dequantization scale (int8 mode only)
+        self._scales = np.empty(initial_capacity, dtype=np.float32) if quantize else None
+        self._lock = threading.Lock()
+    
+    def __len__(self) -> int:
+        return self._size
+    
+    def _ensure_capacity(self, extra: int):
+        """Grow storage geometrically so appends stay amortized O(1)"""
+        needed = self._size + extra
+        capacity = self._vectors.shape[0]
+        if needed <= capacity:
+            return
+        new_capacity = max(needed, capacity * 2)
+        vectors = np.empty((new_capacity, self.dim), dtype=self._vectors.dtype)
+        vectors[:self._size] = self._vectors[:self._size]
+        self._vectors = vectors
+        if self.quantize:
+            scales = np.empty(new_capacity, dtype=np.float32)
+            scales[:self._size] = self._scales[:self._size]
+            self._scales = scales
+    
+    @staticmethod
+    def _normalize(vectors: np.ndarray) -> np.ndarray:
+        vectors = np.asarray(vectors, dtype=np.float32)
+        norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+        return vectors / np.maximum(norms, 1e-12)
+    
+    def add(self, ids: Sequence[str], vectors: np.ndarray):
+        """Add a batch of vectors (normalized on the way in)"""
+        vectors = self._normalize(np.atleast_2d(vectors))
+        if vectors.shape != (len(ids), self.dim):
+            raise ValueError(f"Expected {len(ids)} vectors of dimension {self.dim}, got {vectors.shape}")
+        
+        with self._lock:
+            self._ensure_capacity(len(ids))
+            start, end = self._size, self._size + len(ids)
+            if self.quantize:
+                # Symmetric per-vector quantization: largest component maps to 127
+                max_abs = np.maximum(np.abs(vectors).max(axis=1), 1e-12)
+                self._vectors[start:end] = np.round(vectors * (127.0 / max_abs)[:, None]).astype(np.int8)
+                self._scales[start:end] = max_abs / 127.0
+            else:
+                self._vectors[start:end] = vectors
+            self.ids.extend(ids)
+            self._size = end
+    
+    def search(self, query: np.ndarray, k: int = 5) -> List[Tuple[str, float]]:
+        """Top-k (id, cosine similarity) pairs, best first"""
+        size = self._size
+        if size == 0 or k <= 0:
+            return []
+        query = self._normalize(query).reshape(self.dim)
+        k = min(k, size)
+        
+        # Score in chunks so int8 rows are dequantized a block at a time
+        best_scores = np.empty(0, dtype=np.float32)
+        best_rows = np.empty(0, dtype=np.int64)
+        for start in range(0, size, self.search_chunk_size):
+            end = min(start + self.search_chunk_size, size)
+            block = self._vectors[start:end]
+            if self.quantize:
+                scores = (block.astype(np.float32) @ query) * self._scales[start:end]
+            else:
+                scores = block @ query
+            
+            scores = np.concatenate([best_scores, scores])
+            rows = np.concatenate([best_rows, np.arange(start, end)])
+            if len(scores) > k:
+                top = np.argpartition(scores, -k)[-k:]
+                scores, rows = scores[top], rows[top]
+            best_scores, best_rows = scores, rows
+        
+        order = np.argsort(best_scores)[::-1]
+        return [(self.ids[row], float(score)) for row, score in zip(best_rows[order], best_scores[order])]
+    
+    def memory_bytes(self) -> int:
+        """Bytes used by stored vectors (excluding id strings)"""
+        total = self._size * self.dim * self._vectors.itemsize
+        if self.quantize:
+            total += self._size * self._scales.itemsize
+        return total
+    
+    def get_status(self) -> Dict[str, Any]:
+        """Index size and memory usage"""
+        return {
+            "vectors": self._size,
+            "dimension": self.dim,
+            "quantized": self.quantize,
+            "memory_bytes": self.memory_bytes(),
+            "bytes_per_vector": self.memory_bytes() / self._size if self._size else 0
+        }
+
+# Global vector index instance
+vector_index = None
+
+def get_vector_index(dim: Optional[int] = None) -> Optional[VectorIndex]:
+    """Get or create the embedding index (singleton pattern); int8 storage via EMBEDDING_INDEX_INT8=1"""
+    global vector_index
+    if vector_index is None and dim:
+        quantize = os.getenv("EMBEDDING_INDEX_INT8", "0").lower() in ("1", "true", "yes")
+        vector_index = VectorIndex(dim, quantize=quantize)
+    return vector_index
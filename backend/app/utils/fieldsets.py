@@ -0,0 +1,90 @@
+"""
+Sparse fieldsets: `fields=class_name,confidence,nutrition.calories` selects the parts of a response to return
+Routes parse the parameter against their response model, check wants() before computing a section so unrequested
+ones are never built, and prune the finished payload with select(); without the parameter nothing changes
+"""
+import typing
+from typing import Any, Dict, Optional, Type
+
+from pydantic import BaseModel
+
+# Always returned, so clients can tell successes from errors whatever they selected
+ALWAYS_INCLUDED = ("success",)
+
+def _nested_model(annotation: Any) -> Optional[Type[BaseModel]]:
+    """The model inside an annotation such as Optional[List[Model]], None for plain values"""
+    if isinstance(annotation, type) and issubclass(annotation, BaseModel):
+        return annotation
+    for arg in typing.get_args(annotation):
+        model = _nested_model(arg)
+        if model is not None:
+            return model
+    return None
+
+class FieldSet:
+    """Selected fields as a tree: name -> nested FieldSet, or None for the whole value; fields=None selects everything"""
+    
+    def __init__(self, fields: Optional[Dict[str, Optional["FieldSet"]]] = None):
+        self.fields = fields
+    
+    @classmethod
+    def parse(cls, text: Optional[str], model: Type[BaseModel]) -> "FieldSet":
+        """Parse a comma-separated list of dotted paths; ValueError names the paths `model` does not have"""
+        paths = [path.strip() for path in (text or "").split(",") if path.strip()]
+        if not paths:
+            return cls()
+        fields: Dict[str, Any] = {}
+        unknown = []
+        for path in paths:
+            if not cls._add(fields, path.split("."), model):
+                unknown.append(path)
+        if unknown:
+            raise ValueError(f"Unknown fields: {', '.join(unknown)}")
+        return cls._from_tree(fields)
+    
+    @classmethod
+    def _add(cls, tree: Dict[str, Any], parts, model: Optional[Type[BaseModel]]) -> bool:
+        name, rest = parts[0], parts[1:]
+        if model is None:
+            return False
+        if name not in model.model_fields and model.model_config.get("extra") != "allow":
+            return False
+        if not rest:
+            tree[name] = None  # the whole value, even if a sub-field was selected before
+            return True
+        if name in tree and tree[name] is None:
+            return True  # already selected whole
+        field = model.model_fields.get(name)
+        nested = _nested_model(field.annotation) if field is not None else None
+        return cls._add(tree.setdefault(name, {}), rest, nested)
+    
+    @classmethod
+    def _from_tree(cls, tree: Dict[str, Any]) -> "FieldSet":
+        return cls({name: cls._from_tree(sub) if sub is not None else None for name, sub in tree.items()})
+    
+    @property
+    def everything(self) -> bool:
+        return self.fields is None
+    
+    def wants(self, name: str) -> bool:
+        """Whether any part of the top-level field `name` was selected"""
+        return self.fields is None or name in self.fields
+    
+    def select(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        """The selected parts of a payload (lists of objects are pruned element by element)"""
+        if self.fields is None:
+            return payload
+        selected = {}
+        for name, value in payload.items():
+            if name in ALWAYS_INCLUDED:
+                selected[name] = value
+            elif name in self.fields:
+                selected[name] = self.fields[name]._select_value(value) if self.fields[name] is not None else value
+        return selected
+    
+    def _select_value(self, value: Any) -> Any:
+        if isinstance(value, dict):
+            return self.select(value)
+        if isinstance(value, list):
+            return [self._select_value(item) for item in value]
+        return value
@@ -0,0 +1,89 @@
+"""
+HTTP caching for read-only GET endpoints: strong ETags, Cache-Control and 304 Not Modified
+Responses under a cached path prefix only change with the app version and a validator (e.g. the nutrition dataset
+etag), so the ETag is computed from those and the request URL, and a matching If-None-Match is answered before the
+route runs
+"""
+import hashlib
+import os
+from typing import Callable, Optional, Sequence, Tuple
+
+from starlette.datastructures import Headers, MutableHeaders
+
+from app.utils.precompressed import negotiate
+
+# Part of every ETag; set it per deploy (e.g. to the git commit) so a release invalidates cached responses
+APP_VERSION = os.getenv("APP_VERSION", "1.0.0")
+# Seconds clients and CDNs may reuse a response before revalidating it (0: always revalidate)
+CACHE_MAX_AGE = int(os.getenv("CACHE_MAX_AGE", "60"))
+
+def make_etag(*parts: str) -> str:
+    """Strong ETag (quoted) for the given parts"""
+    return '"' + hashlib.sha1("\x00".join(parts).encode("utf-8")).hexdigest()[:20] + '"'
+
+def encoded_etag(etag: str, encoding: str) -> str:
+    """Each content coding of a response is its own representation, so it gets its own strong ETag"""
+    return f'{etag[:-1]}-{encoding}"'
+
+def etag_matches(if_none_match: Optional[str], etag: str, accept_encoding: str = "") -> Optional[str]:
+    """The tag in If-None-Match naming the current response (or one of its content codings the client still
+    accepts), None if there is none; weak comparison, so W/ prefixes are ignored"""
+    if not if_none_match:
+        return None
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        candidate = candidate[2:] if candidate.startswith("W/") else candidate
+        if candidate == "*" or candidate == etag:
+            return etag
+        encoding = candidate[len(etag) - 1:-1].lstrip("-")
+        if candidate == encoded_etag(etag, encoding) and negotiate(accept_encoding, (encoding,)) == encoding:
+            return candidate
+    return None
+
+def cache_control(max_age: int) -> str:
+    return f"public, max-age={max_age}" if max_age > 0 else "no-cache"
+
+class HTTPCacheMiddleware:
+    """ASGI middleware adding ETag / Cache-Control to successful GET responses under the given path prefixes and
+    answering conditional GETs with 304; rules are (path prefix, validator) pairs, the first matching prefix wins"""
+    
+    def __init__(self, app, rules: Sequence[Tuple[str, Callable[[], str]]], max_age: int = CACHE_MAX_AGE):
+        self.app = app
+        self.rules = list(rules)
+        self.cache_control = cache_control(max_age)
+    
+    async def __call__(self, scope, receive, send):
+        validator = self._validator(scope) if scope["type"] == "http" and scope["method"] == "GET" else None
+        if validator is None:
+            await self.app(scope, receive, send)
+            return
+        
+        version = validator()
+        etag = make_etag(APP_VERSION, version, scope["path"], scope["query_string"].decode("latin-1"))
+        request_headers = Headers(scope=scope)
+        matched = etag_matches(request_headers.get("if-none-match"), etag, request_headers.get("accept-encoding", ""))
+        if matched is not None:
+            headers = [(b"etag", matched.encode("latin-1")), (b"cache-control", self.cache_control.encode("latin-1"))]
+            if matched != etag:
+                headers.append((b"vary", b"Accept-Encoding"))
+            await send({"type": "http.response.start", "status": 304, "headers": headers})
+            await send({"type": "http.response.body", "body": b""})
+            return
+        
+        async def send_with_validators(message):
+            # Skip the headers if the data changed while the body was built: it may belong to either version
+            if message["type"] == "http.response.start" and message["status"] == 200 and validator() == version:
+                headers = MutableHeaders(scope=message)
+                encoding = headers.get("content-encoding")
+                headers["ETag"] = encoded_etag(etag, encoding) if encoding else etag
+                headers["Cache-Control"] = self.cache_control
+            await send(message)
+        
+        await self.app(scope, receive, send_with_validators)
+    
+    def _validator(self, scope) -> Optional[Callable[[], str]]:
+        path = scope["path"]
+        for prefix, validator in self.rules:
+            if path == prefix or path.startswith(prefix.rstrip("/") + "/"):
+                return validator
+        return None
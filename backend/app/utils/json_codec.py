@@ -0,0 +1,51 @@
+"""
+JSON encoding helpers: orjson when installed, the standard library otherwise
+"""
+import json
+import os
+import numpy as np
+from typing import Any, Type
+
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson is in requirements.txt
+    orjson = None
+
+def _default(obj: Any) -> Any:
+    """Fallback conversions for the stdlib encoder (NumPy scalars and arrays)"""
+    if isinstance(obj, np.generic):
+        return obj.item()
+    if isinstance(obj, np.ndarray):
+        return obj.tolist()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+def dumps(obj: Any) -> bytes:
+    """Serialize to compact UTF-8 JSON bytes"""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS)
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":"), default=_default).encode("utf-8")
+
+def loads(data: bytes) -> Any:
+    """Parse JSON bytes"""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse encoded with dumps(): orjson when installed, NumPy arrays and scalars included"""
+    
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+# Response payloads are built by our own services, so checking them against their models on every request only costs
+# time; set VALIDATE_RESPONSES=1 in tests or staging to catch payloads drifting from the documented schema
+VALIDATE_RESPONSES = os.getenv("VALIDATE_RESPONSES", "").lower() in ("1", "true", "yes")
+
+def typed_response(model: Type[BaseModel], content: Any, status_code: int = 200) -> FastJSONResponse:
+    """Response for a payload documented by `model` (validated only with VALIDATE_RESPONSES)"""
+    if VALIDATE_RESPONSES:
+        model.model_validate(content)
+    return FastJSONResponse(content=content, status_code=status_code)
@@ -0,0 +1,88 @@
+"""
+Precompressed responses for routes whose body never changes while the app runs
+A route opts in with @precompressed: its body is rendered once (at startup, or on the first request) and stored as
+identity, gzip and brotli variants, and each request only picks the variant its Accept-Encoding allows
+"""
+import gzip
+from functools import lru_cache
+from typing import Any, Awaitable, Callable, Dict, List, Tuple
+
+from fastapi import Request
+from fastapi.responses import Response
+
+from app.utils.json_codec import dumps
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - brotli is in requirements.txt; without it only gzip is offered
+    brotli = None
+
+# Preferred first when the client accepts several
+ENCODINGS = ("br", "gzip")
+
+class PrecompressedBody:
+    """One rendered body and its compressed variants (only those smaller than the original are kept)"""
+    
+    def __init__(self, body: bytes, media_type: str):
+        self.media_type = media_type
+        self.variants: Dict[str, bytes] = {"identity": body}
+        compressed = {"gzip": gzip.compress(body, compresslevel=9, mtime=0)}
+        if brotli is not None:
+            compressed["br"] = brotli.compress(body, quality=11)
+        self.variants.update((encoding, data) for encoding, data in compressed.items() if len(data) < len(body))
+    
+    @classmethod
+    def from_content(cls, content: Any) -> "PrecompressedBody":
+        """From a route's return value: a Response, an HTML string or JSON-serializable data"""
+        if isinstance(content, Response):
+            return cls(bytes(content.body), content.headers.get("content-type", content.media_type))
+        if isinstance(content, str):
+            return cls(content.encode("utf-8"), "text/html; charset=utf-8")
+        return cls(dumps(content), "application/json")
+    
+    def response(self, accept_encoding: str = None) -> Response:
+        encoding = negotiate(accept_encoding or "", tuple(self.variants))
+        headers = {"Vary": "Accept-Encoding"}
+        if encoding != "identity":
+            headers["Content-Encoding"] = encoding
+        return Response(content=self.variants[encoding], media_type=self.media_type, headers=headers)
+
+@lru_cache(maxsize=256)
+def negotiate(accept_encoding: str, available: Tuple[str, ...]) -> str:
+    """Best available encoding for an Accept-Encoding header; clients send few distinct headers, so it is cached"""
+    weights = {}
+    for part in accept_encoding.lower().split(","):
+        name, _, params = part.strip().partition(";")
+        try:
+            weights[name.strip()] = float(params.strip()[2:]) if params.strip().startswith("q=") else 1.0
+        except ValueError:
+            weights[name.strip()] = 0.0
+    wildcard = weights.get("*", 0.0)
+    accepted = [encoding for encoding in ENCODINGS if encoding in available and weights.get(encoding, wildcard) > 0]
+    return max(accepted, key=lambda encoding: weights.get(encoding, wildcard), default="identity")
+
+_renderers: List[Callable[[], Awaitable[None]]] = []
+
+def precompressed(render: Callable[[], Awaitable[Any]]) -> Callable[[Request], Awaitable[Response]]:
+    """Route decorator (below @router.get) for constant responses without parameters"""
+    rendered: List[PrecompressedBody] = []
+    
+    async def warm():
+        if not rendered:
+            rendered.append(PrecompressedBody.from_content(await render()))
+    
+    async def endpoint(request: Request) -> Response:
+        if not rendered:
+            await warm()
+        return rendered[0].response(request.headers.get("accept-encoding"))
+    
+    # Not functools.wraps: FastAPI would read the signature of the wrapped function and lose `request`
+    endpoint.__name__, endpoint.__qualname__, endpoint.__doc__ = render.__name__, render.__qualname__, render.__doc__
+    endpoint.render = render  # the undecorated route, e.g. for benchmarks
+    _renderers.append(warm)
+    return endpoint
+
+async def render_precompressed():
+    """Render every @precompressed route now (called at startup) rather than on its first request"""
+    for warm in _renderers:
+        await warm()
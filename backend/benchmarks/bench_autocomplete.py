@@ -0,0 +1,81 @@
+"""
+Benchmark for dish name autocomplete
+Measures PrefixIndex latency percentiles against the previous linear `query in dish.lower()` scan
+
+Usage (from backend/):
+    python benchmarks/bench_autocomplete.py
+    python benchmarks/bench_autocomplete.py --sizes 100000 1000000 --queries 5000
+"""
+import argparse
+import os
+import sys
+import time
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.nutrition_table import NutritionTable
+from app.services.prefix_index import PrefixIndex
+
+CSV_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), "data", "nutrition_database.csv")
+
+def synthetic_names(base: list, size: int, rng) -> list:
+    """Real dish names plus generated compound names (e.g. 'bun_cake_ramen_42') up to `size`"""
+    words = sorted({word for name in base for word in name.split('_') if len(word) > 2})
+    names = list(base[:size])
+    seen = set(names)
+    while len(names) < size:
+        picked = rng.choice(len(words), rng.integers(2, 4), replace=False)
+        name = '_'.join(words[i] for i in picked) + f"_{rng.integers(0, 100000)}"
+        if name not in seen:
+            seen.add(name)
+            names.append(name)
+    return names
+
+def linear_search(names: list, query: str, limit: int) -> list:
+    """The search_dishes implementation before the prefix index"""
+    query_lower = query.lower()
+    return [dish for dish in names if query_lower in dish.lower()][:limit]
+
+def percentiles(label: str, fn, queries: list):
+    timings = np.empty(len(queries))
+    for i, query in enumerate(queries):
+        start = time.perf_counter()
+        fn(query)
+        timings[i] = time.perf_counter() - start
+    p50, p99, worst = np.percentile(timings, [50, 99, 100]) * 1e6
+    print(f"  {label:<22} p50={p50:9.1f}us  p99={p99:9.1f}us  max={worst:9.1f}us")
+
+def main():
+    parser = argparse.ArgumentParser(description="Autocomplete latency benchmark")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[130, 1_000_000])
+    parser.add_argument("--queries", type=int, default=2000)
+    parser.add_argument("--limit", type=int, default=10)
+    parser.add_argument("--linear-queries", type=int, default=20, help="Queries for the (slow) linear scan")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    
+    rng = np.random.default_rng(args.seed)
+    base = NutritionTable.from_csv(CSV_PATH).names
+    
+    for size in args.sizes:
+        names = synthetic_names(base, size, rng)
+        popularity = rng.zipf(1.5, len(names)).astype(np.float64)
+        
+        start = time.perf_counter()
+        index = PrefixIndex(names, popularity)
+        print(f"{len(names):,} names (index built in {time.perf_counter() - start:.2f}s)")
+        
+        # Typed prefixes of real names (1-8 characters), of a later word, and infix fragments for the fallback
+        picks = [names[i] for i in rng.integers(0, len(names), args.queries)]
+        prefixes = [name[:rng.integers(1, min(8, len(name)) + 1)] for name in picks]
+        word_prefixes = [name.split('_')[-2][:4] if '_' in name else name[:4] for name in picks]
+        infixes = [name[1:5] for name in picks]
+        
+        percentiles("prefix", lambda q: index.complete(q, args.limit), prefixes)
+        percentiles("word prefix", lambda q: index.complete(q, args.limit), word_prefixes)
+        percentiles("substring fallback", lambda q: index.complete(q, args.limit), infixes)
+        percentiles("linear scan (before)", lambda q: linear_search(names, q, args.limit), prefixes[:args.linear_queries])
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+"""
+Benchmark for the dish list (GET /api/nutrition/database/list)
+Copying every name and slicing by page offset on each request vs cursor pages over a sorted per-version snapshot,
+walking a whole synthetic catalogue
+
+Usage (from backend/):
+    python benchmarks/bench_dish_pages.py
+    python benchmarks/bench_dish_pages.py --size 1000000 --page-size 100
+"""
+import argparse
+import os
+import sys
+import time
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.dish_pages import NamePages
+from bench_nutrient_query import synthetic_table
+
+def main():
+    parser = argparse.ArgumentParser(description="Dish list pagination benchmark")
+    parser.add_argument("--size", type=int, default=1_000_000, help="synthetic catalogue size")
+    parser.add_argument("--page-size", type=int, default=100)
+    parser.add_argument("--pages", type=int, default=200, help="pages timed for the offset scheme")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    
+    table = synthetic_table(args.size, np.random.default_rng(args.seed))
+    names = table.names
+    
+    start = time.perf_counter()
+    for page in range(args.pages):
+        list(names)[page * args.page_size:(page + 1) * args.page_size]
+    offset_page = (time.perf_counter() - start) / args.pages
+    
+    pages = NamePages()
+    start = time.perf_counter()
+    pages.snapshot(1, lambda: names)
+    first = time.perf_counter() - start
+    
+    walked, cursor, count = 0, None, 0
+    start = time.perf_counter()
+    while True:
+        result = pages.page(1, lambda: names, cursor, args.page_size)
+        walked += len(result["dishes"])
+        count += 1
+        cursor = result["next_cursor"]
+        if cursor is None:
+            break
+    cursor_page = (time.perf_counter() - start) / count
+    
+    print(f"{args.size:,} dishes, {args.page_size} per page:")
+    print(f"  copy + offset slice      {offset_page * 1e6:10.1f}us/page")
+    print(f"  cursor over snapshot     {cursor_page * 1e6:10.1f}us/page ({count:,} pages, {walked:,} dishes; "
+          f"snapshot sorted once in {first * 1e3:.0f}ms)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+"""
+Benchmark for Grad-CAM explanations (FoodInferenceService.predict with explain=True)
+Compares plain prediction, explained prediction (cache miss) and explained prediction (cache hit)
+Requires TensorFlow and the trained model in app/ml_models/
+
+Usage (from backend/):
+    python benchmarks/bench_explain.py --runs 20
+"""
+import argparse
+import io
+import os
+import sys
+import time
+import numpy as np
+from PIL import Image
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.inference_service import get_inference_service
+
+def make_image(seed: int) -> bytes:
+    rng = np.random.default_rng(seed)
+    image = Image.fromarray(rng.integers(0, 255, (480, 640, 3), dtype=np.uint8))
+    buffer = io.BytesIO()
+    image.save(buffer, format="JPEG")
+    return buffer.getvalue()
+
+def timed(fn, runs: int) -> np.ndarray:
+    latencies = []
+    for i in range(runs):
+        start = time.perf_counter()
+        fn(i)
+        latencies.append(time.perf_counter() - start)
+    return np.array(latencies) * 1000
+
+def report(label: str, latencies: np.ndarray):
+    print(f"{label:<30} p50={np.percentile(latencies, 50):8.1f}ms  p95={np.percentile(latencies, 95):8.1f}ms")
+
+def main():
+    parser = argparse.ArgumentParser(description="Grad-CAM latency benchmark")
+    parser.add_argument("--runs", type=int, default=20)
+    args = parser.parse_args()
+    
+    service = get_inference_service()
+    if service.model is None:
+        print("Model not loaded, cannot benchmark")
+        return
+    
+    images = [make_image(i) for i in range(args.runs)]
+    # Warm up both code paths (graph tracing)
+    service.predict(images[0])
+    service.predict(make_image(args.runs), explain=True)
+    
+    report("predict", timed(lambda i: service.predict(images[i]), args.runs))
+    report("predict + explain (miss)", timed(lambda i: service.predict(images[i], explain=True), args.runs))
+    report("predict + explain (hit)", timed(lambda i: service.predict(images[i], explain=True), args.runs))
+    report("predict + explain array (hit)", timed(lambda i: service.predict(images[i], explain=True, explain_format="array"), args.runs))
+
+if __name__ == "__main__":
+    main()
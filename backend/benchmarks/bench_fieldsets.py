@@ -0,0 +1,73 @@
+"""
+Benchmark for sparse fieldsets (fields=class_name,confidence,nutrition.calories)
+Payload size and per-response cost of the full prediction and nutrition responses versus the slim ones the mobile
+app asks for: building without health suggestions or top-k, pruning and encoding, on both nutrition backends
+
+Usage (from backend/):
+    python benchmarks/bench_fieldsets.py
+"""
+import argparse
+import os
+import sys
+import tempfile
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench_serialization import prediction_payload, per_call
+from app.models.nutrition_model import NutritionResponse
+from app.models.predict_model import PredictionResponse
+from app.services.nutrition_service import NutritionService
+from app.services.nutrition_sqlite import SQLiteNutritionService
+from app.utils.fieldsets import FieldSet
+from app.utils.json_codec import dumps
+
+MOBILE_PREDICT = "class_name,confidence,nutrition.calories"
+MOBILE_NUTRITION = "nutrition.calories"
+
+def report(label: str, body: bytes, micros: float):
+    print(f"{label:<50} {len(body):>7} bytes {micros:8.1f}us")
+
+def bench_nutrition(label: str, service: NutritionService, iterations: int):
+    dishes = service.get_all_dishes()
+    fieldset = FieldSet.parse(MOBILE_NUTRITION, NutritionResponse)
+    
+    def full(i):
+        return service.get_nutrition_json(dishes[i % len(dishes)])
+    
+    def sparse(i):
+        return dumps(fieldset.select(service.get_nutrition(dishes[i % len(dishes)], with_suggestions=fieldset.wants("suggestions"))))
+    
+    for name, fn in (("full", full), (MOBILE_NUTRITION, sparse)):
+        counter = iter(range(iterations))
+        report(f"{label} {name}", fn(0), per_call(lambda: fn(next(counter)), iterations))
+
+def main():
+    parser = argparse.ArgumentParser(description="Sparse fieldset benchmark")
+    parser.add_argument("--iterations", type=int, default=5000)
+    parser.add_argument("--classes", type=int, default=131)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    
+    rng = np.random.default_rng(args.seed)
+    service = NutritionService()
+    
+    # Prediction: top-k selection over the softmax vector, then pruning and encoding the payload
+    probabilities = rng.dirichlet(np.ones(args.classes))
+    print(f"top-3 argsort {per_call(lambda: np.argsort(probabilities)[-3:][::-1], args.iterations):6.2f}us  "
+          f"argmax {per_call(lambda: np.argmax(probabilities), args.iterations):6.2f}us")
+    fieldset = FieldSet.parse(MOBILE_PREDICT, PredictionResponse)
+    for explain in (False, True):
+        payload = prediction_payload(service, rng, explain)
+        suffix = " + heatmap" if explain else ""
+        report(f"predict full{suffix}", dumps(payload), per_call(lambda: dumps(payload), args.iterations))
+        report(f"predict {MOBILE_PREDICT}", dumps(fieldset.select(payload)),
+               per_call(lambda: dumps(fieldset.select(payload)), args.iterations))
+    
+    # Nutrition: pre-serialized (memory) or built per request (SQLite) full responses versus slim ones
+    bench_nutrition("memory", service, args.iterations)
+    with tempfile.TemporaryDirectory() as tmp:
+        bench_nutrition("sqlite", SQLiteNutritionService(os.path.join(tmp, "nutrition.db"), service.source_path), args.iterations)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""
+Benchmark for fuzzy dish name matching
+Compares difflib.get_close_matches (full scan, previous implementation) with FuzzyIndex
+on the real catalogue and on synthetic catalogues of misspelled-query workloads
+
+Usage (from backend/):
+    python benchmarks/bench_fuzzy_index.py
+    python benchmarks/bench_fuzzy_index.py --sizes 10000 --queries 200
+"""
+import argparse
+import difflib
+import os
+import sys
+import time
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.fuzzy_index import FuzzyIndex
+from app.services.nutrition_table import NutritionTable
+
+CSV_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), "data", "nutrition_database.csv")
+LETTERS = "abcdefghijklmnopqrstuvwxyz"
+
+def synthetic_names(base: list, size: int, rng) -> list:
+    """Real dish names plus generated compound names (e.g. 'spicy_pho_bo_42') up to `size`"""
+    words = sorted({word for name in base for word in name.split('_') if len(word) > 2})
+    names = list(base[:size])
+    seen = set(names)
+    while len(names) < size:
+        picked = rng.choice(len(words), rng.integers(2, 4), replace=False)
+        name = '_'.join(words[i] for i in picked) + f"_{rng.integers(0, 1000)}"
+        if name not in seen:
+            seen.add(name)
+            names.append(name)
+    return names
+
+def misspell(name: str, rng) -> str:
+    """One random substitution, deletion or transposition"""
+    chars = list(name)
+    i = int(rng.integers(0, len(chars)))
+    op = rng.integers(0, 3)
+    if op == 0:
+        chars[i] = LETTERS[rng.integers(0, len(LETTERS))]
+    elif op == 1 and len(chars) > 3:
+        del chars[i]
+    elif i + 1 < len(chars):
+        chars[i], chars[i + 1] = chars[i + 1], chars[i]
+    return ''.join(chars)
+
+def run(names: list, queries: list, limit: int):
+    start = time.perf_counter()
+    expected = [difflib.get_close_matches(q, names, n=limit, cutoff=0.3) for q in queries]
+    difflib_ms = (time.perf_counter() - start) * 1000 / len(queries)
+    
+    start = time.perf_counter()
+    index = FuzzyIndex(names)
+    build_ms = (time.perf_counter() - start) * 1000
+    
+    start = time.perf_counter()
+    got = [index.search(q, limit=limit, cutoff=0.3) for q in queries]
+    index_ms = (time.perf_counter() - start) * 1000 / len(queries)
+    
+    start = time.perf_counter()
+    for q in queries:
+        index.search(q, limit=limit, cutoff=0.3)
+    cached_us = (time.perf_counter() - start) * 1e6 / len(queries)
+    
+    top1 = np.mean([bool(e) == bool(g) and (not e or e[0] == g[0]) for e, g in zip(expected, got)])
+    exact = np.mean([e == g for e, g in zip(expected, got)])
+    mode = "exhaustive" if index.exhaustive else "trigram"
+    print(f"{len(names):>8} {mode:>10} {difflib_ms:>11.2f} {index_ms:>10.2f} {cached_us:>10.1f} "
+          f"{build_ms:>9.0f} {difflib_ms / max(index_ms, 1e-9):>8.1f}x {top1:>6.1%} {exact:>6.1%}")
+
+def main():
+    parser = argparse.ArgumentParser(description="difflib vs trigram index for dish name suggestions")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[130, 10000, 100000])
+    parser.add_argument("--queries", type=int, default=50)
+    parser.add_argument("--limit", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    
+    rng = np.random.default_rng(args.seed)
+    base = NutritionTable.from_csv(CSV_PATH).names
+    
+    print(f"{'names':>8} {'mode':>10} {'difflib ms':>11} {'index ms':>10} {'cached us':>10} "
+          f"{'build ms':>9} {'speedup':>9} {'top1':>6} {'top-n':>6}")
+    for size in args.sizes:
+        names = synthetic_names(base, size, rng)
+        queries = [misspell(names[i], rng) for i in rng.integers(0, len(names), args.queries)]
+        run(names, queries, args.limit)
+
+if __name__ == "__main__":
+    main()
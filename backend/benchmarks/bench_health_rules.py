@@ -0,0 +1,86 @@
+"""
+Benchmark for health suggestion rules
+Bulk rule-table evaluation over a whole catalogue vs the per-dish if/else chain it replaced, on synthetic catalogues
+
+Usage (from backend/):
+    python benchmarks/bench_health_rules.py
+    python benchmarks/bench_health_rules.py --sizes 100000 1000000
+"""
+import argparse
+import os
+import sys
+import time
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.health_rules import HealthRuleTable, DEFAULT_RULES
+from bench_nutrient_query import synthetic_table
+
+def legacy_suggestions(nutrition_data: dict) -> dict:
+    """The hard-coded chain NutritionService._get_health_suggestions used before the rule table"""
+    calories, protein = nutrition_data.get("calories", 0), nutrition_data.get("protein", 0)
+    fat, carbs = nutrition_data.get("fat", 0), nutrition_data.get("carbs", 0)
+    recommendations = []
+    if calories < 200:
+        calorie_category = "low"
+        recommendations.append("Light meal - consider pairing with other dishes")
+    elif calories < 400:
+        calorie_category = "moderate"
+        recommendations.append("Moderate caloric content - suitable for most meal plans")
+    else:
+        calorie_category = "high"
+        recommendations.append("High caloric content - consider portion control")
+    if protein >= 15:
+        protein_level = "excellent"
+        recommendations.append("Excellent source of protein")
+    elif protein >= 8:
+        protein_level = "good"
+        recommendations.append("Good source of protein")
+    else:
+        protein_level = "low"
+        recommendations.append("Consider adding protein-rich foods")
+    if fat > 20:
+        recommendations.append("High fat content - balance with vegetables")
+    elif fat < 5:
+        recommendations.append("Low fat content - good for low-fat diets")
+    if carbs > 50:
+        recommendations.append("High carbohydrate content - good for energy")
+    elif carbs < 15:
+        recommendations.append("Low carbohydrate content - suitable for low-carb diets")
+    health_score = (calories <= 400) + (protein >= 10) + (fat <= 15) + (carbs <= 50)
+    health_level = "high" if health_score >= 3 else "moderate" if health_score >= 2 else "low"
+    return {
+        "health_level": health_level,
+        "recommendations": recommendations,
+        "dietary_notes": "Nutritional values are estimates per serving",
+        "calorie_category": calorie_category,
+        "protein_level": protein_level
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Health suggestion rule benchmark")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100_000, 1_000_000])
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    
+    rng = np.random.default_rng(args.seed)
+    rules = HealthRuleTable(DEFAULT_RULES)
+    for size in args.sizes:
+        table = synthetic_table(size, rng)
+        records = [table.record(row) for row in range(size)]
+        
+        start = time.perf_counter()
+        health = rules.evaluate(table)
+        bulk = time.perf_counter() - start
+        
+        start = time.perf_counter()
+        legacy = [legacy_suggestions(record) for record in records]
+        loop = time.perf_counter() - start
+        
+        mismatches = sum(health.for_row(row) != expected for row, expected in enumerate(legacy))
+        print(f"{size:,} dishes: rule table {bulk * 1e3:8.1f}ms ({len(health.outcomes)} distinct outcomes)   "
+              f"if/else per dish {loop * 1e3:8.1f}ms   mismatches: {mismatches}")
+
+if __name__ == "__main__":
+    main()
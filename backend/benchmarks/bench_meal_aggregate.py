@@ -0,0 +1,91 @@
+"""
+Benchmark for meal aggregation (POST /api/meals/aggregate)
+Per-dish dict arithmetic vs the per-gram matrix, one meal per call and a whole batch of logged meals (2-8 dishes,
+portions and grams mixed) per call, on a synthetic catalogue
+
+Usage (from backend/):
+    python benchmarks/bench_meal_aggregate.py
+    python benchmarks/bench_meal_aggregate.py --size 100000 --meals 50000
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.meal_matrix import MealMatrix, MACRO_ENERGY
+from app.services.nutrient_neighbors import serving_grams
+from app.services.nutrition_service import NutritionService
+from app.services.nutrition_table import NUTRIENT_FIELDS
+from bench_nutrition_loader import write_synthetic_csv
+
+def dict_aggregate(service: NutritionService, records: dict, items: list) -> dict:
+    """The per-dish dict loop this replaces: resolve the name, scale its record, add it to the totals"""
+    totals = dict.fromkeys(NUTRIENT_FIELDS, 0.0)
+    contributions = []
+    for item in items:
+        record = records[service._canonical_name(item["dish_name"])]
+        servings = item["grams"] / serving_grams(record["serving"]) if item["grams"] is not None else item["portions"]
+        contribution = {field: record[field] * servings for field in NUTRIENT_FIELDS}
+        for field in NUTRIENT_FIELDS:
+            totals[field] += contribution[field]
+        contributions.append(contribution)
+    energy = {field: totals[field] * kcal for field, kcal in MACRO_ENERGY.items()}
+    total = sum(energy.values())
+    return {"totals": totals, "items": contributions, "macro_ratios": {field: 100 * value / total for field, value in energy.items()}}
+
+def logged_meals(catalogue: list, count: int, rng) -> list:
+    meals = []
+    for _ in range(count):
+        meals.append([
+            {"dish_name": name, "portions": None, "grams": float(rng.integers(50, 400))} if rng.random() < 0.5
+            else {"dish_name": name, "portions": float(rng.choice([0.5, 1.0, 1.5, 2.0])), "grams": None}
+            for name in rng.choice(catalogue, int(rng.integers(2, 9))).tolist()
+        ])
+    return meals
+
+def timed(label: str, meal_count: int, fn):
+    start = time.perf_counter()
+    result = fn()
+    elapsed = time.perf_counter() - start
+    print(f"  {label:<34} {meal_count / elapsed:10.0f} meals/s")
+    return result
+
+def main():
+    parser = argparse.ArgumentParser(description="Meal aggregation benchmark")
+    parser.add_argument("--size", type=int, default=100_000, help="synthetic catalogue size")
+    parser.add_argument("--meals", type=int, default=10_000, help="meals per batch request")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    
+    rng = np.random.default_rng(args.seed)
+    with tempfile.TemporaryDirectory() as tmp:
+        csv_path = os.path.join(tmp, "nutrition.csv")
+        write_synthetic_csv(csv_path, args.size)
+        service = NutritionService(csv_path)
+    start = time.perf_counter()
+    MealMatrix(service.table)
+    print(f"{args.size:,} dishes, per-gram matrix built in {(time.perf_counter() - start) * 1e3:.0f}ms; "
+          f"{args.meals:,} meals of 2-8 dishes")
+    
+    meals = logged_meals(service.get_all_dishes(), args.meals, rng)
+    table = service.table
+    records = {name: table.record(row) for row, name in enumerate(table.names)}
+    
+    expected = timed("dict arithmetic, meal by meal", len(meals), lambda: [dict_aggregate(service, records, items) for items in meals])
+    timed("aggregate_meal, meal by meal", len(meals), lambda: [service.aggregate_meal(items) for items in meals])
+    batch = timed("aggregate_meals, one batch", len(meals), lambda: service.aggregate_meals(meals))
+    timed("aggregate_meals, totals only", len(meals), lambda: service.aggregate_meals(meals, detail=False))
+    
+    mismatches = sum(
+        not np.allclose([result["totals"][field] for field in NUTRIENT_FIELDS],
+                        [reference["totals"][field] for field in NUTRIENT_FIELDS], atol=0.051)
+        for result, reference in zip(batch["meals"], expected)
+    )
+    print(f"  mismatches: {mismatches}")
+
+if __name__ == "__main__":
+    main()
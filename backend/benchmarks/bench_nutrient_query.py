@@ -0,0 +1,93 @@
+"""
+Benchmark for nutrient range filter / sort queries (GET /api/nutrition/query)
+Sorted-index + mask strategy vs a plain full-column mask and full sort, on a synthetic catalogue
+
+Usage (from backend/):
+    python benchmarks/bench_nutrient_query.py
+    python benchmarks/bench_nutrient_query.py --size 1000000 --queries 500
+"""
+import argparse
+import os
+import sys
+import time
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.nutrient_query import NutrientIndex
+from app.services.nutrition_table import NutritionTable, NUTRIENT_FIELDS
+
+def synthetic_table(size: int, rng) -> NutritionTable:
+    columns = {
+        "calories": rng.integers(20, 900, size).astype(np.float64),
+        "protein": np.round(rng.uniform(0, 60, size), 1),
+        "fat": np.round(rng.uniform(0, 60, size), 1),
+        "carbs": np.round(rng.uniform(0, 60, size), 1),
+        "fiber": np.round(rng.uniform(0, 15, size), 1),
+    }
+    return NutritionTable([f"dish_{i}" for i in range(size)], columns, ["1 serving"] * size, ["Synthetic"] * size,
+                          rng.integers(0, 1000, size).astype(np.float64))
+
+def naive_query(table: NutritionTable, ranges, sort_by, descending, limit, offset):
+    """Boolean mask over every column, then a full sort of the matches"""
+    mask = np.ones(len(table), dtype=bool)
+    for field, (low, high) in ranges.items():
+        if low is not None:
+            mask &= table.columns[field] >= low
+        if high is not None:
+            mask &= table.columns[field] <= high
+    rows = np.flatnonzero(mask)
+    if sort_by:
+        keys = table.columns[sort_by][rows]
+        rows = rows[np.lexsort((rows, -keys if descending else keys))]
+    return len(rows), rows[offset:offset + limit]
+
+def random_query(rng):
+    """Mix of the shapes the endpoint sees: 0-3 filters of varying width, usually sorted"""
+    ranges = {}
+    for field in rng.choice(NUTRIENT_FIELDS, rng.integers(0, 4), replace=False).tolist():
+        scale = 900 if field == "calories" else 60
+        low = float(rng.uniform(0, scale))
+        width = float(rng.choice([0.01, 0.1, 0.5])) * scale
+        ranges[field] = (low if rng.random() < 0.7 else None, low + width)
+    sort_by = str(rng.choice(NUTRIENT_FIELDS)) if rng.random() < 0.8 else None
+    return ranges, sort_by, bool(rng.random() < 0.5), 20, int(rng.choice([0, 0, 0, 100]))
+
+def timed(fn, queries):
+    timings, results = np.empty(len(queries)), []
+    for i, query in enumerate(queries):
+        start = time.perf_counter()
+        results.append(fn(*query))
+        timings[i] = time.perf_counter() - start
+    return timings, results
+
+def main():
+    parser = argparse.ArgumentParser(description="Nutrient range query benchmark")
+    parser.add_argument("--size", type=int, default=1_000_000)
+    parser.add_argument("--queries", type=int, default=300)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    
+    rng = np.random.default_rng(args.seed)
+    table = synthetic_table(args.size, rng)
+    index = NutrientIndex(table)
+    start = time.perf_counter()
+    for field in NUTRIENT_FIELDS:
+        index.sorted_index(field)
+    print(f"{args.size:,} dishes, sorted indexes built in {time.perf_counter() - start:.2f}s")
+    
+    queries = [random_query(rng) for _ in range(args.queries)]
+    indexed, indexed_results = timed(index.query, queries)
+    naive, naive_results = timed(lambda *query: naive_query(table, *query), queries)
+    
+    mismatches = sum(
+        total != naive_total or not np.array_equal(rows, naive_rows)
+        for (total, rows), (naive_total, naive_rows) in zip(indexed_results, naive_results)
+    )
+    for label, timings in (("sorted index", indexed), ("full mask   ", naive)):
+        p50, p99 = np.percentile(timings, [50, 99]) * 1e3
+        print(f"  {label} p50={p50:7.2f}ms p99={p99:7.2f}ms")
+    print(f"  mismatches: {mismatches}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""
+Benchmark comparing the in-memory and SQLite nutrition backends
+Startup time, Python heap, lookup / autocomplete / range filter / deep pagination latency
+on synthetic catalogues
+
+Usage (from backend/):
+    python benchmarks/bench_nutrition_backends.py
+    python benchmarks/bench_nutrition_backends.py --sizes 10000 100000 500000
+"""
+import argparse
+import gc
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench_nutrition_loader import write_synthetic_csv
+from app.services.nutrition_service import NutritionService
+from app.services.nutrition_sqlite import SQLiteNutritionService
+
+def build(label: str, factory):
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    service = factory()
+    elapsed = time.perf_counter() - start
+    retained, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"  {label:<16} startup={elapsed:7.2f}s  python heap={retained / 2**20:8.1f}MB")
+    return service
+
+def latency(label: str, fn, args: list):
+    timings = np.empty(len(args))
+    for i, arg in enumerate(args):
+        start = time.perf_counter()
+        fn(arg)
+        timings[i] = time.perf_counter() - start
+    p50, p99 = np.percentile(timings, [50, 99]) * 1e6
+    return f"{label} p50={p50:8.1f}us p99={p99:9.1f}us"
+
+def memory_filter(service: NutritionService, low: float, high: float, limit: int = 20):
+    """Range filter over the in-memory columns (calories in [low, high], protein >= 20, by protein desc)"""
+    columns = service.table.columns
+    rows = np.flatnonzero((columns["calories"] >= low) & (columns["calories"] <= high) & (columns["protein"] >= 20))
+    order = rows[np.argsort(-columns["protein"][rows], kind='stable')[:limit]]
+    return [service.table.record(row) for row in order.tolist()]
+
+def main():
+    parser = argparse.ArgumentParser(description="Memory vs SQLite nutrition backend benchmark")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000])
+    parser.add_argument("--queries", type=int, default=2000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    
+    rng = np.random.default_rng(args.seed)
+    with tempfile.TemporaryDirectory() as tmp:
+        for size in args.sizes:
+            csv_path = os.path.join(tmp, f"nutrition_{size}.csv")
+            db_path = os.path.join(tmp, f"nutrition_{size}.sqlite")
+            write_synthetic_csv(csv_path, size)
+            print(f"{size:,} dishes")
+            
+            memory = build("memory", lambda: NutritionService(csv_path))
+            sqlite_cold = build("sqlite (import)", lambda: SQLiteNutritionService(db_path, csv_path))
+            del sqlite_cold
+            sqlite = build("sqlite (warm)", lambda: SQLiteNutritionService(db_path, csv_path))
+            print(f"  sqlite file={sqlite.store.file_bytes() / 2**20:.1f}MB")
+            
+            names = [f"dish_{i}" for i in rng.integers(0, size, args.queries)]
+            prefixes = [name[:rng.integers(5, len(name) + 1)] for name in names]
+            bounds = [(low, low + 100) for low in rng.integers(20, 800, args.queries // 10).tolist()]
+            offsets = rng.integers(0, max(size - 20, 1), args.queries // 10).tolist()
+            
+            for label, service in (("memory", memory), ("sqlite", sqlite)):
+                print(f"  {label}")
+                print("    " + latency("lookup      ", service.get_nutrition_json, names))
+                print("    " + latency("autocomplete", lambda q: service.autocomplete(q, 10), prefixes))
+                if label == "memory":
+                    print("    " + latency("range filter", lambda b: memory_filter(service, *b), bounds))
+                    print("    " + latency("page        ", lambda o: service.get_all_dishes()[o:o + 20], offsets))
+                else:
+                    print("    " + latency("range filter", lambda b: service.store.filter_range(
+                        {"calories": b, "protein": (20, None)}, sort_by="protein", descending=True, limit=20), bounds))
+                    print("    " + latency("page        ", lambda o: service.store.names_page(o, 20), offsets))
+            del memory, sqlite
+
+if __name__ == "__main__":
+    main()
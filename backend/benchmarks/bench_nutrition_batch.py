@@ -0,0 +1,86 @@
+"""
+Benchmark for batch nutrition lookup (POST /api/nutrition/batch)
+1k-name requests (exact, respelled, aliased and misspelled names) through get_nutrition_batch versus one
+get_nutrition call per name, on the real catalogue and a synthetic one
+
+Usage (from backend/):
+    python benchmarks/bench_nutrition_batch.py
+    python benchmarks/bench_nutrition_batch.py --names 1000 --requests 50 --sizes 100000
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench_nutrition_loader import write_synthetic_csv
+from app.services.nutrition_service import NutritionService
+from app.utils.json_codec import dumps
+
+def request_names(catalogue: list, count: int, rng) -> list:
+    """Mostly exact names, some respelled ("Pho Bo"), some misspelled (a dropped letter), a few unknown"""
+    names = []
+    for name in rng.choice(catalogue, count).tolist():
+        kind = rng.random()
+        if kind < 0.6:
+            names.append(name)
+        elif kind < 0.8:
+            names.append(name.replace('_', ' ').title())
+        elif kind < 0.95:
+            drop = int(rng.integers(0, len(name)))
+            names.append(name[:drop] + name[drop + 1:])
+        else:
+            names.append(f"unknown dish {int(rng.integers(0, 10**6))}")
+    return names
+
+def run(label: str, service: NutritionService, requests: list):
+    # Responses are encoded too, since that is part of the per-request cost; both runs start with a cold fuzzy cache
+    service.fuzzy_index.cache_clear()
+    start = time.perf_counter()
+    for names in requests:
+        dumps(service.get_nutrition_batch(names))
+    batch = time.perf_counter() - start
+    
+    service.fuzzy_index.cache_clear()
+    start = time.perf_counter()
+    for names in requests:
+        dumps([service.get_nutrition(name) for name in names])
+    loop = time.perf_counter() - start
+    
+    # Exact, normalized and alias matches only: what the request costs once misspellings are excluded
+    start = time.perf_counter()
+    for names in requests:
+        dumps(service.get_nutrition_batch(names, fuzzy=False))
+    exact = time.perf_counter() - start
+    
+    total = sum(len(names) for names in requests)
+    for name, elapsed in (("batch", batch), ("get_nutrition loop", loop), ("batch, fuzzy=False", exact)):
+        print(f"  {label:<16} {name:<20} {len(requests) / elapsed:8.1f} req/s ({total / elapsed:9.0f} names/s)")
+
+def main():
+    parser = argparse.ArgumentParser(description="Batch nutrition lookup benchmark")
+    parser.add_argument("--names", type=int, default=1000, help="names per request")
+    parser.add_argument("--requests", type=int, default=30)
+    parser.add_argument("--sizes", type=int, nargs="*", default=[100_000], help="synthetic catalogue sizes")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    
+    rng = np.random.default_rng(args.seed)
+    services = [("real catalogue", NutritionService())]
+    with tempfile.TemporaryDirectory() as tmp:
+        for size in args.sizes:
+            csv_path = os.path.join(tmp, f"nutrition_{size}.csv")
+            write_synthetic_csv(csv_path, size)
+            services.append((f"{size:,} dishes", NutritionService(csv_path)))
+        
+        print(f"{args.requests} requests x {args.names} names")
+        for label, service in services:
+            catalogue = service.get_all_dishes()
+            requests = [request_names(catalogue, args.names, rng) for _ in range(args.requests)]
+            run(label, service, requests)
+
+if __name__ == "__main__":
+    main()
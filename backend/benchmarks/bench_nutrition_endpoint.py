@@ -0,0 +1,96 @@
+"""
+Load test for GET /api/nutrition/{dish_name}
+Runs against a live server (--url) or in-process through the ASGI app (requires httpx).
+In-process runs also time the handler work alone: building and encoding the response per request
+versus returning the pre-serialized body. Each scenario is also run as conditional GETs with the ETag of a previous
+response, which the cache middleware answers with 304 before the route runs.
+
+Usage (from backend/):
+    python benchmarks/bench_nutrition_endpoint.py --requests 5000 --concurrency 32
+    python benchmarks/bench_nutrition_endpoint.py --url http://127.0.0.1:8000
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import httpx
+
+async def run(client: httpx.AsyncClient, paths, total: int, concurrency: int, etags: dict = None):
+    latencies = []
+    counter = iter(range(total))
+    
+    async def worker():
+        for i in counter:
+            start = time.perf_counter()
+            path = paths[i % len(paths)]
+            response = await client.get(path, headers={"If-None-Match": etags[path]} if etags else None)
+            latencies.append(time.perf_counter() - start)
+            if response.status_code not in (200, 304, 404):
+                raise RuntimeError(f"Unexpected status {response.status_code}")
+    
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    latencies.sort()
+    p50 = latencies[len(latencies) // 2] * 1000
+    p99 = latencies[int(len(latencies) * 0.99)] * 1000
+    return total / elapsed, p50, p99
+
+def bench_handler(iterations: int = 20000):
+    """Per-request handler cost without HTTP overhead"""
+    from fastapi.responses import JSONResponse, Response
+    from app.services.nutrition_service import get_nutrition_service
+    
+    service = get_nutrition_service()
+    dishes = service.get_all_dishes()
+    paths = {
+        "build + encode": lambda dish: JSONResponse(content=service.get_nutrition(dish)),
+        "pre-serialized": lambda dish: Response(content=service.get_nutrition_json(dish), media_type="application/json"),
+    }
+    for label, handler in paths.items():
+        start = time.perf_counter()
+        for i in range(iterations):
+            handler(dishes[i % len(dishes)])
+        per_call = (time.perf_counter() - start) / iterations * 1e6
+        print(f"handler {label:<16} {per_call:7.1f}us/request  ({1e6 / per_call:9.0f} req/s single core)")
+
+async def main_async(args):
+    if args.url:
+        client = httpx.AsyncClient(base_url=args.url)
+    else:
+        from app.main import app
+        from app.services.nutrition_service import get_nutrition_service
+        get_nutrition_service()
+        client = httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench")
+    
+    async with client:
+        dishes = (await client.get("/api/nutrition/database/list", params={"page_size": 100})).json()["dishes"]
+        scenarios = {
+            "exact": [f"/api/nutrition/{dish}" for dish in dishes],
+            "normalized": [f"/api/nutrition/{dish.replace('_', ' ').title()}" for dish in dishes],
+            "summary": ["/api/nutrition/database/summary"],
+        }
+        for label, paths in scenarios.items():
+            await run(client, paths, min(200, args.requests), args.concurrency)  # warm-up
+            rps, p50, p99 = await run(client, paths, args.requests, args.concurrency)
+            print(f"{label:<12} {rps:9.0f} req/s  p50={p50:6.2f}ms  p99={p99:6.2f}ms")
+            etags = {path: (await client.get(path)).headers.get("etag", "") for path in paths}
+            rps, p50, p99 = await run(client, paths, args.requests, args.concurrency, etags)
+            print(f"{label + ' 304':<12} {rps:9.0f} req/s  p50={p50:6.2f}ms  p99={p99:6.2f}ms")
+
+def main():
+    parser = argparse.ArgumentParser(description="Nutrition endpoint load test")
+    parser.add_argument("--url", default=None, help="Base URL of a running server (default: in-process)")
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--concurrency", type=int, default=32)
+    args = parser.parse_args()
+    if not args.url:
+        bench_handler()
+    asyncio.run(main_async(args))
+
+if __name__ == "__main__":
+    main()
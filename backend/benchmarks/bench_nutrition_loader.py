@@ -0,0 +1,88 @@
+"""
+Benchmark for loading the nutrition catalogue
+Compares the columnar loader (NutritionTable.from_csv) with the previous pandas + iterrows() loader
+on synthetic CSV files
+
+Usage (from backend/):
+    python benchmarks/bench_nutrition_loader.py
+    python benchmarks/bench_nutrition_loader.py --sizes 100000 1000000 --legacy-max 100000
+"""
+import argparse
+import csv
+import gc
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.nutrition_table import NutritionTable
+
+def write_synthetic_csv(path: str, size: int, seed: int = 0):
+    """CSV with the same columns as data/nutrition_database.csv"""
+    rng = np.random.default_rng(seed)
+    calories = rng.integers(20, 900, size)
+    macros = np.round(rng.uniform(0, 60, (size, 3)), 1)
+    grams = rng.integers(50, 500, size)
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(["dish_name", "calories", "protein", "fat", "carbs", "serving", "dataset_source"])
+        for i in range(size):
+            writer.writerow([f"dish_{i}", calories[i], macros[i, 0], macros[i, 1], macros[i, 2],
+                             f"1 serving ({grams[i]}g)", "Synthetic"])
+
+def legacy_load(path: str) -> dict:
+    """The loader NutritionService used before the columnar table"""
+    import pandas as pd
+    df = pd.read_csv(path)
+    dishes = {}
+    for _, row in df.iterrows():
+        dishes[row['dish_name']] = {
+            'calories': float(row['calories']),
+            'protein': float(row['protein']),
+            'fat': float(row['fat']),
+            'carbs': float(row['carbs']),
+            'serving': row.get('serving', '1 serving'),
+            'dataset_source': row.get('dataset_source', 'Unknown')
+        }
+    return dishes
+
+def measure(label: str, fn, path: str):
+    # Timed run first; tracemalloc slows allocation-heavy code, so memory is measured in a second run
+    gc.collect()
+    start = time.perf_counter()
+    result = fn(path)
+    elapsed = time.perf_counter() - start
+    del result
+    
+    gc.collect()
+    tracemalloc.start()
+    result = fn(path)
+    retained, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"  {label:<10} load={elapsed:7.3f}s  retained={retained / 2**20:8.1f}MB  peak={peak / 2**20:8.1f}MB")
+    del result
+
+def main():
+    parser = argparse.ArgumentParser(description="Nutrition loader benchmark")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100_000, 1_000_000])
+    parser.add_argument("--legacy-max", type=int, default=100_000, help="Skip the pandas loader above this size")
+    args = parser.parse_args()
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        for size in args.sizes:
+            path = os.path.join(tmp, f"nutrition_{size}.csv")
+            write_synthetic_csv(path, size)
+            print(f"{size:,} rows ({os.path.getsize(path) / 2**20:.1f}MB CSV)")
+            measure("columnar", NutritionTable.from_csv, path)
+            if size <= args.legacy_max:
+                try:
+                    measure("pandas", legacy_load, path)
+                except ImportError:
+                    print("  pandas     not installed, skipped")
+
+if __name__ == "__main__":
+    main()
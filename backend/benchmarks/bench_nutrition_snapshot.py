@@ -0,0 +1,106 @@
+"""
+Benchmark of CSV loading vs the memory-mapped nutrition snapshot
+Per-worker startup time and Python heap, lookup latency, and (on Linux) RSS / PSS of several live
+worker processes, where PSS splits shared pages between the processes mapping them
+
+Usage (from backend/):
+    python benchmarks/bench_nutrition_snapshot.py
+    python benchmarks/bench_nutrition_snapshot.py --sizes 100000 1000000 --workers 4
+"""
+import argparse
+import gc
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench_nutrition_loader import write_synthetic_csv
+from bench_nutrition_backends import latency
+from app.services.nutrition_service import NutritionService
+
+def build(label: str, csv_path: str, snapshot_path: str):
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    service = NutritionService(csv_path, snapshot_path=snapshot_path)
+    elapsed = time.perf_counter() - start
+    retained, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"  {label:<10} startup={elapsed:7.3f}s  python heap={retained / 2**20:8.1f}MB")
+    return service
+
+def memory_usage() -> dict:
+    """Rss and Pss of this process in MB (Linux only)"""
+    usage = {}
+    with open("/proc/self/smaps_rollup") as f:
+        for line in f:
+            key, _, value = line.partition(":")
+            if key in ("Rss", "Pss"):
+                usage[key] = int(value.split()[0]) / 1024
+    return usage
+
+def worker(csv_path: str, snapshot_path: str, names: list, barrier, results):
+    service = NutritionService(csv_path, snapshot_path=snapshot_path)
+    for name in names:
+        service.get_nutrition_json(name)
+    # Measure only once every worker holds its data, so shared pages are split between all of them
+    barrier.wait()
+    results.put(memory_usage())
+    barrier.wait()
+
+def measure_workers(label: str, csv_path: str, snapshot_path: str, names: list, workers: int):
+    context = multiprocessing.get_context("spawn")
+    barrier = context.Barrier(workers)
+    results = context.Queue()
+    processes = [context.Process(target=worker, args=(csv_path, snapshot_path, names, barrier, results)) for _ in range(workers)]
+    for process in processes:
+        process.start()
+    usage = [results.get() for _ in processes]
+    for process in processes:
+        process.join()
+    rss = sum(item["Rss"] for item in usage)
+    pss = sum(item["Pss"] for item in usage)
+    print(f"  {label:<10} {workers} workers: total RSS={rss:8.1f}MB  total PSS={pss:8.1f}MB")
+
+def main():
+    parser = argparse.ArgumentParser(description="CSV vs memory-mapped snapshot nutrition loading benchmark")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000])
+    parser.add_argument("--queries", type=int, default=2000)
+    parser.add_argument("--workers", type=int, default=0, help="also measure memory of this many worker processes (Linux)")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    
+    rng = np.random.default_rng(args.seed)
+    with tempfile.TemporaryDirectory() as tmp:
+        for size in args.sizes:
+            csv_path = os.path.join(tmp, f"nutrition_{size}.csv")
+            snapshot_path = os.path.join(tmp, f"nutrition_{size}.snapshot")
+            write_synthetic_csv(csv_path, size)
+            print(f"{size:,} dishes")
+            
+            start = time.perf_counter()
+            NutritionService(csv_path, snapshot_path=snapshot_path).write_snapshot(snapshot_path)
+            print(f"  compile    {time.perf_counter() - start:7.3f}s  snapshot={os.path.getsize(snapshot_path) / 2**20:.1f}MB")
+            
+            # A path that does not exist keeps the CSV service from picking up the snapshot
+            csv_service = build("csv", csv_path, os.path.join(tmp, "missing.snapshot"))
+            snapshot_service = build("snapshot", csv_path, snapshot_path)
+            
+            names = [f"dish_{i}" for i in rng.integers(0, size, args.queries)]
+            for label, service in (("csv", csv_service), ("snapshot", snapshot_service)):
+                print(f"  {label}")
+                print("    " + latency("lookup json ", service.get_nutrition_json, names))
+                print("    " + latency("get_nutrition", service.get_nutrition, names))
+            del csv_service, snapshot_service
+            
+            if args.workers and os.path.exists("/proc/self/smaps_rollup"):
+                measure_workers("csv", csv_path, os.path.join(tmp, "missing.snapshot"), names[:100], args.workers)
+                measure_workers("snapshot", csv_path, snapshot_path, names[:100], args.workers)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""
+Benchmark for catalogue summary statistics (GET /api/nutrition/database/summary)
+Recomputing on every request vs the per-version CatalogueStats, and one appended dish as a streaming update vs a
+full rebuild, on synthetic catalogues spread over several dataset sources
+
+Usage (from backend/):
+    python benchmarks/bench_nutrition_stats.py
+    python benchmarks/bench_nutrition_stats.py --sizes 100000 1000000 --sources 8
+"""
+import argparse
+import os
+import sys
+import time
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.nutrition_stats import CatalogueStats, PERCENTILES, HISTOGRAM_BINS
+from app.services.nutrition_table import NutritionTable, NUTRIENT_FIELDS
+from bench_nutrient_query import synthetic_table
+
+def per_request_summary(table: NutritionTable) -> dict:
+    """What a summary endpoint computing everything on each call does: one masked pass per source and nutrient"""
+    sources = np.array(table.dataset_source)
+    
+    def describe(mask):
+        return {
+            field: {
+                "mean": float(values.mean()), "std": float(values.std()), "min": float(values.min()), "max": float(values.max()),
+                "percentiles": np.percentile(values, PERCENTILES).tolist(),
+                "histogram": np.histogram(values, HISTOGRAM_BINS)[0].tolist()
+            }
+            for field in NUTRIENT_FIELDS
+            for values in [table.columns[field][mask] if mask is not None else table.columns[field]]
+        }
+    
+    return {"all": describe(None), "by_source": {source: describe(sources == source) for source in np.unique(sources).tolist()}}
+
+def timed(fn, repeat: int = 1):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = fn()
+    return result, (time.perf_counter() - start) / repeat
+
+def main():
+    parser = argparse.ArgumentParser(description="Summary statistics benchmark")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100_000, 1_000_000])
+    parser.add_argument("--sources", type=int, default=8, help="distinct dataset_source values")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    
+    rng = np.random.default_rng(args.seed)
+    for size in args.sizes:
+        table = synthetic_table(size, rng)
+        table.dataset_source = [f"source_{code}" for code in rng.integers(0, args.sources, size).tolist()]
+        
+        _, naive = timed(lambda: per_request_summary(table))
+        stats, build = timed(lambda: CatalogueStats.from_table(table))
+        _, first = timed(stats.summary)
+        _, cached = timed(stats.summary, repeat=1000)
+        
+        record = dict(table.record(0), calories=950.0)
+        appended = table.with_record("appended dish", record)
+        streamed, stream = timed(lambda: stats.with_dish(record, record["dataset_source"]), repeat=100)
+        rebuilt, rebuild = timed(lambda: CatalogueStats.from_table(appended))
+        order = [streamed.groups.index(group) for group in rebuilt.groups]
+        drift = max(np.abs(streamed.mean[order] - rebuilt.mean).max(), np.abs(streamed.m2[order] - rebuilt.m2).max() / size)
+        
+        print(f"{size:,} dishes, {args.sources} sources:")
+        print(f"  recompute per request  {naive * 1e3:9.1f}ms")
+        print(f"  build once per version {build * 1e3:9.1f}ms, first summary {first * 1e3:.2f}ms, cached summary {cached * 1e6:.2f}us")
+        print(f"  append one dish: streaming update {stream * 1e3:.3f}ms vs full rebuild {rebuild * 1e3:.1f}ms "
+              f"(max moment drift {drift:.2e})")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""
+Benchmark for precompressed constant responses (/, /api/aboutus, /api/aboutus/json, /api/aboutus/team)
+Bytes on the wire per encoding, and handler time: rendering the body on every request (uncompressed, or gzipped per
+request like GZipMiddleware) vs picking a stored variant
+
+Usage (from backend/):
+    python benchmarks/bench_precompressed.py
+"""
+import argparse
+import asyncio
+import gzip
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi.responses import HTMLResponse, JSONResponse, Response
+from app.main import root
+from app.routes import aboutus
+from app.utils.precompressed import PrecompressedBody, brotli
+
+ROUTES = {
+    "/": root,
+    "/api/aboutus": aboutus.get_about_us_html,
+    "/api/aboutus/json": aboutus.get_about_us_json,
+    "/api/aboutus/team": aboutus.get_team_info
+}
+ACCEPT = "gzip, deflate, br"
+
+async def timed(fn, iterations: int) -> float:
+    start = time.perf_counter()
+    for _ in range(iterations):
+        await fn()
+    return (time.perf_counter() - start) / iterations * 1e6
+
+async def main_async(args):
+    print(f"{'route':<20} {'identity':>9} {'gzip':>7} {'br':>7}   {'render':>9} {'render+gzip':>12} {'stored':>8}")
+    for path, endpoint in ROUTES.items():
+        render = endpoint.render
+        body = PrecompressedBody.from_content(await render())
+        
+        async def per_request():
+            content = await render()
+            if isinstance(content, Response):
+                return content
+            return HTMLResponse(content) if isinstance(content, str) else JSONResponse(content)
+        
+        async def per_request_gzip():
+            return gzip.compress((await per_request()).body, 9)
+        
+        async def stored():
+            return body.response(ACCEPT)
+        
+        sizes = [len(body.variants.get(encoding, b"")) or "-" for encoding in ("identity", "gzip", "br")]
+        timings = [await timed(fn, args.iterations) for fn in (per_request, per_request_gzip, stored)]
+        print(f"{path:<20} {sizes[0]:>9} {sizes[1]:>7} {sizes[2]:>7}   "
+              + " ".join(f"{label:>{width}}" for label, width in zip([f"{t:.1f}us" for t in timings], (9, 12, 8))))
+    if brotli is None:
+        print("brotli not installed: no br variants")
+
+def main():
+    parser = argparse.ArgumentParser(description="Precompressed response benchmark")
+    parser.add_argument("--iterations", type=int, default=2000)
+    args = parser.parse_args()
+    asyncio.run(main_async(args))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""
+Benchmark for response serialization
+Per-response cost of the three ways a route can turn a payload into bytes: returning a dict (jsonable_encoder plus the
+stdlib encoder), validating it against its Pydantic model first, and FastJSONResponse (orjson, no validation), for
+prediction, nutrition and dish list payloads
+
+Usage (from backend/):
+    python benchmarks/bench_serialization.py
+"""
+import argparse
+import os
+import sys
+import time
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+from app.models.nutrition_model import NutritionResponse
+from app.models.predict_model import PredictionResponse
+from app.services.nutrition_service import NutritionService
+from app.utils.json_codec import FastJSONResponse, orjson
+
+class DishPage(BaseModel):
+    """The dish list payload, typed for the comparison"""
+    success: bool
+    pagination: dict
+    dishes: list
+
+def prediction_payload(service: NutritionService, rng, explain: bool) -> dict:
+    names = service.get_all_dishes()
+    top = [
+        {"class_id": int(i), "class_name": names[i], "name": names[i].replace("_", " ").title(),
+         "confidence": float(p), "nutrition": service.get_nutrition(names[i])["nutrition"]}
+        for i, p in zip(rng.choice(len(names), 3, replace=False), [0.81, 0.12, 0.04])
+    ]
+    payload = {
+        "success": True, "food_name": top[0]["name"], "class_name": top[0]["class_name"],
+        "confidence": top[0]["confidence"], "nutrition": top[0]["nutrition"], "top_3_predictions": top,
+        "bounding_box": {"x": 0, "y": 0, "width": 640, "height": 480},
+        "expected_nutrition": {field: float(rng.uniform(0, 100)) for field in top[0]["nutrition"]},
+        "processing_time": 0.123, "model_info": "ResNet50 trained model"
+    }
+    if explain:
+        payload["explanation"] = {
+            "method": "grad-cam", "class_id": top[0]["class_id"], "class_name": top[0]["class_name"], "format": "array",
+            "cached": False, "height": 14, "width": 14, "heatmap": np.round(rng.random((14, 14)), 3).tolist()
+        }
+    return payload
+
+def per_call(fn, iterations: int) -> float:
+    start = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    return (time.perf_counter() - start) / iterations * 1e6
+
+def main():
+    parser = argparse.ArgumentParser(description="Response serialization benchmark")
+    parser.add_argument("--iterations", type=int, default=5000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    
+    rng = np.random.default_rng(args.seed)
+    service = NutritionService()
+    page = service.list_dishes(limit=100)
+    dish_page = {"success": True, "pagination": {key: value for key, value in page.items() if key != "dishes"}, "dishes": page["dishes"]}
+    payloads = {
+        "predict": (PredictionResponse, prediction_payload(service, rng, explain=False)),
+        "predict + heatmap": (PredictionResponse, prediction_payload(service, rng, explain=True)),
+        "nutrition": (NutritionResponse, service.get_nutrition("pho")),
+        "dish list (100)": (DishPage, dish_page),
+    }
+    print(f"orjson {'available' if orjson is not None else 'missing (stdlib fallback)'}")
+    print(f"{'payload':<20} {'dict return':>12} {'validate+dump':>14} {'FastJSON':>10}")
+    for label, (model, payload) in payloads.items():
+        timings = [
+            per_call(lambda: JSONResponse(content=jsonable_encoder(payload)), args.iterations),
+            per_call(lambda: model.model_validate(payload).model_dump_json(), args.iterations),
+            per_call(lambda: FastJSONResponse(content=payload), args.iterations),
+        ]
+        print(f"{label:<20} " + " ".join(f"{f'{t:.1f}us':>{width}}" for t, width in zip(timings, (12, 14, 10))))
+
+if __name__ == "__main__":
+    main()
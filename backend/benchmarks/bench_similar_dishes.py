@@ -0,0 +1,71 @@
+"""
+Benchmark for "similar macro profile" neighbour search (GET /api/nutrition/{dish}/similar)
+Uncached vectorized search vs a Python loop over per-dish dicts, on synthetic catalogues
+
+Usage (from backend/):
+    python benchmarks/bench_similar_dishes.py
+    python benchmarks/bench_similar_dishes.py --sizes 100000 1000000 --queries 200
+"""
+import argparse
+import heapq
+import os
+import sys
+import time
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.nutrient_neighbors import NutrientNeighbors, MACRO_FIELDS
+from bench_nutrient_query import synthetic_table
+
+def loop_nearest(records: dict, scales: dict, dish_name: str, k: int) -> list:
+    """The per-dish dict loop this replaces"""
+    query = records[dish_name]
+    distances = (
+        (sum(((record[field] - query[field]) / scales[field]) ** 2 for field in MACRO_FIELDS), name)
+        for name, record in records.items() if name != dish_name
+    )
+    return heapq.nsmallest(k, distances)
+
+def percentiles(timings: list) -> str:
+    p50, p99 = np.percentile(timings, [50, 99]) * 1e3
+    return f"p50={p50:7.2f}ms p99={p99:7.2f}ms"
+
+def main():
+    parser = argparse.ArgumentParser(description="Similar dish neighbour search benchmark")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    
+    rng = np.random.default_rng(args.seed)
+    for size in args.sizes:
+        table = synthetic_table(size, rng)
+        start = time.perf_counter()
+        neighbors = NutrientNeighbors(table, cache_size=0)
+        neighbors.profiles("serving")
+        print(f"{size:,} dishes, matrix built in {(time.perf_counter() - start) * 1e3:.1f}ms")
+        
+        rows = rng.integers(0, size, args.queries).tolist()
+        for label, kwargs in (("unconstrained", {}), ("lower calories", {"lower": ["calories"]}),
+                              ("lower fat, higher protein", {"lower": ["fat"], "higher": ["protein"]})):
+            timings = []
+            for row in rows:
+                start = time.perf_counter()
+                neighbors.nearest(row, args.k, **kwargs)
+                timings.append(time.perf_counter() - start)
+            print(f"  {label:<26} {percentiles(timings)}")
+        
+        if size <= 100_000:
+            records = {name: table.record(row) for row, name in enumerate(table.names)}
+            scales = {field: float(table.columns[field].std()) or 1.0 for field in MACRO_FIELDS}
+            timings = []
+            for row in rows[:20]:
+                start = time.perf_counter()
+                loop_nearest(records, scales, table.names[row], args.k)
+                timings.append(time.perf_counter() - start)
+            print(f"  {'python loop (baseline)':<26} {percentiles(timings)}")
+
+if __name__ == "__main__":
+    main()
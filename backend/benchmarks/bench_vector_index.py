@@ -0,0 +1,65 @@
+"""
+Benchmark for the in-memory embedding index (app/services/vector_index.py)
+Measures build time, top-k search latency and memory per vector
+
+Usage (from backend/):
+    python benchmarks/bench_vector_index.py
+    python benchmarks/bench_vector_index.py --sizes 10000 100000 --dim 2048 --int8
+"""
+import argparse
+import os
+import sys
+import time
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.vector_index import VectorIndex
+
+def run(size: int, dim: int, quantize: bool, queries: int, k: int, batch: int = 10000):
+    rng = np.random.default_rng(0)
+    index = VectorIndex(dim, quantize=quantize, initial_capacity=size)
+    
+    start = time.perf_counter()
+    for offset in range(0, size, batch):
+        count = min(batch, size - offset)
+        vectors = rng.standard_normal((count, dim), dtype=np.float32)
+        index.add([str(offset + i) for i in range(count)], vectors)
+    build_time = time.perf_counter() - start
+    
+    query_vectors = rng.standard_normal((queries, dim), dtype=np.float32)
+    latencies = []
+    for query in query_vectors:
+        start = time.perf_counter()
+        index.search(query, k)
+        latencies.append(time.perf_counter() - start)
+    latencies = np.array(latencies) * 1000
+    
+    status = index.get_status()
+    print(f"{size:>9,} vectors  dim={dim}  {'int8' if quantize else 'fp32'}  "
+          f"build={build_time:.2f}s  search p50={np.percentile(latencies, 50):.2f}ms "
+          f"p99={np.percentile(latencies, 99):.2f}ms  "
+          f"bytes/vector={status['bytes_per_vector']:.0f}  total={status['memory_bytes'] / 2**20:.1f}MB")
+
+def main():
+    parser = argparse.ArgumentParser(description="Vector index benchmark")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--dim", type=int, default=2048, help="Embedding size (ResNet50 pooled features: 2048)")
+    parser.add_argument("--int8", action="store_true", help="Only run the int8-quantized index")
+    parser.add_argument("--fp32", action="store_true", help="Only run the float32 index")
+    parser.add_argument("--queries", type=int, default=50)
+    parser.add_argument("--k", type=int, default=10)
+    args = parser.parse_args()
+    
+    modes = [False, True]
+    if args.int8 and not args.fp32:
+        modes = [True]
+    elif args.fp32 and not args.int8:
+        modes = [False]
+    
+    for size in args.sizes:
+        for quantize in modes:
+            run(size, args.dim, quantize, args.queries, args.k)
+
+if __name__ == "__main__":
+    main()